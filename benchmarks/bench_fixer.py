@@ -0,0 +1,164 @@
+"""Benchmark Fixer.process on large speech transcripts.
+
+Compares the fused line pass used by :meth:`Fixer.process` with the
+previous implementation, which called each fixing step in turn and split
+the text into lines and joined it again in every line-level step. Both
+produce byte-identical output.
+
+Usage::
+
+    python benchmarks/bench_fixer.py [--sizes 1 10] [--repeat 3]
+"""
+
+import argparse
+import itertools
+import os
+import random
+import re
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from docpipe.document import Chunk  # noqa: E402
+from docpipe.processors.fixer import Fixer  # noqa: E402
+
+SENTENCES = [
+    "今日はコパイロットの新機能についてお話しします。",
+    "えーと、まずWin Helloの設定ですが、",
+    "これは結構大事なポイントで。。",
+    "Ryzen AI 5 のマシンでも動きます(補足)。",
+    "はい。",
+    "なるほど、ありがとうございます。",
+    "次にアイロンについてです。",
+    "teh  demo  works!!",
+]
+
+
+def make_transcript(size_bytes: int, seed: int = 0) -> str:
+    """Whisper-style lines with timestamps, speaker labels and blank lines."""
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    t = 0.0
+    while total < size_bytes:
+        body = "".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 4)))
+        line = f"[{t:.1f}-{t + 3.2:.1f}] speaker_{rng.randint(1, 2)}: {body}"
+        t += 3.2
+        lines.append(line)
+        if rng.random() < 0.05:
+            lines.append("")
+        total += len(line.encode("utf-8")) + 1
+    return "\n".join(lines)
+
+
+def legacy_remove_speech_artifacts(text: str) -> str:
+    patterns = [
+        r"\[[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\]\s*speaker_[12]:\s*$",
+        r"^speaker_[12]:\s*$",
+        r"^\[[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\]\s*$",
+        r"^[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\s*$",
+    ]
+    lines = []
+    for line in text.splitlines():
+        if not any(re.match(p, line.strip()) for p in patterns):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def _collapse_empty(lines: List[str]) -> List[str]:
+    result: List[str] = []
+    prev_empty = False
+    for line in lines:
+        if line == "":
+            if not prev_empty:
+                result.append("")
+            prev_empty = True
+        else:
+            result.append(line)
+            prev_empty = False
+    while result and result[-1] == "":
+        result.pop()
+    return result
+
+
+def legacy_normalize_speech_text(text: str) -> str:
+    lines = []
+    for line in text.splitlines():
+        if line.strip() == "":
+            lines.append("")
+            continue
+        line = re.sub(r"^\[[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\]\s*speaker_[12]:\s*", "", line)
+        if line.strip():
+            lines.append(line.strip())
+    return "\n".join(_collapse_empty(lines))
+
+
+def legacy_normalize_line_breaks(text: str) -> str:
+    return "\n".join(_collapse_empty([line.strip() for line in text.splitlines()]))
+
+
+def legacy_improve_structure(fixer: Fixer, text: str) -> str:
+    lines = text.splitlines()
+    result = []
+    for i, line in enumerate(lines):
+        is_heading = fixer._is_heading(line)
+        if is_heading and fixer.enable_markdown_headings and not line.lstrip().startswith("#"):
+            line = "# " + line.strip()
+        result.append(line)
+        if is_heading and i + 1 < len(lines) and lines[i + 1].strip() != "":
+            result.append("")
+    return "\n".join(result)
+
+
+def legacy_process(fixer: Fixer, text: str) -> str:
+    """The speech path as it was: one call per step, line steps as list loops."""
+    text = fixer.fix_speech_recognition_errors(text)
+    text = legacy_remove_speech_artifacts(text)
+    text = legacy_normalize_speech_text(text)
+    text = "\n".join(next(g) for _, g in itertools.groupby(text.splitlines()))
+    text = fixer.balance_parentheses(text)
+    text = fixer.fix_common_typos(text)
+    text = fixer.normalize_punctuation(text)
+    text = legacy_normalize_line_breaks(text)
+    text = fixer.adjust_spacing(text)
+    text = legacy_improve_structure(fixer, text)
+    return fixer.apply_glossary(text)
+
+
+def _best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes: List[float], repeat: int) -> None:
+    fixer = Fixer()
+    print(f"{'MB':>6} {'lines':>9} {'fused[ms]':>10} {'legacy[ms]':>11} {'speedup':>8}")
+    for size in sizes:
+        text = make_transcript(int(size * 1_000_000))
+        chunk = Chunk(text)
+        if fixer.process(chunk)["text"] != legacy_process(fixer, text):
+            raise SystemExit("fused and legacy output differ")
+        fused = _best_of(lambda: fixer.process(chunk), repeat)
+        legacy = _best_of(lambda: legacy_process(fixer, text), repeat)
+        print(
+            f"{size:>6g} {text.count(chr(10)) + 1:>9} {fused * 1000:10.1f} "
+            f"{legacy * 1000:11.1f} {legacy / fused:7.2f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 10], help="transcript sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
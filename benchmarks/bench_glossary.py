@@ -0,0 +1,124 @@
+"""Benchmark glossary replacement for glossary sizes from 100 to 100k terms.
+
+Compares the compiled single-scan matcher in :class:`docpipe.glossary.Glossary`
+with the previous implementation that ran one ``re.sub`` per term, and reports
+how long a worker takes to map an existing precompiled artifact.
+
+Usage::
+
+    python benchmarks/bench_glossary.py [--sizes 100 1000 10000 100000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from docpipe.glossary import Glossary  # noqa: E402
+
+# the per-term loop becomes impractically slow beyond this size
+LEGACY_MAX_TERMS = 10_000
+
+KATAKANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモ"
+KANJI = "人工知能機械学習深層自然言語処理計算資源"
+
+
+def make_glossary(path: Path, size: int, seed: int = 0) -> List[str]:
+    """Write a CSV glossary with ``size`` entries and return the English terms."""
+    rng = random.Random(seed)
+    english: Dict[str, str] = {}
+    while len(english) < size:
+        en = "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(4, 12)))
+        english.setdefault(en, "".join(rng.choices(KATAKANA + KANJI, k=rng.randint(2, 6))))
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ja", "en"])
+        for en, ja in english.items():
+            writer.writerow([ja, en])
+    return list(english)
+
+
+def make_text(terms: List[str], chars: int = 8000, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    words: List[str] = []
+    length = 0
+    while length < chars:
+        word = rng.choice(terms) if rng.random() < 0.1 else rng.choice(["the", "model", "データ", "です。"])
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def legacy_replace(mapping: Dict[str, str], text: str) -> str:
+    items = sorted(mapping.items(), key=lambda x: len(x[0]), reverse=True)
+    for term, canonical in items:
+        if not term:
+            continue
+        if re.fullmatch(r"[A-Za-z0-9_\-]+", term):
+            pattern = r"(?<![A-Za-z0-9_])" + re.escape(term) + r"(?![A-Za-z0-9_])"
+        else:
+            pattern = re.escape(term)
+        text = re.sub(pattern, canonical, text)
+    return text
+
+
+def _best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes: List[int], repeat: int) -> None:
+    print(
+        f"{'terms':>8} {'load[s]':>9} {'mmap[ms]':>9} {'replace[ms]':>12} "
+        f"{'legacy[ms]':>11} {'speedup':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = Path(tmp) / f"glossary_{size}.csv"
+            terms = make_glossary(path, size)
+            text = make_text(terms)
+
+            artifact = Path(tmp) / f"glossary_{size}.bin"
+            start = time.perf_counter()
+            Glossary(str(path), artifact_path=str(artifact))
+            load = time.perf_counter() - start
+
+            start = time.perf_counter()
+            glossary = Glossary(str(path), artifact_path=str(artifact))
+            mapped = time.perf_counter() - start
+
+            compiled = _best_of(lambda: glossary.replace(text), repeat)
+            if size <= LEGACY_MAX_TERMS:
+                legacy = _best_of(lambda: legacy_replace(glossary.mapping, text), 1)
+                legacy_col = f"{legacy * 1000:11.1f}"
+                speedup = f"{legacy / compiled:7.0f}x"
+            else:
+                legacy_col, speedup = f"{'skipped':>11}", f"{'-':>8}"
+            print(
+                f"{size:>8} {load:9.2f} {mapped * 1000:9.1f} {compiled * 1000:12.1f} "
+                f"{legacy_col} {speedup}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
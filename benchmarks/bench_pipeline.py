@@ -0,0 +1,246 @@
+"""Benchmark pipeline throughput and per-stage costs against a fake LLM.
+
+Runs the canned fixtures in ``benchmarks/fixtures`` (a Whisper transcript,
+marker-style Markdown, a web page and a small PDF) through
+
+* the CPU-bound stages on their own: extraction, :class:`Preprocessor`,
+  :class:`Fixer`, ``markdown_utils``, :class:`Glossary` and
+  :class:`Evaluator`, and
+* :func:`process_text` end to end with the real translator and
+  proofreader talking to :class:`fakes.FakeLLMServer`, which answers after
+  a seeded ``--latency`` ± ``--jitter``.
+
+Each run is appended with the current commit to ``--results`` (JSON lines)
+and compared with the previous entry, so regressions show up between
+commits. ``language_tool_python`` is replaced by a no-op checker when it is
+not installed; the PDF is skipped without marker or ``pypdfium2``.
+
+Usage::
+
+    python benchmarks/bench_pipeline.py [--latency 0.2] [--jitter 0.05] [--repeat 5] [--stream]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fakes import FakeLLMServer, fake_language_tool_module  # noqa: E402
+
+from docpipe.config import Config  # noqa: E402
+from docpipe.document import Chunk  # noqa: E402
+from docpipe.extractors import pdf as pdf_module  # noqa: E402
+from docpipe.extractors.web import WebExtractor  # noqa: E402
+from docpipe.glossary import Glossary  # noqa: E402
+from docpipe.pipeline import process_text  # noqa: E402
+from docpipe.processors import evaluator as evaluator_module  # noqa: E402
+from docpipe.processors.fixer import Fixer  # noqa: E402
+from docpipe.processors.preprocessor import Preprocessor  # noqa: E402
+from docpipe.processors.proofreader import Proofreader  # noqa: E402
+from docpipe.processors.spellchecker import SpellChecker  # noqa: E402
+from docpipe.processors.translator import Translator  # noqa: E402
+from docpipe.tracing import merge_summary  # noqa: E402
+from docpipe.utils.markdown_utils import (  # noqa: E402
+    extract_critical_markdown_blocks,
+    restore_critical_markdown_blocks,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+DEFAULT_RESULTS = Path(__file__).parent / "results" / "pipeline.jsonl"
+
+
+def _best_of(func: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _pdf_available() -> bool:
+    return pdf_module.marker is not None or pdf_module.pypdfium2 is not None
+
+
+def _extract_pdf(extractor: pdf_module.PDFExtractor) -> str:
+    # marker のデバッグ出力は捨てる
+    with contextlib.redirect_stdout(io.StringIO()):
+        return extractor.extract(str(FIXTURES / "report.pdf"))["text"]
+
+
+def load_documents() -> Dict[str, str]:
+    """Extracted text per fixture, as the pipeline would receive it."""
+    web = WebExtractor()
+    html = (FIXTURES / "page.html").read_text(encoding="utf-8")
+    docs = {
+        "transcript": (FIXTURES / "transcript.txt").read_text(encoding="utf-8"),
+        "markdown": (FIXTURES / "article.md").read_text(encoding="utf-8"),
+        "web": web._parse(html, "https://example.com/notes")["text"],
+    }
+    if _pdf_available():
+        docs["pdf"] = _extract_pdf(pdf_module.PDFExtractor())
+    return docs
+
+
+def stage_benchmarks(docs: Dict[str, str], repeat: int) -> Dict[str, float]:
+    """Milliseconds per call of each CPU-bound stage."""
+    results: Dict[str, float] = {}
+    web = WebExtractor()
+    html = (FIXTURES / "page.html").read_text(encoding="utf-8")
+    results["extract.web"] = _best_of(lambda: web._parse(html, "https://example.com/notes"), repeat)
+    if "pdf" in docs:
+        extractor = pdf_module.PDFExtractor()
+        results["extract.pdf"] = _best_of(lambda: _extract_pdf(extractor), repeat)
+
+    preprocessor = Preprocessor()
+    fixer = Fixer()
+    glossary = Glossary(str(FIXTURES / "glossary.csv"))
+    evaluator = evaluator_module.Evaluator()
+    for name, text in docs.items():
+        results[f"preprocess.{name}"] = _best_of(lambda: preprocessor.process(Chunk(text)), repeat)
+        results[f"fix.{name}"] = _best_of(lambda: fixer.process(Chunk(text)), repeat)
+        results[f"glossary.{name}"] = _best_of(lambda: glossary.replace(text), repeat)
+        results[f"evaluate.{name}"] = _best_of(lambda: evaluator.evaluate(Chunk(text)), repeat)
+
+    markdown = docs["markdown"]
+
+    def markdown_roundtrip() -> None:
+        protected, blocks = extract_critical_markdown_blocks(markdown)
+        restore_critical_markdown_blocks(protected, blocks)
+
+    results["markdown_utils.markdown"] = _best_of(markdown_roundtrip, repeat)
+    return {name: seconds * 1000 for name, seconds in results.items()}
+
+
+def end_to_end(docs: Dict[str, str], server: FakeLLMServer, max_retries: int, stream: bool = False) -> Dict[str, Any]:
+    """Process every document once; return docs/sec and the merged stage trace."""
+    cfg = Config()
+    cfg.pipeline.max_retries = max_retries
+    cfg.diff_processor.enabled = False
+    glossary = Glossary(str(FIXTURES / "glossary.csv"))
+    translator = Translator(
+        cfg.translator.model, cfg.translator.temperature, cfg.translator.prompt, glossary=glossary, stream=stream
+    )
+    proofreader = Proofreader(
+        cfg.proofreader.model,
+        cfg.proofreader.style,
+        cfg.proofreader.temperature,
+        cfg.proofreader.prompt,
+        glossary=glossary,
+        stream=stream,
+    )
+    evaluator = evaluator_module.Evaluator()
+    fixer = Fixer(glossary=glossary)
+    spellchecker = SpellChecker()
+    preprocessor = Preprocessor()
+
+    trace: Dict[str, Dict[str, float]] = {}
+    requests_before = server.requests
+    start = time.perf_counter()
+    # Translator はデバッグ出力が多いので捨てる
+    with contextlib.redirect_stdout(io.StringIO()):
+        for text in docs.values():
+            chunk = preprocessor.process(Chunk(text))
+            result = process_text(chunk, cfg, translator, proofreader, evaluator, fixer, spellchecker)
+            merge_summary(trace, result["metadata"]["trace"])
+    elapsed = time.perf_counter() - start
+    return {
+        "docs_per_sec": len(docs) / elapsed,
+        "llm_requests": server.requests - requests_before,
+        "trace": trace,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _previous(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    lines = [line for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def report(metrics: Dict[str, float], previous: Optional[Dict[str, Any]]) -> None:
+    old = (previous or {}).get("metrics", {})
+    print(f"{'metric':<40} {'value':>12} {'previous':>12} {'change':>8}")
+    for name, value in metrics.items():
+        before = old.get(name)
+        change = f"{(value - before) / before * 100:+7.1f}%" if before else ""
+        before_text = f"{before:12.2f}" if before is not None else f"{'-':>12}"
+        print(f"{name:<40} {value:12.2f} {before_text} {change:>8}")
+
+
+def run(args: argparse.Namespace) -> None:
+    if evaluator_module.lt is None:
+        print("language_tool_python not installed: using a no-op grammar checker", file=sys.stderr)
+        evaluator_module.lt = fake_language_tool_module
+    docs = load_documents()
+
+    metrics = {f"{name}[ms]": ms for name, ms in stage_benchmarks(docs, args.repeat).items()}
+    with FakeLLMServer(latency=args.latency, jitter=args.jitter, seed=args.seed) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "fake")
+        e2e = end_to_end(docs, server, args.max_retries, args.stream)
+    metrics["end_to_end.docs_per_sec"] = e2e["docs_per_sec"]
+    metrics["end_to_end.llm_requests"] = e2e["llm_requests"]
+    for stage, totals in sorted(e2e["trace"].items()):
+        metrics[f"end_to_end.{stage}[s]"] = totals["seconds"]
+        for key in ("prompt_tokens", "completion_tokens"):
+            if key in totals:
+                metrics[f"end_to_end.{stage}.{key}"] = totals[key]
+
+    previous = _previous(args.results)
+    report(metrics, previous)
+    if not args.no_save:
+        args.results.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "commit": _git_commit(),
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "stream": args.stream,
+            "metrics": metrics,
+        }
+        with open(args.results, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        print(f"saved to {args.results}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="uniform jitter added to the latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions of the stage benchmarks")
+    parser.add_argument("--max-retries", type=int, default=1)
+    parser.add_argument("--stream", action="store_true", help="stream the LLM responses (server-sent events)")
+    parser.add_argument("--results", type=Path, default=DEFAULT_RESULTS, help="JSON-lines history file")
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Deterministic stand-ins for the network services used by the pipeline.
+
+:class:`FakeLLMServer` speaks the OpenAI chat completions protocol on
+localhost, answers after a configurable latency with seeded jitter and
+reports token usage, so the real :class:`Translator`, :class:`Proofreader`
+and :class:`DiffProcessor` can be benchmarked without an API key. Requests
+with ``stream=True`` are answered as server-sent events, a few characters
+per event.
+:class:`FakeLanguageTool` replaces the LanguageTool server when
+``language_tool_python`` is not installed.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+# 翻訳プロンプトから本文だけを取り出す（応答は入力本文をそのまま返す）
+_PROMPT_BODY = [
+    re.compile(r"テキスト:\n(.*)\n\n翻訳結果のみを返してください。", re.S),
+    re.compile(r"Answer the result only:\n\n(.*)", re.S),
+]
+
+
+def _reply(messages: List[Dict[str, str]]) -> str:
+    content = messages[-1]["content"] if messages else ""
+    for pattern in _PROMPT_BODY:
+        match = pattern.search(content)
+        if match:
+            return match.group(1)
+    return content
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeLLMServer:
+    """OpenAI-compatible chat server echoing the text it was asked to process.
+
+    Each request waits ``latency ± jitter`` seconds, drawn from a random
+    generator seeded with ``seed``. Use as a context manager and point the
+    client at :attr:`base_url` (``OPENAI_BASE_URL``).
+    """
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, seed: int = 0) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802 - http.server API
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if body.get("stream"):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.end_headers()
+                    for event in server.stream_events(server.complete(body)):
+                        self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    return
+                payload = json.dumps(server.complete(body)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+
+    def complete(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, delay))
+        messages = body.get("messages", [])
+        reply = _reply(messages)
+        prompt_tokens = sum(_tokens(m.get("content", "")) for m in messages)
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": _tokens(reply),
+                "total_tokens": prompt_tokens + _tokens(reply),
+            },
+        }
+
+    @staticmethod
+    def stream_events(response: Dict[str, Any], size: int = 8) -> List[Dict[str, Any]]:
+        """Split a completion into chunk events, with the usage in the last one."""
+        content = response["choices"][0]["message"]["content"]
+        base = {"id": response["id"], "object": "chat.completion.chunk", "created": 0, "model": response["model"]}
+        events = [
+            {**base, "choices": [{"index": 0, "delta": {"content": content[i:i + size]}, "finish_reason": None}]}
+            for i in range(0, len(content), size)
+        ]
+        events.append({**base, "choices": [], "usage": response["usage"]})
+        return events
+
+    def __enter__(self) -> "FakeLLMServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class FakeLanguageTool:
+    """``language_tool_python.LanguageTool`` that finds no errors after ``latency``."""
+
+    latency = 0.0
+
+    def __init__(self, language: str = "ja-JP") -> None:
+        self.language = language
+
+    def check(self, text: str) -> List[Any]:
+        time.sleep(self.latency)
+        return []
+
+
+fake_language_tool_module = types.SimpleNamespace(LanguageTool=FakeLanguageTool)
@@ -0,0 +1,127 @@
+"""Token, cost and time budgets for documents and runs.
+
+A :class:`Budget` is charged with the usage of every LLM response through
+:func:`charge_usage`, which :func:`docpipe.tracing.record_usage` calls for
+the budgets activated with :func:`budgeting`. The pipeline asks
+:meth:`Budget.exhausted` before it starts another retry or the diff stage.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Mapping, Optional, Sequence
+
+_current: ContextVar[Optional["Budget"]] = ContextVar("docpipe_budget", default=None)
+
+
+def _price(prices: Mapping[str, Sequence[float]], model: str) -> Optional[Sequence[float]]:
+    # 応答のモデル名は日付付き（gpt-4o-2024-08-06 など）なので最長の前方一致で引く
+    matches = [name for name in prices if model.startswith(name)]
+    return prices[max(matches, key=len)] if matches else None
+
+
+class Budget:
+    """Limits on LLM tokens, dollars and wall-clock seconds.
+
+    ``None`` means unlimited. ``prices`` maps a model name (prefix) to USD
+    per million input and output tokens; usage of unpriced models costs
+    nothing. A budget with a ``parent`` (the run budget of a document) is
+    exhausted when either is.
+    """
+
+    def __init__(
+        self,
+        tokens: Optional[int] = None,
+        cost: Optional[float] = None,
+        seconds: Optional[float] = None,
+        prices: Optional[Mapping[str, Sequence[float]]] = None,
+        parent: Optional["Budget"] = None,
+        scope: str = "run",
+    ) -> None:
+        self.tokens = tokens
+        self.cost = cost
+        self.seconds = seconds
+        self.prices = dict(prices or {})
+        self.parent = parent
+        self.scope = scope
+        self.spent_tokens = 0
+        self.spent_cost = 0.0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def charge(self, prompt_tokens: int, completion_tokens: int, model: str = "") -> None:
+        self.spent_tokens += prompt_tokens + completion_tokens
+        price = _price(self.prices, model)
+        if price is not None:
+            self.spent_cost += (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+        if self.parent is not None:
+            self.parent.charge(prompt_tokens, completion_tokens, model)
+
+    def exhausted(self) -> Optional[str]:
+        """Return why the budget is used up (e.g. ``"document tokens"``), or ``None``."""
+        if self.tokens is not None and self.spent_tokens >= self.tokens:
+            return f"{self.scope} tokens"
+        if self.cost is not None and self.spent_cost >= self.cost:
+            return f"{self.scope} cost"
+        if self.seconds is not None and self.elapsed >= self.seconds:
+            return f"{self.scope} seconds"
+        if self.parent is not None:
+            return self.parent.exhausted()
+        return None
+
+    def usage(self) -> Dict[str, float]:
+        return {
+            "tokens": self.spent_tokens,
+            "cost": round(self.spent_cost, 6),
+            "seconds": round(self.elapsed, 3),
+        }
+
+    @classmethod
+    def for_run(cls, pipeline_cfg: Any, prices: Optional[Mapping[str, Sequence[float]]] = None) -> "Budget":
+        return cls(
+            pipeline_cfg.max_run_tokens,
+            pipeline_cfg.max_run_cost,
+            pipeline_cfg.max_run_seconds,
+            prices,
+        )
+
+    @classmethod
+    def for_document(
+        cls,
+        pipeline_cfg: Any,
+        prices: Optional[Mapping[str, Sequence[float]]] = None,
+        run: Optional["Budget"] = None,
+    ) -> "Budget":
+        return cls(
+            pipeline_cfg.max_document_tokens,
+            pipeline_cfg.max_document_cost,
+            pipeline_cfg.max_document_seconds,
+            run.prices if run is not None else prices,
+            parent=run,
+            scope="document",
+        )
+
+
+@contextmanager
+def budgeting(budget: Budget) -> Iterator[Budget]:
+    """Charge the usage of LLM responses inside the block to ``budget``."""
+    token = _current.set(budget)
+    try:
+        yield budget
+    finally:
+        _current.reset(token)
+
+
+def charge_usage(resp: Any) -> None:
+    budget = _current.get()
+    usage = getattr(resp, "usage", None)
+    if budget is None or usage is None:
+        return
+    budget.charge(
+        getattr(usage, "prompt_tokens", 0) or 0,
+        getattr(usage, "completion_tokens", 0) or 0,
+        str(getattr(resp, "model", "") or ""),
+    )
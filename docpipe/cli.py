@@ -1,30 +1,27 @@
 import click
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 from itertools import chain
 import json
 import re
 from datetime import datetime
 import logging
 
+from .budget import Budget
 from .config import Config
 from .extractors.youtube import YouTubeExtractor
-from .extractors.pdf import PDFExtractor
-from .extractors.ocr_image import OCRImageExtractor
 from .extractors.web import WebExtractor
-from .extractors.audio import AudioExtractor
-from .extractors.plain import PlainTextExtractor
 from .glossary import Glossary
-from .processors import (
-    Preprocessor,
-    Translator,
-    Proofreader,
-    Evaluator,
-    Fixer,
-    SpellChecker,
-    DiffProcessor,
-)
-from .pipeline import process_text
+from .jobqueue import open_queue
+from .processors import Preprocessor
+from .processors.quality_gate import QualityGate, load_calibration_samples
+from .server import serve as serve_http
+from .service import Components
+from .worker import default_worker_id, run_worker
+from .profiling import SourceProfiler
+from .metrics import QUEUE_DEPTH, start_http_server
+from .streaming import streaming
+from .tracing import merge_summary, span, tracing
 
 
 def _expand_sources(source_paths: List[str]) -> List[str]:
@@ -44,6 +41,29 @@ def _expand_sources(source_paths: List[str]) -> List[str]:
 
     return list(chain.from_iterable(expand(s) for s in source_paths))
 
+
+class _StreamProgress:
+    """Show the streamed output of the current stage on one terminal line."""
+
+    def __init__(self, width: int = 40) -> None:
+        self.width = width
+        self.stage: Optional[str] = None
+        self.received = ""
+
+    def __call__(self, stage: str, delta: str) -> None:
+        if stage != self.stage:
+            self.finish()
+            self.stage = stage
+        self.received = (self.received + delta)[-self.width:]
+        tail = self.received.replace("\n", " ")
+        click.echo(f"\r  {stage}: …{tail:<{self.width}}", nl=False, err=True)
+
+    def finish(self) -> None:
+        if self.stage is not None:
+            click.echo(err=True)
+            self.stage = None
+            self.received = ""
+
 @click.group()
 def cli():
     """Document Pipeline System - Convert various document formats to readable Japanese text"""
@@ -54,81 +74,92 @@ def cli():
 @click.option("--config", "-c", type=click.Path(exists=True), help="Path to config file")
 @click.option("--output-dir", "-o", type=click.Path(), help="Output directory")
 @click.option("--log-level", type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]), help="Logging level")
-def process(sources: List[str], config: Optional[str], output_dir: Optional[str], log_level: Optional[str]) -> None:
+@click.option("--profile", is_flag=True, help="Write profile.pstats and a collapsed-stack profile.collapsed per source")
+@click.option("--profile-memory", is_flag=True, help="With --profile, record peak memory per stage with tracemalloc")
+@click.option("--stream", is_flag=True, help="Stream LLM responses and show them live (sets stream for all LLM stages)")
+def process(
+    sources: List[str],
+    config: Optional[str],
+    output_dir: Optional[str],
+    log_level: Optional[str],
+    profile: bool = False,
+    profile_memory: bool = False,
+    stream: bool = False,
+) -> None:
     """Process one or more document sources.
 
     Sources can be individual files, URLs, or directories. Directory paths are
-    expanded to all files within the directory (non-recursive).
+    expanded to all files within the directory (non-recursive). final.md is
+    written chunk by chunk as the pipeline finishes them.
     """
     cfg = Config.load(config)
     if output_dir:
         cfg.output_dir = Path(output_dir)
     if log_level:
         cfg.log_level = log_level
+    if stream:
+        cfg.translator.stream = cfg.proofreader.stream = cfg.diff_processor.stream = True
     logging.basicConfig(level=getattr(logging, cfg.log_level.upper(), logging.INFO))
 
     sources = _expand_sources(list(sources))
+    if cfg.metrics.enabled:
+        try:
+            server = start_http_server(cfg.metrics.port, cfg.metrics.host)
+            click.echo(f"Serving metrics on http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+        except OSError as e:
+            click.echo(f"Metrics disabled: {e}", err=True)
     
-    # Initialize extractors
-    extractors = [
-        YouTubeExtractor(cfg.temp_dir),
-        WebExtractor(),
-        PDFExtractor(),
-        # OCRPDFExtractor(),  # Temporarily disabled due to missing marker-ocr-pdf
-        OCRImageExtractor(),
-        AudioExtractor(cfg.whisper.model),
-        PlainTextExtractor(),
-        # TODO: Add other extractors
+    components = Components.from_config(cfg)
+    extractors = components.extractors
+
+    # Fetch web pages concurrently up front; other sources are extracted in the loop
+    prefetched = {}
+    web_extractor = next((e for e in extractors if isinstance(e, WebExtractor)), None)
+    youtube_extractor = next((e for e in extractors if isinstance(e, YouTubeExtractor)), None)
+    web_sources = [
+        s for s in sources
+        if web_extractor is not None
+        and web_extractor.can_handle(s)
+        and not (youtube_extractor is not None and youtube_extractor.can_handle(s))
     ]
-    preprocessor = Preprocessor()
-    glossary = None
-    if cfg.glossary.enabled and cfg.glossary.path:
-        try:
-            glossary = Glossary(str(cfg.glossary.path))
-        except Exception as exc:  # pragma: no cover - CLI only
-            click.echo(f"Failed to load glossary: {exc}")
-    translator = Translator(
-        cfg.translator.model,
-        cfg.translator.temperature,
-        cfg.translator.prompt,
-        glossary=glossary,
-    )
-    proofreader = Proofreader(
-        cfg.proofreader.model,
-        cfg.proofreader.style,
-        cfg.proofreader.temperature,
-        cfg.proofreader.prompt,
-        glossary=glossary,
-    )
-    evaluator = Evaluator()
+    if len(web_sources) > 1 and hasattr(web_extractor, "extract_many"):
+        click.echo(f"Fetching {len(web_sources)} web pages")
+        with tracing() as prefetch_tracer, span("prefetch", sources=len(web_sources)):
+            prefetched = web_extractor.extract_many(web_sources)
 
-    fixer = Fixer(cfg.enable_markdown_headings, glossary=glossary)
-    spellchecker = SpellChecker()
-    
     # Process each source
     index_counter = 1
+    profiler = SourceProfiler(memory=profile_memory) if profile or profile_memory else None
+    run_budget = Budget.for_run(cfg.pipeline, cfg.llm.prices)
+    # ソース種別ごとの段階別集計（ホットパスの把握用）
+    run_summary: Dict[str, Dict[str, Dict[str, float]]] = {}
+    if prefetched:
+        run_summary["web"] = prefetch_tracer.summary()
     with click.progressbar(sources, label="Processing sources") as bar:
-        for source in bar:
+        for position, source in enumerate(bar):
+            QUEUE_DEPTH.set(len(sources) - position, queue="sources")
             click.echo(f"Processing: {source}")
+            if profiler is not None:
+                profiler.start()
 
             # Try all extractors that claim they can handle the source
             result = None
-            for extractor in [e for e in extractors if e.can_handle(source)]:
+            prefetched_result = prefetched.pop(source, None)
+            if isinstance(prefetched_result, Exception):
+                click.echo(
+                    f"Extractor {web_extractor.__class__.__name__} failed: {prefetched_result}",
+                    err=True,
+                )
+            elif prefetched_result is not None:
+                result = prefetched_result
+            with tracing() as source_tracer:
                 try:
-                    result = extractor.extract(source)
-                    break
-                except Exception as e:  # pragma: no cover - passthrough errors
-                    click.echo(
-                        f"Extractor {extractor.__class__.__name__} failed: {e}",
-                        err=True,
-                    )
-
-            if result is None:
-                click.echo(f"Error: No extractor succeeded for {source}", err=True)
-                continue
-
-            # Preprocess text
-            text = preprocessor.process(result["text"])
+                    result, text = components.load(source, extracted=result)
+                except ValueError as e:
+                    click.echo(f"Error: {e}", err=True)
+                    if profiler is not None:
+                        profiler.stop()
+                    continue
 
             # Generate meaningful filename using metadata and yymmdd format
             timestamp = datetime.now().strftime("%y%m%d")
@@ -215,47 +246,205 @@ def process(sources: List[str], config: Optional[str], output_dir: Optional[str]
             
             click.echo(f"Saved original files to: {case_dir}")
 
-            # Initialize DiffProcessor with case-specific temp directory
-            diff_processor = None
-            if cfg.diff_processor.enabled:
-                try:
-                    diff_processor = DiffProcessor(
-                        model=cfg.diff_processor.model,
-                        max_chunk_size=cfg.diff_processor.max_chunk_size,
-                        max_retries=cfg.diff_processor.max_retries,
-                        output_history=cfg.diff_processor.output_history,
-                        history_dir=cfg.diff_processor.history_dir,
-                        improvement_focus=cfg.diff_processor.improvement_focus,
-                        temp_dir=str(temp_dir),  # Pass case-specific temp directory
-                    )
-                    click.echo("DiffProcessor initialized successfully")
-                except Exception as e:
-                    click.echo(f"Failed to initialize DiffProcessor: {e}", err=True)
-
             # Run processing pipeline with quality control
-            pipeline_result = process_text(
-                text,
-                cfg,
-                translator,
-                proofreader,
-                evaluator,
-                fixer,
-                spellchecker,
-                diff_processor,
-            )
-            result["text"] = pipeline_result["text"]
-            result["metadata"].update(pipeline_result["metadata"])
-
-            # Save final processed text
             final_file = case_dir / "final.md"
-            final_file.write_text(result['text'], encoding='utf-8')
+            progress = _StreamProgress()
+            with open(final_file, "w", encoding="utf-8") as final_out, streaming(progress):
+
+                def write_piece(piece: str) -> None:
+                    # 評価を終えたチャンクから順に追記する
+                    final_out.write(piece)
+                    final_out.flush()
+                    progress.finish()
+
+                result = components.process(
+                    result,
+                    text,
+                    source_tracer.summary(),
+                    on_chunk=write_piece,
+                    budget=run_budget,
+                    temp_dir=str(temp_dir),  # case-specific history files
+                )
+            progress.finish()
+            merge_summary(run_summary.setdefault(source_type, {}), result["metadata"]["trace"])
 
             # Save final metadata
             final_meta_file = case_dir / "final_metadata.json"
             final_meta_file.write_text(json.dumps(result['metadata'], indent=2), encoding='utf-8')
 
             click.echo(f"Successfully processed: {final_file}")
+            if profiler is not None:
+                profiler.stop()
+                paths = profiler.dump(case_dir)
+                click.echo(f"Profile: {paths['pstats']} (flamegraph stacks: {paths['collapsed']})")
+                if profiler.peak_memory is not None:
+                    click.echo(f"Peak traced memory: {profiler.peak_memory / 2**20:.1f} MiB")
             index_counter += 1
 
+    QUEUE_DEPTH.set(0, queue="sources")
+    if run_summary:
+        cfg.output_dir.mkdir(parents=True, exist_ok=True)
+        summary_file = cfg.output_dir / "trace_summary.json"
+        summary_file.write_text(json.dumps(run_summary, indent=2), encoding="utf-8")
+        click.echo(f"Stage timings per source type: {summary_file}")
+
+@cli.command()
+@click.option("--config", "-c", type=click.Path(exists=True), help="Path to config file")
+@click.option("--host", help="Bind address (default: serve.host)")
+@click.option("--port", type=int, help="Port (default: serve.port)")
+@click.option("--stream", is_flag=True, help="Stream LLM responses to the job event streams")
+def serve(config: Optional[str], host: Optional[str], port: Optional[int], stream: bool = False) -> None:
+    """Serve the pipeline over HTTP with warm extractors and processors.
+
+    Documents are submitted with POST /jobs and processed in the background,
+    at most `serve.max_concurrent_jobs` at a time. Poll GET /jobs/{id} or
+    follow GET /jobs/{id}/events for the result.
+    """
+    cfg = Config.load(config)
+    if host:
+        cfg.serve.host = host
+    if port is not None:
+        cfg.serve.port = port
+    if stream:
+        cfg.translator.stream = cfg.proofreader.stream = cfg.diff_processor.stream = True
+    logging.basicConfig(level=getattr(logging, cfg.log_level.upper(), logging.INFO))
+    click.echo(f"Loading processors and serving on http://{cfg.serve.host}:{cfg.serve.port}")
+    try:
+        serve_http(cfg)
+    except ImportError as e:
+        raise click.ClickException(str(e))
+
+@cli.command()
+@click.argument("sources", nargs=-1, required=True)
+@click.option("--config", "-c", type=click.Path(exists=True), help="Path to config file")
+def enqueue(sources: List[str], config: Optional[str]) -> None:
+    """Add sources to the job queue for `text-agent worker`.
+
+    Directories and urls.txt files are expanded as for `process`. Local
+    paths are stored as given, so they must be readable from the workers.
+    """
+    cfg = Config.load(config)
+    queue = open_queue(cfg.queue)
+    job_ids = queue.enqueue(_expand_sources(list(sources)))
+    counts = queue.counts()
+    click.echo(f"Queued {len(job_ids)} jobs ({counts['queued']} waiting, {counts['running']} running)")
+
+@cli.command()
+@click.option("--config", "-c", type=click.Path(exists=True), help="Path to config file")
+@click.option("--output-dir", "-o", type=click.Path(), help="Output directory")
+@click.option("--worker-id", help="Name recorded on claimed jobs (default: host-pid)")
+@click.option("--exit-when-empty", is_flag=True, help="Stop when no job can be claimed instead of waiting")
+@click.option("--max-jobs", type=int, help="Stop after this many jobs")
+def worker(
+    config: Optional[str],
+    output_dir: Optional[str],
+    worker_id: Optional[str],
+    exit_when_empty: bool = False,
+    max_jobs: Optional[int] = None,
+) -> None:
+    """Process queued jobs with warm extractors and processors.
+
+    Start any number of workers on hosts that share the queue directory.
+    Each result goes to OUTPUT_DIR/<job id>/final.md; jobs of a worker that
+    stops sending heartbeats are claimed again after `queue.lease_seconds`.
+    Each job is limited by the `max_document_*` budgets; the `max_run_*`
+    budgets apply to `process` runs only.
+    """
+    cfg = Config.load(config)
+    if output_dir:
+        cfg.output_dir = Path(output_dir)
+    logging.basicConfig(level=getattr(logging, cfg.log_level.upper(), logging.INFO))
+    if cfg.metrics.enabled:
+        try:
+            server = start_http_server(cfg.metrics.port, cfg.metrics.host)
+            click.echo(f"Serving metrics on http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+        except OSError as e:
+            click.echo(f"Metrics disabled: {e}", err=True)
+    queue = open_queue(cfg.queue)
+    worker_id = worker_id or default_worker_id()
+    components = Components.from_config(cfg)
+    click.echo(f"Worker {worker_id} waiting for jobs in {cfg.queue.path}")
+    try:
+        processed = run_worker(
+            queue,
+            components,
+            cfg.output_dir,
+            worker_id,
+            heartbeat_interval=cfg.queue.heartbeat_interval,
+            poll_interval=cfg.queue.poll_interval,
+            exit_when_empty=exit_when_empty,
+            max_jobs=max_jobs,
+        )
+    except KeyboardInterrupt:
+        # 処理中のジョブはリース切れ後に他のワーカーが引き継ぐ
+        click.echo(f"Worker {worker_id} interrupted", err=True)
+        return
+    click.echo(f"Worker {worker_id} processed {processed} jobs")
+
+@cli.command("queue-status")
+@click.option("--config", "-c", type=click.Path(exists=True), help="Path to config file")
+@click.option("--failed", is_flag=True, help="List failed jobs with their errors")
+def queue_status(config: Optional[str], failed: bool = False) -> None:
+    """Show how many queued jobs are waiting, running, done and failed."""
+    cfg = Config.load(config)
+    queue = open_queue(cfg.queue)
+    counts = queue.counts()
+    click.echo(", ".join(f"{status}: {n}" for status, n in counts.items()))
+    if failed:
+        for job in queue.jobs("failed"):
+            click.echo(f"{job['id']} {job['source']} ({job['attempts']} attempts): {job['error']}")
+
+@cli.command("compile-glossary")
+@click.argument("source", type=click.Path(exists=True, dir_okay=False))
+@click.argument("artifact", type=click.Path(dir_okay=False))
+def compile_glossary(source: str, artifact: str) -> None:
+    """Precompile a CSV/YAML glossary into a memory-mappable artifact."""
+    glossary = Glossary(source)
+    try:
+        glossary.compile(artifact)
+    except OSError as e:
+        raise click.ClickException(f"Could not write {artifact}: {e}")
+    click.echo(f"Compiled {len(glossary.mapping)} glossary terms to {artifact}")
+
+@cli.command("preprocess")
+@click.argument("source", type=click.Path(exists=True, dir_okay=False))
+@click.argument("output", type=click.Path(dir_okay=False), default="-")
+def preprocess(source: str, output: str) -> None:
+    """Stream a large plain-text file through the preprocessor.
+
+    Paragraphs are written as soon as they are complete, so memory use stays
+    flat for transcripts and OCR dumps of any size. Writes to stdout unless
+    OUTPUT is given.
+    """
+    preprocessor = Preprocessor()
+    with open(source, "r", encoding="utf-8") as src, click.open_file(output, "w", encoding="utf-8") as dst:
+        for i, paragraph in enumerate(preprocessor.iter_paragraphs(src)):
+            if i:
+                dst.write("\n\n")
+            dst.write(paragraph)
+        dst.write("\n")
+
+@cli.command("calibrate-gate")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--output", "-o", type=click.Path(dir_okay=False), default="quality_gate.json", show_default=True, help="Calibration file to write")
+@click.option("--coverage", type=click.FloatRange(0.0, 1.0), default=0.95, show_default=True, help="Share of past chunks the margin must cover")
+def calibrate_gate(paths: List[str], output: str, coverage: float) -> None:
+    """Fit the cheap quality gate on past final_metadata.json files.
+
+    PATHS are metadata files or output directories, searched recursively.
+    Point `pipeline.quality_gate_calibration` at the written file.
+    """
+    samples = load_calibration_samples(paths)
+    try:
+        gate = QualityGate.fit(samples, coverage=coverage)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    gate.save(output)
+    click.echo(
+        f"Fitted quality gate on {len(samples)} chunks: "
+        f"quality = {gate.slope:.3f} * readability + {gate.intercept:.3f}, margin {gate.margin:.3f}"
+    )
+    click.echo(f"Saved calibration to {output}")
+
 if __name__ == '__main__':
     cli() 
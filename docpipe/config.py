@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 try:  # optional dependency
     import yaml  # type: ignore
@@ -14,16 +14,53 @@ class PipelineConfig(BaseModel):
     language_tool_threshold: float = 0.02
     bleu_threshold: float = 35.0
     diff_improvement_threshold: float = 0.7
+    # 安価な品質推定で明らかな不合格のみ判定し、合格し得るチャンクは LanguageTool で評価する
+    quality_gate: bool = False
+    quality_gate_margin: float = 0.05
+    quality_gate_calibration: Optional[Path] = None  # calibrate-gate で作成した JSON
+    # 予算（None は無制限）。使い切るとリトライと DiffProcessor を打ち切る
+    max_document_tokens: Optional[int] = None
+    max_document_cost: Optional[float] = None  # USD
+    max_document_seconds: Optional[float] = None
+    # 1回の process 全体。serve と worker には「実行」がないので使わない
+    max_run_tokens: Optional[int] = None
+    max_run_cost: Optional[float] = None  # USD
+    max_run_seconds: Optional[float] = None
+
+class MetricsConfig(BaseModel):
+    enabled: bool = False  # Prometheus 形式の /metrics を公開する
+    host: str = "127.0.0.1"
+    port: int = 9108
+
+class ServeConfig(BaseModel):
+    host: str = "127.0.0.1"
+    port: int = 8000
+    max_concurrent_jobs: int = 2  # 同時に処理する文書数
+    max_queued_jobs: int = 100  # 超えた投入は 503 で断る
+    job_ttl: float = 3600.0  # 完了したジョブの結果を保持する秒数
+    allow_local_sources: bool = False  # サーバー上のファイルパスを source として受け付ける
+
+class QueueConfig(BaseModel):
+    backend: str = "sqlite"  # jobqueue.BACKENDS のキー
+    path: Path = Path("queue/jobs.sqlite3")  # 全ワーカーから見える共有ディレクトリに置く
+    lease_seconds: float = 300.0  # ハートビートが途絶えてから再取得されるまでの秒数
+    heartbeat_interval: float = 60.0
+    max_attempts: int = 3
+    poll_interval: float = 2.0  # キューが空のときの待ち時間
 
 class LLMConfig(BaseModel):
     profile: str = "default"  # "default" or "local"
     model: str = "gpt-4.1-mini"
     temperature: float = 0.7
+    # モデル名（前方一致）ごとの料金: 100万トークンあたりの USD [入力, 出力]
+    prices: Dict[str, List[float]] = {}
 
 class TranslatorConfig(BaseModel):
     model: str = "gpt-4"
     temperature: float = 0.7
     enabled: bool = True  # 翻訳の有効/無効を制御
+    glossary_in_prompt: bool = False  # チャンクに出現する用語集の対訳のみをプロンプトに追加
+    stream: bool = False  # 応答をストリーミングで受け取り進捗を表示する
     prompt: str = (
         "Translate the following text to {target_lang}:\n{text}\n"
         "翻訳結果のみを返してください。"
@@ -34,6 +71,10 @@ class ProofreaderConfig(BaseModel):
     style: str = "general"
     temperature: float = 0.0
     enabled: bool = True
+    stream: bool = False  # 候補が 1 つのときのみ有効
+    # 2 以上で校正候補を並列に取得し、評価が最も高いものを採用する
+    candidates: int = 1
+    candidate_temperatures: List[float] = []  # 指定時は温度ごとに並列リクエスト（n は使わない）
     prompt: str = (
         "Proofread the following text. Fix grammar, style, and readability "
         "issues in {style} style. 文の意味を変えないこと。未知の用語はそのまま残すこと。"
@@ -42,6 +83,7 @@ class ProofreaderConfig(BaseModel):
 
 class DiffProcessorConfig(BaseModel):
     enabled: bool = True
+    stream: bool = False
     model: str = "gpt-4"
     max_chunk_size: int = 2000
     max_retries: int = 3
@@ -49,13 +91,26 @@ class DiffProcessorConfig(BaseModel):
     history_dir: str = "output_history"
     improvement_focus: str = "advanced_style"  # advanced_style, grammar_style, business_style
 
+class FixerConfig(BaseModel):
+    rules_path: Optional[Path] = None  # YAML file with extra replacement rules (speech/typos/punctuation)
+
 class WhisperConfig(BaseModel):
     model: str = "large"
     language: Optional[str] = None
 
+class WebConfig(BaseModel):
+    max_connections: int = 16
+    per_host_limit: int = 4
+    timeout: float = 30.0
+    cache_dir: Optional[Path] = None  # ETag/Last-Modified cache, disabled when empty
+    extraction_mode: str = "default"  # "default" or "single_pass" (bare_extraction in a process pool)
+    parse_workers: Optional[int] = None  # parser processes for single_pass, defaults to CPU count
+
 class GlossaryConfig(BaseModel):
     path: Optional[Path] = None
     enabled: bool = False
+    artifact_path: Optional[Path] = None  # precompiled matcher shared read-only by workers
+    reload_interval: float = 5.0  # seconds between source mtime checks, 0 disables reload
 
 
 class Config(BaseModel):
@@ -64,8 +119,13 @@ class Config(BaseModel):
     translator: TranslatorConfig = TranslatorConfig()
     proofreader: ProofreaderConfig = ProofreaderConfig()
     diff_processor: DiffProcessorConfig = DiffProcessorConfig()
+    fixer: FixerConfig = FixerConfig()
     whisper: WhisperConfig = WhisperConfig()
     glossary: GlossaryConfig = GlossaryConfig()
+    web: WebConfig = WebConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    serve: ServeConfig = ServeConfig()
+    queue: QueueConfig = QueueConfig()
     output_dir: Path = Path("output")
     temp_dir: Path = Path("temp")
     log_dir: Path = Path("logs")
@@ -0,0 +1,198 @@
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .utils.markdown_utils import (
+    clean_for_evaluation,
+    extract_critical_markdown_blocks,
+    is_markdown_file,
+    restore_critical_markdown_blocks,
+)
+from .utils.text_utils import TextChunk, chunk_text, join_chunks
+
+# タイムスタンプ "[12.3-15.0]" や話者ラベル "speaker_1:" を含む音声認識テキスト
+_SPEECH = re.compile(r"speaker_[12]:|\[[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\]")
+_PYTHON = re.compile(
+    r"import\s+\w+|from\s+\w+\s+import|def\s+\w+\s*\(|class\s+\w+|#\s*spdx-|__all__\s*=",
+    re.IGNORECASE,
+)
+
+
+class TextFormat(NamedTuple):
+    markdown: bool
+    speech: bool
+    python: bool
+
+
+def is_speech_text(text: str) -> bool:
+    """Check if the text appears to be speech recognition output."""
+    return _SPEECH.search(text) is not None
+
+
+def is_python_code(text: str) -> bool:
+    """Check if the text appears to be Python source code."""
+    return _PYTHON.search(text) is not None
+
+
+def detect_format(text: str) -> TextFormat:
+    return TextFormat(is_markdown_file(text), is_speech_text(text), is_python_code(text))
+
+
+class Chunk(str):
+    """Text of one chunk plus what the pipeline stages know about it.
+
+    A ``Chunk`` is a ``str``, so any processor can take it as plain text.
+    Processors that know about it reuse the format flags and the protected
+    form (critical Markdown blocks replaced by placeholders) instead of
+    detecting them again. ``chunk_id``, the source offsets and the flags are
+    kept when a stage replaces the text with :meth:`with_text`; the
+    protected form is computed once per text.
+    """
+
+    chunk_id: str
+    start: int
+    end: int
+
+    def __new__(
+        cls,
+        text: str,
+        chunk_id: str = "c0000",
+        start: int = 0,
+        end: Optional[int] = None,
+        flags: Optional[TextFormat] = None,
+    ) -> "Chunk":
+        self = super().__new__(cls, text)
+        self.chunk_id = chunk_id
+        self.start = start
+        self.end = start + len(text) if end is None else end
+        self._flags = flags
+        self._protected: Optional[Tuple[str, Dict[str, str]]] = None
+        self._evaluation_text: Optional[str] = None
+        return self
+
+    @property
+    def text(self) -> str:
+        return str.__str__(self)
+
+    def with_text(self, text: str) -> "Chunk":
+        """Return this chunk with ``text``, keeping its ID and format flags."""
+        if text == self:
+            return self
+        return Chunk(text, self.chunk_id, self.start, self.end, self._flags)
+
+    @property
+    def flags(self) -> TextFormat:
+        if self._flags is None:
+            self._flags = detect_format(self)
+        return self._flags
+
+    @property
+    def markdown(self) -> bool:
+        return self.flags.markdown
+
+    @property
+    def speech(self) -> bool:
+        return self.flags.speech
+
+    @property
+    def python(self) -> bool:
+        return self.flags.python
+
+    @property
+    def protected(self) -> Tuple[str, Dict[str, str]]:
+        """``(text with placeholders, placeholder map)`` for the current text."""
+        if self._protected is None:
+            if self.markdown:
+                self._protected = extract_critical_markdown_blocks(self.text)
+            else:
+                self._protected = (self.text, {})
+        return self._protected
+
+    @property
+    def blocks(self) -> Dict[str, str]:
+        return self.protected[1]
+
+    def restore(self, text: str) -> str:
+        """Put the protected blocks back into ``text``."""
+        blocks = self.blocks
+        return restore_critical_markdown_blocks(text, blocks) if blocks else text
+
+    @property
+    def evaluation_text(self) -> str:
+        """Text content used by the quality metrics, without Markdown blocks."""
+        if self._evaluation_text is None:
+            if self.markdown:
+                self._evaluation_text = clean_for_evaluation(self.protected[0])
+            else:
+                self._evaluation_text = self.text
+        return self._evaluation_text
+
+
+def _chunk_format(text: str, source: Optional[TextFormat]) -> TextFormat:
+    flags = detect_format(text)
+    if source is not None and source.markdown and not flags.markdown:
+        return flags._replace(markdown=True)
+    return flags
+
+
+def as_chunk(text: Union[str, Chunk]) -> Chunk:
+    """Return ``text`` itself if it is a :class:`Chunk`, else wrap it."""
+    return text if isinstance(text, Chunk) else Chunk(text)
+
+
+class Document:
+    """Source text split once into chunks with stable IDs and format flags."""
+
+    def __init__(self, text: str, chunks: List[Chunk]) -> None:
+        self.text = text
+        self.chunks = chunks
+
+    @classmethod
+    def from_text(cls, text: str, max_tokens: int = 2048, model: Optional[str] = None) -> "Document":
+        """Chunk ``text`` and detect each chunk's format once.
+
+        Speech and Python code are detected per chunk, so one code-like line
+        does not send the whole document down the code paths. A Markdown
+        source (``text`` as a :class:`Chunk` flagged at extraction time)
+        keeps every chunk in Markdown mode, even one without Markdown syntax.
+        """
+        flags = text.flags if isinstance(text, Chunk) else None
+        spans = chunk_text(text, max_tokens, model)
+        if len(spans) == 1:
+            # a single chunk keeps the surrounding whitespace as before
+            chunk = text if isinstance(text, Chunk) else Chunk(text, flags=detect_format(text))
+            return cls(text, [chunk])
+        return cls(
+            text,
+            [
+                Chunk(span.text, f"c{i:04d}", span.start, span.end, _chunk_format(span.text, flags))
+                for i, span in enumerate(spans)
+            ],
+        )
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def piece(self, index: int, output: str) -> str:
+        """``output`` of chunk ``index`` with the original text around it.
+
+        Concatenating the pieces of all chunks in order gives :meth:`join`,
+        so a writer can append each chunk as soon as it is finished.
+        """
+        if len(self.chunks) == 1:
+            return output
+        chunk = self.chunks[index]
+        start = self.chunks[index - 1].end if index else 0
+        piece = self.text[start:chunk.start] + output
+        if index == len(self.chunks) - 1:
+            piece += self.text[chunk.end:]
+        return piece
+
+    def join(self, outputs: Sequence[str]) -> str:
+        """Put processed chunk texts back in place, keeping the text between chunks."""
+        if len(self.chunks) == 1:
+            return outputs[0]
+        spans = [TextChunk(c.text, c.start, c.end) for c in self.chunks]
+        return join_chunks(self.text, spans, outputs)
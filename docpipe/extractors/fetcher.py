@@ -0,0 +1,267 @@
+import asyncio
+import gzip
+import hashlib
+import http.client
+import json
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, TypedDict
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_USER_AGENT = "text-agent/0.1 (+https://github.com/kamiyamazgc/text_agent)"
+MAX_REDIRECTS = 5
+
+
+class FetchResult(TypedDict):
+    url: str
+    status: int
+    content: Optional[bytes]
+    from_cache: bool
+    error: Optional[str]
+
+
+class HTTPCache:
+    """On-disk HTTP cache storing bodies with their ETag/Last-Modified validators."""
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.body", self.cache_dir / f"{key}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, str]]:
+        """Return stored validators for ``url`` or ``None`` when not cached."""
+        body_path, meta_path = self._paths(url)
+        if not (body_path.exists() and meta_path.exists()):
+            return None
+        try:
+            return json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def read_body(self, url: str) -> Optional[bytes]:
+        body_path, _ = self._paths(url)
+        try:
+            return body_path.read_bytes()
+        except OSError:
+            return None
+
+    def store(self, url: str, body: bytes, headers: Dict[str, str]) -> None:
+        """Store ``body`` when the response carries a validator."""
+        meta = {
+            k: v
+            for k, v in (
+                ("etag", headers.get("etag")),
+                ("last_modified", headers.get("last-modified")),
+            )
+            if v
+        }
+        if not meta:
+            return
+        meta["url"] = url
+        body_path, meta_path = self._paths(url)
+        # write body first so a readable meta file always has its body
+        tmp = body_path.with_suffix(".tmp")
+        tmp.write_bytes(body)
+        tmp.replace(body_path)
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    @staticmethod
+    def conditional_headers(meta: Dict[str, str]) -> Dict[str, str]:
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+
+def _decode_body(body: bytes, encoding: str) -> bytes:
+    """Undo the ``Content-Encoding`` of a response body."""
+    if not body:
+        # 304 や 204 は Content-Encoding が付いていても本文が空
+        return body
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        # zlib ヘッダ付き（規格どおり）と生の deflate の両方が使われている
+        try:
+            return zlib.decompressobj(zlib.MAX_WBITS | 32).decompress(body)
+        except zlib.error:
+            return zlib.decompressobj(-zlib.MAX_WBITS).decompress(body)
+    return body
+
+
+class _ConnectionPool:
+    """Thread-safe keep-alive connection pool keyed by scheme, host and port."""
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(
+        self, scheme: str, host: str, port: int, fresh: bool = False
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return a connection and whether it was reused from the pool."""
+        key = (scheme, host, port)
+        if not fresh:
+            with self._lock:
+                idle = self._idle.get(key)
+                if idle:
+                    return idle.pop(), True
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout), False
+        return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+
+    def release(self, scheme: str, host: str, port: int, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._idle.setdefault((scheme, host, port), []).append(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+
+
+class WebFetcher:
+    """Concurrent HTTP fetcher with connection reuse and per-host limits.
+
+    Requests run on a thread pool driven from asyncio so many downloads can be
+    in flight while the caller consumes completed ones. Responses carrying an
+    ``ETag`` or ``Last-Modified`` header are cached on disk when ``cache_dir``
+    is given, and later fetches revalidate them with conditional requests.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 16,
+        per_host_limit: int = 4,
+        timeout: float = 30.0,
+        cache_dir: Optional[Path] = None,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ) -> None:
+        self.max_connections = max(1, max_connections)
+        self.per_host_limit = max(1, per_host_limit)
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.cache = HTTPCache(cache_dir) if cache_dir else None
+        self._pool = _ConnectionPool(timeout)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_connections, thread_name_prefix="web-fetch"
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._global_limit = asyncio.Semaphore(self.max_connections)
+
+    def _request(
+        self, url: str, headers: Dict[str, str]
+    ) -> Tuple[int, bytes, Dict[str, str], str]:
+        """Blocking GET following redirects; returns status, body, headers and final URL."""
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            scheme = parts.scheme.lower()
+            port = parts.port or (443 if scheme == "https" else 80)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            request_headers = {
+                "Host": parts.netloc,
+                "User-Agent": self.user_agent,
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive",
+                **headers,
+            }
+
+            host = parts.hostname or ""
+            conn, reused = self._pool.acquire(scheme, host, port)
+            try:
+                conn.request("GET", path, headers=request_headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                if not reused:
+                    raise
+                # the server may have dropped an idle keep-alive connection
+                conn, _ = self._pool.acquire(scheme, host, port, fresh=True)
+                try:
+                    conn.request("GET", path, headers=request_headers)
+                    resp = conn.getresponse()
+                    body = resp.read()
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    raise
+            resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            if resp.will_close:
+                conn.close()
+            else:
+                self._pool.release(scheme, host, port, conn)
+
+            if resp.status in (301, 302, 303, 307, 308) and "location" in resp_headers:
+                url = urljoin(url, resp_headers["location"])
+                continue
+
+            body = _decode_body(body, resp_headers.get("content-encoding", "").lower())
+            return resp.status, body, resp_headers, url
+        raise RuntimeError(f"Too many redirects: {url}")
+
+    def _fetch_blocking(self, url: str) -> FetchResult:
+        meta = self.cache.get(url) if self.cache else None
+        headers = HTTPCache.conditional_headers(meta) if meta else {}
+        try:
+            status, body, resp_headers, _ = self._request(url, headers)
+            if status == 304 and self.cache is not None:
+                cached = self.cache.read_body(url)
+                if cached is not None:
+                    return {"url": url, "status": 200, "content": cached, "from_cache": True, "error": None}
+                # cache body vanished; fetch unconditionally
+                status, body, resp_headers, _ = self._request(url, {})
+        except Exception as exc:
+            return {"url": url, "status": 0, "content": None, "from_cache": False, "error": str(exc)}
+
+        if status != 200:
+            return {
+                "url": url,
+                "status": status,
+                "content": None,
+                "from_cache": False,
+                "error": f"HTTP {status}",
+            }
+        if self.cache is not None:
+            self.cache.store(url, body, resp_headers)
+        return {"url": url, "status": status, "content": body, "from_cache": False, "error": None}
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def fetch(self, url: str) -> FetchResult:
+        """Fetch ``url`` respecting the global and per-host concurrency limits."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # semaphores are bound to the loop that first waits on them
+            self._loop = loop
+            self._host_limits = {}
+            self._global_limit = asyncio.Semaphore(self.max_connections)
+        async with self._host_limit(url), self._global_limit:
+            return await loop.run_in_executor(self._executor, self._fetch_blocking, url)
+
+    async def fetch_all(self, urls: Iterable[str]) -> List[FetchResult]:
+        return list(await asyncio.gather(*(self.fetch(u) for u in urls)))
+
+    def fetch_sync(self, url: str) -> FetchResult:
+        """Blocking single fetch sharing the pool and cache."""
+        return self._fetch_blocking(url)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._pool.close()
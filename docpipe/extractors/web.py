@@ -1,4 +1,8 @@
-from typing import Dict, Any
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Union
 
 try:
     import trafilatura  # type: ignore
@@ -8,11 +12,76 @@ except Exception:  # pragma: no cover - optional dependency
     extract_metadata = None  # type: ignore
 
 from .base import BaseExtractor
+from .fetcher import WebFetcher
+
+METADATA_FIELDS = ("title", "author", "hostname", "description", "sitename", "date")
+
+
+def parse_single_pass(downloaded: Union[str, bytes], source: str) -> Dict[str, Any]:
+    """Extract text and metadata from one HTML document with a single parse.
+
+    Module level so it can run in a :class:`ProcessPoolExecutor` worker.
+    """
+    if trafilatura is None:
+        raise ImportError("trafilatura is required for web extraction")
+    doc = trafilatura.bare_extraction(
+        downloaded,
+        url=source,
+        with_metadata=True,
+        include_comments=False,
+        include_tables=False,
+    )
+    if doc is None:
+        raise RuntimeError(f"Failed to extract content from {source}")
+    # trafilatura 2.xはDocument、1.xは辞書を返す
+    if isinstance(doc, dict):
+        values = doc
+    else:
+        values = {k: getattr(doc, k, None) for k in ("text",) + METADATA_FIELDS}
+    text = values.get("text")
+    if not text:
+        raise RuntimeError(f"Failed to extract content from {source}")
+
+    metadata: Dict[str, Any] = {"source_type": "web", "url": source}
+    for attr in METADATA_FIELDS:
+        if values.get(attr):
+            metadata[attr] = values[attr]
+    return {"text": text, "metadata": metadata}
 
 
 class WebExtractor(BaseExtractor):
     """Extractor for web pages using trafilatura."""
 
+    def __init__(
+        self,
+        max_connections: int = 16,
+        per_host_limit: int = 4,
+        timeout: float = 30.0,
+        cache_dir: Optional[Path] = None,
+        extraction_mode: str = "default",
+        parse_workers: Optional[int] = None,
+    ) -> None:
+        if extraction_mode not in ("default", "single_pass"):
+            raise ValueError(f"Unsupported extraction mode: {extraction_mode}")
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.extraction_mode = extraction_mode
+        self.parse_workers = parse_workers
+        self._fetcher: Optional[WebFetcher] = None
+
+    @property
+    def fetcher(self) -> WebFetcher:
+        if self._fetcher is None:
+            self._fetcher = WebFetcher(
+                max_connections=self.max_connections,
+                per_host_limit=self.per_host_limit,
+                timeout=self.timeout,
+                cache_dir=self.cache_dir,
+            )
+        return self._fetcher
+
     def can_handle(self, source: str) -> bool:
         """Check if the source is a URL."""
         return source.lower().startswith("http://") or source.lower().startswith("https://")
@@ -22,10 +91,69 @@ class WebExtractor(BaseExtractor):
         if trafilatura is None:
             raise ImportError("trafilatura is required for web extraction")
 
-        downloaded = trafilatura.fetch_url(source)
+        fetched = None
+        if self.cache_dir is not None:
+            fetched = self.fetcher.fetch_sync(source)
+            downloaded = fetched["content"]
+        else:
+            downloaded = trafilatura.fetch_url(source)
         if not downloaded:
             raise RuntimeError(f"Failed to fetch URL: {source}")
 
+        if self.extraction_mode == "single_pass":
+            result = parse_single_pass(downloaded, source)
+        else:
+            result = self._parse(downloaded, source)
+        if fetched is not None:
+            result["metadata"]["http_cache_hit"] = fetched["from_cache"]
+        return result
+
+    def extract_many(self, sources: Iterable[str]) -> Dict[str, Union[Dict[str, Any], Exception]]:
+        """Fetch and extract many URLs concurrently.
+
+        Downloads go through the pooled :class:`WebFetcher`; each page is
+        handed to a parser as soon as it arrives so network I/O and
+        trafilatura parsing overlap. In ``single_pass`` mode pages are parsed
+        once with ``bare_extraction`` in a process pool of ``parse_workers``
+        processes, otherwise parsing runs on threads. Returns a mapping from
+        URL to the extraction result, or to the exception raised for that URL.
+        """
+        if trafilatura is None:
+            raise ImportError("trafilatura is required for web extraction")
+        urls = list(dict.fromkeys(sources))
+        if not urls:
+            return {}
+        if self.extraction_mode == "single_pass":
+            workers = min(self.parse_workers or os.cpu_count() or 1, len(urls))
+            with ProcessPoolExecutor(max_workers=workers) as parser:
+                return asyncio.run(self._extract_many(urls, parser, parse_single_pass))
+        with ThreadPoolExecutor(thread_name_prefix="web-parse") as parser:
+            return asyncio.run(self._extract_many(urls, parser, self._parse))
+
+    async def _extract_many(
+        self,
+        urls: Iterable[str],
+        parser: Executor,
+        parse: Callable[[Union[str, bytes], str], Dict[str, Any]],
+    ) -> Dict[str, Union[Dict[str, Any], Exception]]:
+        loop = asyncio.get_running_loop()
+
+        async def fetch_then_parse(url: str) -> Union[Dict[str, Any], Exception]:
+            fetched = await self.fetcher.fetch(url)
+            if not fetched["content"]:
+                return RuntimeError(f"Failed to fetch URL: {url} ({fetched['error']})")
+            try:
+                result = await loop.run_in_executor(parser, parse, fetched["content"], url)
+            except Exception as exc:
+                return exc
+            result["metadata"]["http_cache_hit"] = fetched["from_cache"]
+            return result
+
+        urls = list(urls)
+        results = await asyncio.gather(*(fetch_then_parse(u) for u in urls))
+        return dict(zip(urls, results))
+
+    def _parse(self, downloaded: Union[str, bytes], source: str) -> Dict[str, Any]:
         text = trafilatura.extract(
             downloaded, include_comments=False, include_tables=False
         )
@@ -49,10 +177,15 @@ class WebExtractor(BaseExtractor):
                 else:
                     # Documentオブジェクトの場合（新しいバージョン）
                     # 利用可能な属性を取得
-                    for attr in ['title', 'author', 'hostname', 'description', 'sitename', 'date']:
+                    for attr in METADATA_FIELDS:
                         if hasattr(meta, attr):
                             value = getattr(meta, attr)
                             if value:
                                 metadata[attr] = value
 
         return {"text": text, "metadata": metadata}
+
+    def close(self) -> None:
+        if self._fetcher is not None:
+            self._fetcher.close()
+            self._fetcher = None
@@ -1,6 +1,13 @@
 import csv
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
 
 try:  # optional dependency
     import yaml  # type: ignore
@@ -9,64 +16,304 @@ except Exception:  # pragma: no cover - optional
 
 import re
 
+from .utils.aho_corasick import ARRAY_LAYOUT, AhoCorasick
+
+logger = logging.getLogger(__name__)
+
+# ASCII terms only match as whole words
+_ASCII_TERM = re.compile(r"[A-Za-z0-9_\-]+")
+
+# magic, source mtime_ns, source size, term count, padding, then one length per section;
+# arrays use native byte order, so artifacts are only shared between processes on one host
+ARTIFACT_MAGIC = b"DPGLOSS1"
+_HEADER = struct.Struct("<8sqqII" + "Q" * (len(ARRAY_LAYOUT) + 5))
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and (ch.isalnum() or ch == "_")
+
+
+class _StringTable:
+    """Read-only sequence of UTF-8 strings stored as offsets plus one blob."""
+
+    def __init__(self, offsets: Union[array, memoryview], blob: Union[bytes, memoryview]) -> None:
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def build(cls, strings: Sequence[str]) -> "_StringTable":
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = array("Q", [0])
+        for item in encoded:
+            offsets.append(offsets[-1] + len(item))
+        return cls(offsets, b"".join(encoded))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx: int) -> str:
+        return bytes(self.blob[self.offsets[idx]:self.offsets[idx + 1]]).decode("utf-8")
+
+
+class _Index(NamedTuple):
+    """Compiled glossary state, swapped as a whole on reload."""
+
+    terms: Sequence[str]
+    canonical: Sequence[str]
+    bounded: Sequence[int]
+    matcher: AhoCorasick
+    source_stat: Tuple[int, int]
+
+
+def _source_stat(path: Path) -> Tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def _write_artifact(path: Path, index: _Index) -> None:
+    terms = _StringTable.build(index.terms)
+    canonical = _StringTable.build(index.canonical)
+    arrays = index.matcher.arrays()
+    sections: List[bytes] = [bytes(arrays[name]) for name, _ in ARRAY_LAYOUT]
+    sections += [
+        bytes(array("B", index.bounded)),
+        bytes(terms.offsets),
+        bytes(canonical.offsets),
+        bytes(terms.blob),
+        bytes(canonical.blob),
+    ]
+    header = _HEADER.pack(
+        ARTIFACT_MAGIC, *index.source_stat, len(index.terms), 0, *(len(s) for s in sections)
+    )
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(header)
+            for section in sections:
+                f.write(section)
+                f.write(b"\0" * (-len(section) % 8))  # keep every section 8-byte aligned
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _read_artifact(path: Path) -> _Index:
+    """Map an artifact read-only and wrap its sections without copying."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    magic, mtime_ns, size, count, _, *lengths = _HEADER.unpack_from(view)
+    if magic != ARTIFACT_MAGIC:
+        raise ValueError(f"Not a glossary artifact: {path}")
+
+    sections = []
+    pos = _HEADER.size
+    for length in lengths:
+        sections.append(view[pos:pos + length])
+        pos += length + (-length % 8)
+    arrays = {
+        name: section.cast(code)
+        for (name, code), section in zip(ARRAY_LAYOUT, sections)
+    }
+    bounded, term_offsets, canon_offsets, term_blob, canon_blob = sections[len(ARRAY_LAYOUT):]
+    index = _Index(
+        terms=_StringTable(term_offsets.cast("Q"), term_blob),
+        canonical=_StringTable(canon_offsets.cast("Q"), canon_blob),
+        bounded=bounded,
+        matcher=AhoCorasick.from_arrays(arrays),
+        source_stat=(mtime_ns, size),
+    )
+    if len(index.terms) != count:
+        raise ValueError(f"Corrupt glossary artifact: {path}")
+    return index
+
 
 class Glossary:
-    """Load bilingual glossary from CSV or YAML and replace terms."""
+    """Load bilingual glossary from CSV or YAML and replace terms.
 
-    def __init__(self, path: str) -> None:
+    With ``artifact_path`` the compiled matcher is written to a binary file
+    that other processes map read-only instead of parsing the source again.
+    With ``reload_interval`` > 0 the source mtime is checked at most that
+    often (in seconds) and the glossary reloads itself when it changes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        artifact_path: Optional[str] = None,
+        reload_interval: float = 0.0,
+    ) -> None:
         self.path = Path(path)
-        self.mapping: Dict[str, str] = {}
+        self.artifact_path = Path(artifact_path) if artifact_path else None
+        self.reload_interval = reload_interval
+        # 用語→正規形の辞書は索引から必要になった時に作り、索引ごとに使い回す
+        self._mapping: Optional[Tuple[_Index, Dict[str, str]]] = None
+        self._index = _Index([], [], [], AhoCorasick([]), (0, 0))
+        self._last_check = 0.0
+        self._reload_lock = threading.Lock()
         self.load()
 
+    @property
+    def mapping(self) -> Dict[str, str]:
+        index = self._index
+        cached = self._mapping
+        if cached is None or cached[0] is not index:
+            cached = self._mapping = (index, {index.terms[i]: index.canonical[i] for i in range(len(index.terms))})
+        return cached[1]
+
     def load(self) -> None:
         if not self.path.exists():
             raise FileNotFoundError(self.path)
+        stat = _source_stat(self.path)
+        if self.artifact_path is not None and self.artifact_path.exists():
+            try:
+                index: Optional[_Index] = _read_artifact(self.artifact_path)
+            except (OSError, ValueError, struct.error):
+                index = None
+            if index is not None and index.source_stat == stat:
+                self._index = index
+                self._last_check = time.monotonic()
+                return
+
         if self.path.suffix.lower() in {".yaml", ".yml"}:
-            self._load_yaml()
+            mapping = self._load_yaml()
         elif self.path.suffix.lower() == ".csv":
-            self._load_csv()
+            mapping = self._load_csv()
         else:
             raise ValueError("Unsupported glossary format: %s" % self.path)
+        index = self._compile(mapping, stat)
+        if self.artifact_path is not None:
+            try:
+                _write_artifact(self.artifact_path, index)
+            except OSError as exc:
+                # 読み取り専用や満杯の共有ディスクでも、読み込んだ用語集はそのまま使う
+                logger.warning("Could not write glossary artifact %s: %s", self.artifact_path, exc)
+        # 読み手は常に古いか新しいかどちらか一方の索引全体を見る
+        self._index = index
+        self._last_check = time.monotonic()
+
+    @staticmethod
+    def _compile(mapping: Dict[str, str], stat: Tuple[int, int]) -> _Index:
+        """Build the matcher once so replacement is a single scan."""
+        terms = [term for term in mapping if term]
+        return _Index(
+            terms=terms,
+            canonical=[mapping[term] for term in terms],
+            bounded=[int(bool(_ASCII_TERM.fullmatch(term))) for term in terms],
+            matcher=AhoCorasick(terms),
+            source_stat=stat,
+        )
+
+    def compile(self, artifact_path: str) -> None:
+        """Write the compiled glossary to ``artifact_path``."""
+        _write_artifact(Path(artifact_path), self._index)
+
+    def maybe_reload(self) -> bool:
+        """Reload when the source file changed; returns True if reloaded."""
+        if self.reload_interval <= 0:
+            return False
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval:
+            return False
+        with self._reload_lock:
+            self._last_check = now
+            try:
+                stat = _source_stat(self.path)
+            except OSError:
+                return False
+            if stat == self._index.source_stat:
+                return False
+            try:
+                self.load()
+            except Exception:
+                # 編集途中のファイルなどは読み飛ばし、次の変更まで今の索引を使う
+                logger.exception("Failed to reload glossary %s; keeping the previous terms", self.path)
+                return False
+            return True
 
-    def _add_entry(self, ja: str, en: str) -> None:
+    @staticmethod
+    def _add_entry(mapping: Dict[str, str], ja: str, en: str) -> None:
         if ja:
-            self.mapping[ja] = ja
+            mapping[ja] = ja
         if en:
-            self.mapping[en] = ja
+            mapping[en] = ja
 
-    def _load_csv(self) -> None:
+    def _load_csv(self) -> Dict[str, str]:
+        mapping: Dict[str, str] = {}
         with open(self.path, newline="", encoding="utf-8") as f:
             reader = csv.DictReader(f)
             for row in reader:
                 ja = row.get("ja") or row.get("jp") or row.get("term") or ""
                 en = row.get("en") or ""
                 if ja or en:
-                    self._add_entry(ja.strip(), en.strip())
+                    self._add_entry(mapping, ja.strip(), en.strip())
+        return mapping
 
-    def _load_yaml(self) -> None:
+    def _load_yaml(self) -> Dict[str, str]:
         if yaml is None:
             raise ImportError("PyYAML is required for YAML glossary")
         with open(self.path, "r", encoding="utf-8") as f:
             data = yaml.safe_load(f) or []
+        mapping: Dict[str, str] = {}
         for item in data:
             if not isinstance(item, dict):
                 continue
             ja = str(item.get("ja", "")).strip()
             en = str(item.get("en", "")).strip()
             if ja or en:
-                self._add_entry(ja, en)
+                self._add_entry(mapping, ja, en)
+        return mapping
+
+    def _find(self, index: _Index, text: str) -> List[Tuple[int, int, int]]:
+        bounded = index.bounded
+
+        def accept(idx: int, start: int, end: int) -> bool:
+            if not bounded[idx]:
+                return True
+            if start > 0 and _is_word_char(text[start - 1]):
+                return False
+            return not (end < len(text) and _is_word_char(text[end]))
+
+        return index.matcher.leftmost_longest(text, accept)
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """Return ``(start, end, term)`` for glossary terms found in ``text``.
+
+        Longer terms win at the same position and ASCII terms must stand
+        alone as words, matching the rules used by :meth:`replace`.
+        """
+        self.maybe_reload()
+        index = self._index
+        return [(start, end, index.terms[idx]) for start, end, idx in self._find(index, text)]
+
+    def entries_in(self, text: str) -> List[Tuple[str, str]]:
+        """Return ``(term, canonical)`` pairs occurring in ``text``.
+
+        Pairs are unique, ordered by first occurrence, and exclude terms that
+        are already in canonical form.
+        """
+        self.maybe_reload()
+        index = self._index
+        entries: Dict[str, str] = {}
+        for _, _, idx in self._find(index, text):
+            term = index.terms[idx]
+            if term not in entries:
+                entries[term] = index.canonical[idx]
+        return [(term, canonical) for term, canonical in entries.items() if term != canonical]
 
     def replace(self, text: str) -> str:
-        if not self.mapping:
+        self.maybe_reload()
+        index = self._index
+        if not index.terms:
             return text
-        # replace longer terms first
-        items = sorted(self.mapping.items(), key=lambda x: len(x[0]), reverse=True)
-        for term, canonical in items:
-            if not term:
-                continue
-            if re.fullmatch(r"[A-Za-z0-9_\-]+", term):
-                pattern = r"(?<![A-Za-z0-9_])" + re.escape(term) + r"(?![A-Za-z0-9_])"
-            else:
-                pattern = re.escape(term)
-            text = re.sub(pattern, canonical, text)
-        return text
+        pieces: List[str] = []
+        pos = 0
+        for start, end, idx in self._find(index, text):
+            pieces.append(text[pos:start])
+            pieces.append(index.canonical[idx])
+            pos = end
+        if not pieces:
+            return text
+        pieces.append(text[pos:])
+        return "".join(pieces)
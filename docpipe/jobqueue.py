@@ -0,0 +1,215 @@
+"""Durable job queue shared by ``text-agent enqueue`` and ``text-agent worker``.
+
+A :class:`JobQueue` hands each queued source to one worker at a time under a
+lease. The worker renews the lease with :meth:`JobQueue.heartbeat` while it
+processes the job; when a worker dies its lease runs out and the job is
+claimed again by another worker, up to ``max_attempts`` times.
+:class:`SQLiteJobQueue` keeps the queue in one SQLite file, so workers on
+any host that shares the directory can take part. Other backends register
+themselves in :data:`BACKENDS`.
+"""
+
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+STATUSES = ("queued", "running", "done", "failed")
+
+
+class QueuedJob(NamedTuple):
+    id: str
+    source: str
+    attempts: int
+
+
+class JobQueue(ABC):
+    """Queue of sources with leased, at-least-once delivery."""
+
+    @abstractmethod
+    def enqueue(self, sources: Sequence[str]) -> List[str]:
+        """Queue ``sources`` and return their job IDs."""
+
+    @abstractmethod
+    def claim(self, worker: str) -> Optional[QueuedJob]:
+        """Lease the oldest queued (or expired) job to ``worker``, or return ``None``."""
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        """Extend the lease; ``False`` when ``worker`` no longer holds it."""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker: str, output: str) -> bool:
+        """Mark the job done with the path of its ``output``."""
+
+    @abstractmethod
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        """Record ``error`` and queue the job again unless it used up its attempts."""
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+
+    @abstractmethod
+    def jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """All jobs (or those with ``status``) as dictionaries, oldest first."""
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    enqueued REAL NOT NULL,
+    updated REAL NOT NULL,
+    output TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, enqueued);
+"""
+
+
+class SQLiteJobQueue(JobQueue):
+    """:class:`JobQueue` in a SQLite database file.
+
+    Every operation opens its own connection and claims run in an
+    ``IMMEDIATE`` transaction, so processes and threads never lease the same
+    job twice. The rollback journal is used rather than WAL, which does not
+    work on network file systems.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        lease_seconds: float = 300.0,
+        max_attempts: int = 3,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_config(cls, queue_cfg: Any) -> "SQLiteJobQueue":
+        return cls(queue_cfg.path, queue_cfg.lease_seconds, queue_cfg.max_attempts)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.path), timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            # 書き込みロックを先に取り、同じジョブを二重に貸し出さない
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def enqueue(self, sources: Sequence[str]) -> List[str]:
+        now = self.clock()
+        rows = [(uuid.uuid4().hex, source, now, now) for source in sources]
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO jobs (id, source, status, enqueued, updated) VALUES (?, ?, 'queued', ?, ?)",
+                rows,
+            )
+        return [row[0] for row in rows]
+
+    def claim(self, worker: str) -> Optional[QueuedJob]:
+        now = self.clock()
+        with self._transaction() as conn:
+            # 期限切れのまま試行回数を使い切ったジョブ（ワーカーを落とし続けるもの）は諦める
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', worker = NULL, lease_until = NULL, updated = ?,"
+                " error = 'lease expired ' || attempts || ' times' "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT id, source, attempts FROM jobs "
+                "WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY enqueued LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1,"
+                " updated = ? WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row["id"]),
+            )
+        return QueuedJob(row["id"], row["source"], row["attempts"] + 1)
+
+    def _update_leased(self, job_id: str, worker: str, assignments: str, params: Sequence[Any]) -> bool:
+        with self._transaction() as conn:
+            cur = conn.execute(
+                f"UPDATE jobs SET {assignments}, updated = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (*params, self.clock(), job_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        return self._update_leased(job_id, worker, "lease_until = ?", (self.clock() + self.lease_seconds,))
+
+    def complete(self, job_id: str, worker: str, output: str) -> bool:
+        return self._update_leased(
+            job_id, worker, "status = 'done', lease_until = NULL, output = ?, error = NULL", (output,)
+        )
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        return self._update_leased(
+            job_id,
+            worker,
+            "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,"
+            " worker = NULL, lease_until = NULL, error = ?",
+            (self.max_attempts, error),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update({status: n for status, n in rows})
+        return counts
+
+    def jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM jobs"
+        params: Sequence[Any] = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY enqueued", params).fetchall()
+        return [dict(row) for row in rows]
+
+
+# バックエンド名 → QueueConfig からキューを作る関数
+BACKENDS: Dict[str, Callable[[Any], JobQueue]] = {"sqlite": SQLiteJobQueue.from_config}
+
+
+def open_queue(queue_cfg: Any) -> JobQueue:
+    """Open the queue backend named by ``queue_cfg.backend``."""
+    try:
+        factory = BACKENDS[queue_cfg.backend]
+    except KeyError:
+        raise ValueError(f"Unknown queue backend: {queue_cfg.backend}") from None
+    return factory(queue_cfg)
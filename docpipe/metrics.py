@@ -0,0 +1,229 @@
+"""In-process metrics with a Prometheus text endpoint.
+
+Counters, gauges and histograms are kept in :data:`REGISTRY` and rendered
+in the Prometheus text exposition format. Every finished tracing span is
+recorded here (see :func:`observe_span`), so stage latency and token rates
+are available live from a long-running worker. Rates such as documents per
+second are derived on the Prometheus side with ``rate()``.
+"""
+
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(header + self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # ラベルごとに [各バケットの件数..., 合計値]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.setdefault(key, [0.0] * (len(self.buckets) + 1))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += value
+
+    def count(self, **labels: Any) -> float:
+        counts = self._values.get(self._key(labels))
+        return counts[-2] if counts else 0.0
+
+    def samples(self) -> List[str]:
+        lines: List[str] = []
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        names = self.labelnames + ("le",)
+        for key, counts in items:
+            for bound, n in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {_format_value(n)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(counts[-2])}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with another type or labels")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+DOCUMENTS = REGISTRY.counter("docpipe_documents_total", "Documents processed", ["source_type"])
+CHUNKS = REGISTRY.counter("docpipe_chunks_total", "Chunks processed")
+RETRIES = REGISTRY.counter("docpipe_retries_total", "Quality retries over all chunks")
+STAGE_SECONDS = REGISTRY.histogram("docpipe_stage_seconds", "Latency of pipeline stages", ["stage"])
+LLM_CALLS = REGISTRY.counter("docpipe_llm_calls_total", "LLM requests", ["stage"])
+LLM_TOKENS = REGISTRY.counter("docpipe_llm_tokens_total", "LLM tokens", ["stage", "kind"])
+CACHE_HITS = REGISTRY.counter("docpipe_cache_hits_total", "Cache hits", ["stage"])
+QUEUE_DEPTH = REGISTRY.gauge("docpipe_queue_depth", "Items waiting to be processed", ["queue"])
+
+
+def observe_span(record: Dict[str, Any]) -> None:
+    """Record a finished tracing span."""
+    stage = record["name"]
+    STAGE_SECONDS.observe(record["seconds"], stage=stage)
+    if record.get("llm_calls"):
+        LLM_CALLS.inc(record["llm_calls"], stage=stage)
+    for kind in ("prompt", "completion"):
+        tokens = record.get(f"{kind}_tokens")
+        if tokens:
+            LLM_TOKENS.inc(tokens, stage=stage, kind=kind)
+    if record.get("cache_hits"):
+        CACHE_HITS.inc(record["cache_hits"], stage=stage)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: Registry = REGISTRY
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+
+def start_http_server(
+    port: int = 9108, host: str = "127.0.0.1", registry: Optional[Registry] = None
+) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` from a daemon thread and return the server.
+
+    Pass ``port=0`` to pick a free port (``server.server_address[1]``).
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry or REGISTRY})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="docpipe-metrics", daemon=True).start()
+    return server
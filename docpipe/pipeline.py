@@ -1,16 +1,97 @@
-from typing import Any, Dict, List
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import logging
 
+from .budget import Budget, budgeting
 from .config import Config
+from .document import Chunk, Document, as_chunk
 from .processors import Translator, Proofreader, Evaluator, Fixer, SpellChecker, DiffProcessor
 from .processors.evaluator import EvaluationResult
-from .utils import split_into_chunks
+from .processors.quality_gate import QualityGate
+from .metrics import CHUNKS, RETRIES
+from .tracing import span, tracing
 
 logger = logging.getLogger(__name__)
 
 
+class _State(Enum):
+    """States of the per-chunk retry loop.
+
+    The chunk is translated once; retries cycle through proofread, evaluate
+    and fix. Each state runs in a tracing span of the same name, so the
+    per-state timings end up in ``metadata["trace"]``.
+    """
+
+    TRANSLATE = "translate"
+    PROOFREAD = "proofread"
+    EVALUATE = "evaluate"
+    FIX = "fix"
+    DONE = "done"
+
+
+def _next_state(
+    cfg: Config,
+    quality: float,
+    prev_quality: float,
+    retries: int,
+    budget: Optional[Budget],
+    metadata: Dict[str, Any],
+) -> _State:
+    """Decide after an evaluation whether to stop or to fix and retry."""
+    # 品質が閾値を上回った場合は成功
+    if quality >= cfg.pipeline.quality_threshold:
+        return _State.DONE
+
+    # 最大リトライ回数に達した場合は停止
+    if retries >= cfg.pipeline.max_retries:
+        return _State.DONE
+
+    # リトライ時の改善幅が設定値以下なら停止
+    if retries > 0:
+        improvement = quality - prev_quality
+        if improvement <= cfg.pipeline.min_improvement:
+            return _State.DONE
+
+    # 予算を使い切った場合は次のリトライを始めない
+    exhausted = budget.exhausted() if budget is not None else None
+    if exhausted:
+        metadata["budget_exhausted"] = exhausted
+        return _State.DONE
+
+    return _State.FIX
+
+
+def _evaluate(
+    text: Chunk,
+    cfg: Config,
+    evaluator: Evaluator,
+    quality_gate: Optional[QualityGate],
+) -> Tuple[float, EvaluationResult, bool]:
+    """Return ``(quality, evaluation, estimated)`` with the threshold penalties applied."""
+    eval_result: Optional[EvaluationResult] = None
+    if quality_gate is not None:
+        with span("quality_gate"):
+            eval_result = quality_gate.evaluate(evaluator, text, cfg.pipeline.quality_threshold)
+    estimated = eval_result is not None
+    if eval_result is None:
+        with span("evaluate"):
+            eval_result = evaluator.evaluate(text)
+    quality = eval_result["quality_score"]
+
+    err_rate = eval_result.get("grammar_error_rate")
+    if err_rate is not None and err_rate > cfg.pipeline.language_tool_threshold:
+        quality = 0.0
+
+    bleu_score = eval_result.get("bleu_score")
+    if bleu_score is not None and bleu_score < cfg.pipeline.bleu_threshold:
+        quality = 0.0
+
+    eval_result["quality_score"] = quality
+    return quality, eval_result, estimated
+
+
 def _process_chunk(
-    text: str,
+    chunk: Union[str, Chunk],
     cfg: Config,
     translator: Translator,
     proofreader: Proofreader,
@@ -18,67 +99,114 @@ def _process_chunk(
     fixer: Fixer,
     spellchecker: SpellChecker,
     diff_processor: DiffProcessor = None,
+    quality_gate: Optional[QualityGate] = None,
+    budget: Optional[Budget] = None,
 ) -> Dict[str, Any]:
-    """Process a single text chunk through the pipeline."""
+    """Process a single text chunk through the pipeline.
+
+    Each stage receives the text as a :class:`~docpipe.document.Chunk`, so
+    the format flags and protected blocks are not detected again per stage
+    and retry. With a ``quality_gate`` the full evaluation only runs when the
+    cheap estimate is close to the quality threshold. Time and LLM tokens
+    per stage are summarized in ``metadata["trace"]``. Once ``budget`` is
+    exhausted no further retry or diff stage is started and the reason is
+    recorded in the metadata.
+    """
+    with tracing() as tracer:
+        result = _run_chunk(
+            chunk, cfg, translator, proofreader, evaluator, fixer, spellchecker, diff_processor, quality_gate, budget
+        )
+    result["metadata"]["trace"] = tracer.summary()
+    CHUNKS.inc()
+    RETRIES.inc(result["metadata"]["retries"])
+    return result
+
+
+def _run_chunk(
+    chunk: Union[str, Chunk],
+    cfg: Config,
+    translator: Translator,
+    proofreader: Proofreader,
+    evaluator: Evaluator,
+    fixer: Fixer,
+    spellchecker: SpellChecker,
+    diff_processor: DiffProcessor = None,
+    quality_gate: Optional[QualityGate] = None,
+    budget: Optional[Budget] = None,
+) -> Dict[str, Any]:
+    text = as_chunk(chunk)
     prev_quality = 0.0
     prev_err_rate = None
     prev_readability = None
     metadata: Dict[str, Any] = {}
 
-    for retries in range(cfg.pipeline.max_retries + 1):
-        # 翻訳が有効な場合のみ実行
-        if hasattr(cfg.translator, 'enabled') and cfg.translator.enabled:
-            trans = translator.process(text)
-            text = trans["text"]
-            metadata.update(trans.get("metadata", {}))
-
-        if cfg.proofreader.enabled:
-            pf = proofreader.process(
-                text, error_rate=prev_err_rate, readability=prev_readability
-            )
-            text = pf["text"]
-            metadata["proofread_quality"] = pf.get("quality_score")
-
-        eval_result: EvaluationResult = evaluator.evaluate(text)
-        quality: float = eval_result["quality_score"]
-
-        err_rate = eval_result.get("grammar_error_rate")
-        if err_rate is not None and err_rate > cfg.pipeline.language_tool_threshold:
-            quality = 0.0
+    retries = 0
+    quality = 0.0
+    state = _State.TRANSLATE
+    while state is not _State.DONE:
+        if state is _State.TRANSLATE:
+            # 翻訳は最初の一回だけ。リトライ時の本文はすでに翻訳済み
+            if hasattr(cfg.translator, 'enabled') and cfg.translator.enabled:
+                with span("translate"):
+                    trans = translator.process(text)
+                text = text.with_text(trans["text"])
+                metadata.update(trans.get("metadata", {}))
+            state = _State.PROOFREAD
 
-        bleu_score = eval_result.get("bleu_score")
-        if bleu_score is not None and bleu_score < cfg.pipeline.bleu_threshold:
-            quality = 0.0
+        elif state is _State.PROOFREAD:
+            candidates = [text]
+            if cfg.proofreader.enabled:
+                n = len(cfg.proofreader.candidate_temperatures) or cfg.proofreader.candidates
+                with span("proofread"):
+                    if n > 1:
+                        # 候補を一度に並列取得し、評価で最良のものを選ぶ
+                        results = proofreader.process_candidates(
+                            text,
+                            n,
+                            cfg.proofreader.candidate_temperatures,
+                            error_rate=prev_err_rate,
+                            readability=prev_readability,
+                        )
+                    else:
+                        results = [proofreader.process(
+                            text, error_rate=prev_err_rate, readability=prev_readability
+                        )]
+                candidates = [text.with_text(pf["text"]) for pf in results]
+                metadata["proofread_quality"] = results[0].get("quality_score")
+                if n > 1:
+                    metadata["proofread_candidates"] = len(candidates)
+            state = _State.EVALUATE
 
-        eval_result["quality_score"] = quality
-        metadata.update(eval_result)
+        elif state is _State.EVALUATE:
+            scores = [_evaluate(candidate, cfg, evaluator, quality_gate) for candidate in candidates]
+            # 同点なら先の候補（n=1 の場合と同じ温度設定のもの）を採る
+            chosen = max(range(len(scores)), key=lambda i: scores[i][0])
+            quality, eval_result, estimated = scores[chosen]
+            text = candidates[chosen]
+            if quality_gate is not None:
+                metadata["quality_estimated"] = estimated
+            if len(candidates) > 1:
+                metadata["proofread_candidate"] = chosen
+                metadata["proofread_quality"] = results[chosen].get("quality_score")
+            metadata.update(eval_result)
 
-        prev_err_rate = eval_result.get("grammar_error_rate")
-        prev_readability = eval_result.get("readability_score")
+            prev_err_rate = eval_result.get("grammar_error_rate")
+            prev_readability = eval_result.get("readability_score")
+            state = _next_state(cfg, quality, prev_quality, retries, budget, metadata)
 
-        # 品質が閾値を上回った場合は成功
-        if quality >= cfg.pipeline.quality_threshold:
-            break
-
-        # 最大リトライ回数に達した場合は停止
-        if retries >= cfg.pipeline.max_retries:
-            break
-
-        # リトライ時の改善幅が設定値以下なら停止
-        if retries > 0:
-            improvement = quality - prev_quality
-            if improvement <= cfg.pipeline.min_improvement:
-                break
-
-        fix_result = fixer.process(text)
-        text = fix_result["text"]
-
-        prev_quality = quality
+        elif state is _State.FIX:
+            with span("fix"):
+                fix_result = fixer.process(text)
+            text = text.with_text(fix_result["text"])
+            prev_quality = quality
+            retries += 1
+            state = _State.PROOFREAD
 
     # 品質が閾値未満の場合のみSpellCheckerを実行
     if quality < spellchecker.quality_threshold:
-        spell_result = spellchecker.process(text, quality)
-        text = spell_result["text"]
+        with span("spellcheck"):
+            spell_result = spellchecker.process(text, quality)
+        text = text.with_text(spell_result["text"])
         metadata.update(spell_result.get("metadata", {}))
 
     # DiffProcessorを実行（Proofreaderの後、品質が低い場合）
@@ -93,21 +221,33 @@ def _process_chunk(
         cfg.diff_processor.enabled,
     )
     
-    if (diff_processor and 
-        cfg.diff_processor.enabled and 
-        quality < cfg.pipeline.diff_improvement_threshold):
+    run_diff = bool(
+        diff_processor and
+        cfg.diff_processor.enabled and
+        quality < cfg.pipeline.diff_improvement_threshold
+    )
+    exhausted = budget.exhausted() if run_diff and budget is not None else None
+
+    if exhausted:
+        metadata["budget_exhausted"] = exhausted
+        metadata["diff_skipped"] = True
+        logger.debug("DiffProcessor skipped: %s budget exhausted", exhausted)
+    elif run_diff:
         
         logger.debug("DiffProcessor conditions met, executing...")
-        diff_result = diff_processor.process(text)
+        # チャンク済みなので DiffProcessor は再分割せず保護済みブロックを使う
+        with span("diff"):
+            diff_result = diff_processor.process(text)
         logger.debug("diff_result changed=%s", diff_result['metadata']['changed'])
         
         if diff_result["metadata"]["changed"]:
-            text = diff_result["text"]
+            text = text.with_text(diff_result["text"])
             metadata["diff_processor_applied"] = True
             metadata["diff_iterations"] = diff_result["metadata"]["iterations"]
             
             # DiffProcessor適用後の品質を再評価
-            final_eval = evaluator.evaluate(text)
+            with span("evaluate"):
+                final_eval = evaluator.evaluate(text)
             metadata["final_quality_after_diff"] = final_eval["quality_score"]
             logger.debug("DiffProcessor applied successfully")
         else:
@@ -117,11 +257,11 @@ def _process_chunk(
 
     metadata["retries"] = retries
 
-    return {"text": text, "metadata": metadata}
+    return {"text": text.text, "metadata": metadata}
 
 
 def process_text(
-    text: str,
+    text: Union[str, Chunk],
     cfg: Config,
     translator: Translator,
     proofreader: Proofreader,
@@ -130,39 +270,89 @@ def process_text(
     spellchecker: SpellChecker,
     diff_processor: DiffProcessor = None,
     max_tokens: int = 2048,
+    budget: Optional[Budget] = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
 ) -> Dict[str, Any]:
     """Run text through translation, proofreading, evaluation and fixing.
 
-    The text is split into chunks with :func:`split_into_chunks` and each chunk
-    is processed sequentially. Metadata from all chunks is aggregated and
-    returned alongside the concatenated text.
+    The text is split once into a :class:`~docpipe.document.Document` and each
+    chunk is processed sequentially. A Markdown :class:`~docpipe.document.Chunk`
+    input keeps every chunk in Markdown mode. Metadata from all chunks, including
+    the per-stage ``trace`` summary, is aggregated and
+    the processed chunks are put back in place of the originals, keeping the
+    paragraph breaks and whitespace between them.
+
+    The document gets its own budget from the ``max_document_*`` settings,
+    charged to the run ``budget`` as well; its usage is reported in
+    ``metadata["budget"]``.
+
+    ``on_chunk`` is called with each finished piece of the final text, in
+    order, so the output can be written while later chunks are processed;
+    the pieces concatenate to the returned text.
     """
 
-    chunks = split_into_chunks(text, max_tokens)
+    # トークン数は最初にチャンクを受け取るモデルの符号化で数える
+    model = cfg.translator.model if cfg.translator.enabled else cfg.proofreader.model
+    document = Document.from_text(text, max_tokens, model)
+    quality_gate = QualityGate.from_config(cfg.pipeline)
+    doc_budget = Budget.for_document(cfg.pipeline, cfg.llm.prices, run=budget)
 
-    if len(chunks) == 1:
-        return _process_chunk(
-            chunks[0], cfg, translator, proofreader, evaluator, fixer, spellchecker, diff_processor
-        )
+    if len(document) == 1:
+        with budgeting(doc_budget):
+            result = _process_chunk(
+                document.chunks[0],
+                cfg,
+                translator,
+                proofreader,
+                evaluator,
+                fixer,
+                spellchecker,
+                diff_processor,
+                quality_gate,
+                doc_budget,
+            )
+        result["metadata"]["budget"] = doc_budget.usage()
+        if on_chunk is not None:
+            on_chunk(result["text"])
+        return result
 
     all_text: List[str] = []
     meta_list: List[Dict[str, Any]] = []
     quality_sum = 0.0
     retry_sum = 0
 
-    for chunk in chunks:
-        result = _process_chunk(chunk, cfg, translator, proofreader, evaluator, fixer, spellchecker, diff_processor)
-        all_text.append(result["text"])
-        m = result["metadata"]
-        meta_list.append(m)
-        quality_sum += m.get("quality_score", 0.0)
-        retry_sum += m.get("retries", 0)
+    with tracing() as tracer, budgeting(doc_budget):
+        for index, chunk in enumerate(document):
+            result = _process_chunk(
+                chunk,
+                cfg,
+                translator,
+                proofreader,
+                evaluator,
+                fixer,
+                spellchecker,
+                diff_processor,
+                quality_gate,
+                doc_budget,
+            )
+            all_text.append(result["text"].strip())
+            if on_chunk is not None:
+                on_chunk(document.piece(index, all_text[-1]))
+            m = result["metadata"]
+            m["chunk_id"] = chunk.chunk_id
+            meta_list.append(m)
+            quality_sum += m.get("quality_score", 0.0)
+            retry_sum += m.get("retries", 0)
 
     aggregated: Dict[str, Any] = {
         "quality_score": quality_sum / len(meta_list) if meta_list else 0.0,
         "retries": retry_sum,
         "chunks": meta_list,
+        "trace": tracer.summary(),
+        "budget": doc_budget.usage(),
     }
+    exhausted = [m["budget_exhausted"] for m in meta_list if "budget_exhausted" in m]
+    if exhausted:
+        aggregated["budget_exhausted"] = exhausted[0]
 
-    joined_text = " ".join(t.strip() for t in all_text if t)
-    return {"text": joined_text, "metadata": aggregated}
+    return {"text": document.join(all_text), "metadata": aggregated}
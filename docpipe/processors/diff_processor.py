@@ -2,7 +2,7 @@ import os
 import re
 import logging
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 try:
     import openai
     from openai import OpenAI
@@ -10,7 +10,10 @@ except Exception:  # pragma: no cover - optional dependency
     openai = None  # type: ignore
     OpenAI = None  # type: ignore
 
+from ..document import Chunk
+from ..streaming import complete
 from ..utils.markdown_utils import (
+    CRITICAL_PLACEHOLDER,
     is_markdown_file,
     extract_critical_markdown_blocks,
     restore_critical_markdown_blocks
@@ -30,7 +33,8 @@ class DiffProcessor:
         output_history: bool = True,
         history_dir: str = "output_history",
         improvement_focus: str = "advanced_style",
-        temp_dir: str = None
+        temp_dir: str = None,
+        stream: bool = False,
     ):
         """Initialize DiffProcessor with LLM-based text improvement."""
         if OpenAI is None:
@@ -44,6 +48,7 @@ class DiffProcessor:
         self.improvement_focus = improvement_focus
         self.iteration_count = 0
         self.temp_dir = temp_dir  # New: temp directory for case-specific files
+        self.stream = stream
         
         if self.output_history:
             if self.temp_dir:
@@ -62,84 +67,68 @@ class DiffProcessor:
         if is_markdown_file(text):
             return self._split_markdown_into_chunks(text)
         
-        # Split by paragraphs first
-        paragraphs = text.split('\n\n')
+        return self._split_paragraphs(text)
+    
+    def _split_paragraphs(self, text: str) -> List[str]:
+        """Pack paragraphs into chunks of at most ``max_chunk_size`` characters."""
         chunks = []
-        current_chunk = ""
+        current: List[str] = []
+        size = 0
         
-        for paragraph in paragraphs:
-            if len(current_chunk) + len(paragraph) <= self.max_chunk_size:
-                current_chunk += paragraph + '\n\n'
+        for paragraph in text.split('\n\n'):
+            if size + len(paragraph) <= self.max_chunk_size:
+                current.append(paragraph)
+                size += len(paragraph) + 2
             else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = paragraph + '\n\n'
+                if current:
+                    chunks.append('\n\n'.join(current).strip())
+                current = [paragraph]
+                size = len(paragraph) + 2
         
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        if current:
+            chunks.append('\n\n'.join(current).strip())
         
         return chunks
     
     def _split_markdown_into_chunks(self, text: str) -> List[str]:
         """Split Markdown text into chunks while preserving block boundaries and headers."""
         # まずMarkdownブロックを抽出（重要な要素のみ）
-        processed_text, markdown_blocks = extract_critical_markdown_blocks(text)
-        
-        # プレースホルダーの位置を記録
-        placeholder_positions = []
-        for placeholder, original in markdown_blocks.items():
-            pos = processed_text.find(placeholder)
-            if pos != -1:
-                placeholder_positions.append((pos, placeholder, original))
+        processed_text, _ = extract_critical_markdown_blocks(text)
+        return self._split_protected(processed_text)
+    
+    def _split_protected(self, processed_text: str) -> List[str]:
+        """Split text whose critical blocks are already placeholders."""
+        chunks = []
+        current: List[str] = []
+        size = 0
+        pos = 0
         
-        # 位置でソート
-        placeholder_positions.sort(key=lambda x: x[0])
+        def flush() -> None:
+            chunk = ''.join(current).strip()
+            if chunk:
+                chunks.append(chunk)
         
         # チャンク境界を決定（Markdownブロックを分割しないように）
-        chunks = []
-        current_chunk = ""
-        current_pos = 0
-        
-        for pos, placeholder, original in placeholder_positions:
-            # プレースホルダーまでのテキストを追加
-            text_before = processed_text[current_pos:pos]
-            
+        for match in CRITICAL_PLACEHOLDER.finditer(processed_text):
+            placeholder = match.group(0)
+            piece = processed_text[pos:match.start()] + placeholder
             # ヘッダープレースホルダーの場合は新しいチャンクを開始
-            is_header = 'HEADER' in placeholder
-            
-            if is_header:
-                # 現在のチャンクを保存
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                # 新しいチャンクを開始（ヘッダー用）
-                current_chunk = text_before + placeholder
+            if 'HEADER' in placeholder or size + len(piece) > self.max_chunk_size:
+                flush()
+                current = [piece]
+                size = len(piece)
             else:
-                # 通常の要素の場合
-                if len(current_chunk) + len(text_before) + len(placeholder) <= self.max_chunk_size:
-                    current_chunk += text_before + placeholder
-                else:
-                    # 現在のチャンクを保存
-                    if current_chunk.strip():
-                        chunks.append(current_chunk.strip())
-                    # 新しいチャンクを開始
-                    current_chunk = text_before + placeholder
-            
-            current_pos = pos + len(placeholder)
+                current.append(piece)
+                size += len(piece)
+            pos = match.end()
         
         # 残りのテキストを追加
-        remaining_text = processed_text[current_pos:]
-        if len(current_chunk) + len(remaining_text) <= self.max_chunk_size:
-            current_chunk += remaining_text
-        else:
-            if current_chunk.strip():
-                chunks.append(current_chunk.strip())
-            current_chunk = remaining_text
-        
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
-        # 空のチャンクを除去
-        chunks = [chunk for chunk in chunks if chunk.strip()]
+        remaining_text = processed_text[pos:]
+        if size + len(remaining_text) > self.max_chunk_size:
+            flush()
+            current = []
+        current.append(remaining_text)
+        flush()
         
         return chunks
     
@@ -220,48 +209,53 @@ class DiffProcessor:
         logger.debug("Saved improved text for chunk %s to %s", chunk_num, filepath)
         return filepath
     
-    def process(self, text: str) -> Dict[str, Any]:
-        """Process text through LLM-based improvement with unified diff."""
-        if not text.strip():
-            return {"text": text, "metadata": {"iterations": 0, "changed": False}}
+    def process(self, text: Union[str, Chunk]) -> Dict[str, Any]:
+        """Process text through LLM-based improvement with unified diff.
+
+        A :class:`~docpipe.document.Chunk` from the pipeline is already sized,
+        so it is improved as one unit using its cached protected blocks.
+        """
+        chunk = text if isinstance(text, Chunk) else None
+        source = str(text)
+        if not source.strip():
+            return {"text": source, "metadata": {"iterations": 0, "changed": False}}
         
-        logger.debug("DiffProcessor processing text of length %s", len(text))
+        logger.debug("DiffProcessor processing text of length %s", len(source))
         
         # Markdownファイルの場合は見出し・表・画像を絶対保護
-        critical_blocks = {}
-        if is_markdown_file(text):
-            logger.debug("Markdown file detected")
-            # 見出し・表・画像を絶対保護
-            text, critical_blocks = extract_critical_markdown_blocks(text)
-            logger.debug(
-                "Protected %s critical blocks (headers, tables, images)",
-                len(critical_blocks),
-            )
-        
-        # 通常のDiffProcessor処理
-        original_text = text
-        improved_text = text
-        iterations = 0
-        changed = False
-        
-        # Split into chunks if needed
-        chunks = self.split_text_into_chunks(text)
+        if chunk is not None:
+            protected, critical_blocks = chunk.protected
+            chunks = [protected]
+        else:
+            protected, critical_blocks = source, {}
+            markdown = is_markdown_file(source)
+            if markdown:
+                logger.debug("Markdown file detected")
+                # 見出し・表・画像を絶対保護
+                protected, critical_blocks = extract_critical_markdown_blocks(source)
+            if len(protected) <= self.max_chunk_size:
+                chunks = [protected]
+            elif markdown:
+                chunks = self._split_protected(protected)
+            else:
+                chunks = self._split_paragraphs(protected)
+        logger.debug(
+            "Protected %s critical blocks (headers, tables, images)",
+            len(critical_blocks),
+        )
         logger.debug("Split into %s chunks", len(chunks))
         
         if len(chunks) > 1:
             # Process each chunk separately
             improved_chunks = []
-            for i, chunk in enumerate(chunks):
+            for i, part in enumerate(chunks):
                 logger.debug("Processing chunk %s/%s", i + 1, len(chunks))
-                improved_chunk = self._process_chunk(chunk, i+1)
-                improved_chunks.append(improved_chunk)
-            
+                improved_chunks.append(self._process_chunk(part, i + 1))
             improved_text = '\n\n'.join(improved_chunks)
-            iterations = 1
         else:
             # Process as single chunk
-            improved_text = self._process_chunk(text, 1)
-            iterations = 1
+            improved_text = self._process_chunk(chunks[0], 1)
+        iterations = 1
         
         # 見出し・表・画像を必ず復元
         if critical_blocks:
@@ -269,7 +263,7 @@ class DiffProcessor:
             improved_text = restore_critical_markdown_blocks(improved_text, critical_blocks)
             logger.debug("Restored %s critical blocks", len(critical_blocks))
         
-        changed = improved_text != original_text
+        changed = improved_text != source
         
         return {
             "text": improved_text,
@@ -299,13 +293,14 @@ class DiffProcessor:
                 
                 # Call LLM for direct text improvement
                 client = OpenAI()
-                resp = client.chat.completions.create(
+                improved_response = complete(
+                    client,
+                    "diff",
+                    self.stream,
                     model=self.model,
                     messages=[{"role": "user", "content": prompt}],
                     temperature=0.3,
-                )
-                
-                improved_response = resp.choices[0].message.content.strip()
+                ).strip()
                 logger.debug("=== DiffProcessor: LLM返却テキスト（最初の100文字） ===")
                 logger.debug(repr(improved_response[:100]))
                 logger.debug(
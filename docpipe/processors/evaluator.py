@@ -19,12 +19,13 @@ except Exception:  # pragma: no cover - optional dependency
     Tagger = None  # type: ignore
 
 import re
-from typing import Optional, TypedDict
-from ..utils.markdown_utils import is_markdown_file, get_text_for_evaluation
+from typing import List, Optional, Sequence, TypedDict
+from ..document import as_chunk
+from ..utils.text_stats import CharStats, char_stats, char_stats_batch
 
 
 class EvaluationResult(TypedDict):
-    grammar_error_rate: float
+    grammar_error_rate: Optional[float]  # None when only estimated
     readability_score: float
     bleu_score: Optional[float]
     quality_score: float
@@ -63,8 +64,7 @@ class Evaluator:
     def grammar_error_rate(self, text: str) -> float:
         """Return grammar error rate using token count heuristics."""
         # For Markdown files, use text content only for evaluation
-        if is_markdown_file(text):
-            text = get_text_for_evaluation(text)
+        text = as_chunk(text).evaluation_text
         
         matches = self.tool.check(text)
         language = self.detect_language(text)
@@ -73,7 +73,8 @@ class Evaluator:
             if self.tagger is not None:
                 tokens = len([tok.surface for tok in self.tagger(text)])
             else:
-                tokens = len(re.findall(r"\S", text))
+                stats = char_stats(text)
+                tokens = stats.chars - stats.spaces
         else:
             tokens = len(text.split())
 
@@ -83,47 +84,37 @@ class Evaluator:
     def readability_score_japanese(self, text: str) -> float:
         """Calculate readability score for Japanese text."""
         # For Markdown files, use text content only for evaluation
-        if is_markdown_file(text):
-            text = get_text_for_evaluation(text)
-            
+        text = as_chunk(text).evaluation_text
+        return self._readability_japanese(text, char_stats(text))
+
+    def _readability_japanese(self, text: str, stats: CharStats) -> float:
         if not text.strip():
             return 1.0
 
+        # 文の数（句点、感嘆符、疑問符で区切った空でない区間）
+        sentence_count = stats.sentences
         if self.tagger is not None:
             words = [tok.surface for tok in self.tagger(text)]
             if not words:
                 return 1.0
-            sentences = [s for s in re.split(r'[。！？]', text) if s.strip()]
             avg_word_len = sum(len(w) for w in words) / len(words)
-            avg_sentence_words = len(words) / max(len(sentences), 1)
+            avg_sentence_words = len(words) / max(sentence_count, 1)
             word_len_score = 1.0 - min((avg_word_len - 2) / 6.0, 1.0)
             sent_score = 1.0 - min((avg_sentence_words - 10) / 50.0, 1.0)
             return max(0.0, min(1.0, (word_len_score + sent_score) / 2))
-        
-        # 文を分割（句点、感嘆符、疑問符で区切る）
-        sentences = re.split(r'[。！？]', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        if not sentences:
+
+        if not sentence_count:
             return 1.0
-        
+
         # 文字数ベースの文の長さを計算
-        total_chars = len(text)
-        sentence_count = len(sentences)
+        total_chars = stats.chars
         avg_sentence_length = total_chars / sentence_count
-        
-        # 句読点の使用頻度
-        punctuation_count = len(re.findall(r'[。、！？]', text))
-        punctuation_ratio = punctuation_count / max(total_chars, 1)
-        
-        # 漢字の使用率（適度な漢字使用は読みやすさに寄与）
-        kanji_count = len(re.findall(r'[\u4e00-\u9fff]', text))
-        kanji_ratio = kanji_count / max(total_chars, 1)
-        
-        # ひらがなの使用率
-        hiragana_count = len(re.findall(r'[\u3040-\u309f]', text))
-        hiragana_ratio = hiragana_count / max(total_chars, 1)
-        
+
+        # 句読点・漢字・ひらがなの使用率（適度な漢字使用は読みやすさに寄与）
+        punctuation_ratio = stats.punctuation / max(total_chars, 1)
+        kanji_ratio = stats.kanji / max(total_chars, 1)
+        hiragana_ratio = stats.hiragana / max(total_chars, 1)
+
         # スコア計算
         # 1. 文の長さスコア（適度な長さを好む）- ペナルティを強化
         if avg_sentence_length < 20:
@@ -150,8 +141,7 @@ class Evaluator:
     def readability_score_english(self, text: str) -> float:
         """Calculate readability score for English text."""
         # For Markdown files, use text content only for evaluation
-        if is_markdown_file(text):
-            text = get_text_for_evaluation(text)
+        text = as_chunk(text).evaluation_text
             
         sentences = [s for s in text.split(".") if s.strip()]
         if not sentences:
@@ -169,15 +159,31 @@ class Evaluator:
         else:
             return self.readability_score_english(text)
 
+    def readability_scores(self, texts: Sequence[str]) -> List[float]:
+        """Readability of many chunks at once.
+
+        Character classes of all Japanese chunks are counted in one batch,
+        which is much cheaper than scoring the chunks one by one.
+        """
+        chunks = [as_chunk(text) for text in texts]
+        japanese = [i for i, chunk in enumerate(chunks) if self.detect_language(chunk) == "ja"]
+        eval_texts = [chunks[i].evaluation_text for i in japanese]
+        scores = {
+            i: self._readability_japanese(text, stats)
+            for i, text, stats in zip(japanese, eval_texts, char_stats_batch(eval_texts))
+        }
+        return [
+            scores[i] if i in scores else self.readability_score_english(chunk)
+            for i, chunk in enumerate(chunks)
+        ]
+
     def bleu_score(self, text: str, reference: str) -> float:
         if sacrebleu is None:
             raise ImportError("sacrebleu is required for BLEU score")
         
         # For Markdown files, use text content only for evaluation
-        if is_markdown_file(text):
-            text = get_text_for_evaluation(text)
-        if is_markdown_file(reference):
-            reference = get_text_for_evaluation(reference)
+        text = as_chunk(text).evaluation_text
+        reference = as_chunk(reference).evaluation_text
             
         tokenize = None
         if self.detect_language(text) == "ja":
@@ -192,6 +198,8 @@ class Evaluator:
 
     def evaluate(self, text: str, reference: Optional[str] = None) -> EvaluationResult:
         """Return quality metrics for given text."""
+        # 各指標で Markdown 判定と抽出を繰り返さないよう Chunk を共有する
+        text = as_chunk(text)
         language = self.detect_language(text)
         err_rate = self.grammar_error_rate(text)
         readability = self.readability_score(text)
@@ -1,28 +1,127 @@
 import itertools
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, Optional
 
+from ..document import Chunk, as_chunk, is_python_code, is_speech_text
 from ..glossary import Glossary
-from ..utils.markdown_utils import (
-    is_markdown_file, 
-    extract_critical_markdown_blocks, 
-    restore_critical_markdown_blocks
+from ..utils.markdown_utils import restore_critical_markdown_blocks
+from .fixer_rules import PYTHON_SPACING, SPACING, build_rule_sets
+
+# str.splitlines() の区切り。全文に規則を適用する前に "\n" へ揃える
+_LINE_BREAK = re.compile(r"\r\n|[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+_LLM_DISCLAIMER = re.compile(
+    r"(?:^#\s*)?ここでは.*?を修正しました"  # "Here we fixed ~"
+    r"|(?:^#\s*)?こちらが翻訳です"  # "Here is the translation"
+)
+_SPEECH_ARTIFACT = re.compile(
+    r"\[[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\]\s*speaker_[12]:\s*$"  # 空のタイムスタンプ行
+    r"|^speaker_[12]:\s*$"  # 空の話者行
+    r"|^\[[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\]\s*$"  # タイムスタンプのみの行
+    r"|^[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\s*$"  # タイムスタンプのみの行（括弧なし）
+)
+_SPEECH_PREFIX = re.compile(r"^\[[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\]\s*speaker_[12]:\s*")
+
+_DIGIT = re.compile(r"\d")
+# 見出しのパターン（いずれかに一致すれば見出し）
+_HEADING = re.compile(
+    "|".join(
+        f"(?:{pattern})"
+        for pattern in (
+            r"^#{1,6}\s+",  # Markdown形式
+            r"^[A-Z][A-Z\s]+$",  # 大文字のみの行
+            r"^[一二三四五六七八九十]+[、．]",  # 日本語の番号付き見出し
+            r"^[0-9]+[、．]",  # 数字の番号付き見出し
+            r"^[A-Z][^.!?]*$",  # 文頭が大文字で文末に句読点がない行
+            r"^[あ-んア-ン一-龯]+[：:]",  # 日本語見出し（：で終わる）
+            r"^第[一二三四五六七八九十\d]+[章節]",  # 第X章、第X節
+            r"^[一二三四五六七八九十\d]+[、．]\s*[あ-んア-ン一-龯]+",  # 番号付き見出し
+            r"^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$",  # Title Case見出し
+            r"^[（(][一二三四五六七八九十\d]+[）)]",  # （1）（一）形式
+            r"^[①②③④⑤⑥⑦⑧⑨⑩]",  # 丸数字
+            r"^[A-Z][A-Z\s]+[：:]",  # 英語見出し（：で終わる）
+            r"^[あ-んア-ン一-龯]{2,}[（(][一二三四五六七八九十\d]+[）)]",  # 日本語見出し（番号付き）
+            r"^[あ-んア-ン一-龯]{2,}\s*[（(][一二三四五六七八九十\d]+[）)]",  # 日本語見出し（番号付き、空白あり）
+        )
+    )
 )
 
+
+def _join_lines(text: str) -> str:
+    """Same result as ``"\\n".join(text.splitlines())`` without splitting."""
+    text = _LINE_BREAK.sub("\n", text)
+    return text[:-1] if text.endswith("\n") else text
+
+
+# 行単位の処理は generator の段として繋ぎ、行をまたぐ状態は各段が明示的に持つ
+
+def _unique_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Drop consecutive duplicate lines."""
+    return (line for line, _ in itertools.groupby(lines))
+
+
+def _tidy_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Strip lines, keeping at most one empty line in a row and none at the end."""
+    # 空行は次の本文行の直前にだけ出す
+    pending_empty = False
+    for line in lines:
+        line = line.strip()
+        if not line:
+            pending_empty = True
+            continue
+        if pending_empty:
+            yield ""
+            pending_empty = False
+        yield line
+
+
+def _without_speech_artifacts(lines: Iterable[str]) -> Iterator[str]:
+    return (line for line in lines if not _SPEECH_ARTIFACT.match(line.strip()))
+
+
+def _speech_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Strip timestamps and speaker labels, keeping at most one empty line in a row."""
+    # 空行は次の本文行の直前にだけ出すので、末尾の空行は残らない
+    pending_empty = False
+    for line in lines:
+        if line.strip() == "":
+            pending_empty = True
+            continue
+        # タイムスタンプと話者情報を削除
+        # [0:00-12:02] speaker_2: の形式を削除
+        line = _SPEECH_PREFIX.sub("", line).strip()
+        if not line:
+            continue
+        if pending_empty:
+            yield ""
+            pending_empty = False
+        yield line
+
+
+def _without_disclaimers(lines: Iterable[str]) -> Iterator[str]:
+    return (line for line in lines if not _LLM_DISCLAIMER.search(line))
+
+
 class Fixer:
-    """Enhanced error correction agent with text structure improvements."""
+    """Enhanced error correction agent with text structure improvements.
+
+    Replacement rules are compiled once per instance from
+    :mod:`~docpipe.processors.fixer_rules`; ``rules_path`` points to a YAML
+    file with extra rules, e.g. a growing speech-correction dictionary.
+    """
 
     def __init__(
         self,
         enable_markdown_headings: bool = True,
         glossary: Optional[Glossary] = None,
+        rules_path: Optional[str] = None,
     ) -> None:
         self.enable_markdown_headings = enable_markdown_headings
         self.glossary = glossary
+        self.rules = build_rule_sets(rules_path)
 
     def remove_duplicate_lines(self, text: str) -> str:
-        lines = (next(g) for _, g in itertools.groupby(text.splitlines()))
-        return "\n".join(lines)
+        return "\n".join(_unique_lines(text.splitlines()))
 
     def balance_parentheses(self, text: str) -> str:
         diff = text.count("(") - text.count(")")
@@ -33,31 +132,11 @@ class Fixer:
         return text
 
     def fix_common_typos(self, text: str) -> str:
-        corrections = {
-            r"\bteh\b": "the",
-            r"\brecieve\b": "receive",
-        }
-        for pattern, repl in corrections.items():
-            text = re.sub(pattern, repl, text, flags=re.IGNORECASE)
-        text = re.sub(r" {2,}", " ", text)
-        return text
+        return self.rules["typos"].apply(text)
 
     def remove_llm_disclaimers(self, text: str) -> str:
         """Remove LLM-generated disclaimer phrases from the text."""
-        patterns = [
-            r"(?:^#\s*)?ここでは.*?を修正しました",  # "Here we fixed ~"
-            r"(?:^#\s*)?こちらが翻訳です",         # "Here is the translation"
-        ]
-
-        lines = text.splitlines()
-        cleaned_lines = []
-        for line in lines:
-            if any(re.search(p, line) for p in patterns):
-                continue
-            cleaned_lines.append(line)
-
-        cleaned_text = "\n".join(cleaned_lines)
-        return cleaned_text.strip()
+        return "\n".join(_without_disclaimers(text.splitlines())).strip()
 
     def apply_glossary(self, text: str) -> str:
         if self.glossary is None:
@@ -66,329 +145,88 @@ class Fixer:
 
     def fix_speech_recognition_errors(self, text: str) -> str:
         """Fix common speech recognition errors in Japanese text."""
-        # 音声認識でよく発生する誤認識パターン
-        speech_corrections = {
-            # 専門用語の誤認識
-            r"アイロン": "アライアンス",
-            r"アイロンと": "アライアンスと",
-            r"アイロンの": "アライアンスの",
-            r"アイロンは": "アライアンスは",
-            
-            # 固有名詞の誤認識
-            r"Win Hello": "Windows Hello",
-            r"Win EOS": "Windows EOS",
-            r"Win10": "Windows 10",
-            r"Win 10": "Windows 10",
-            r"Ryzen AI5": "Ryzen 5",
-            r"Ryzen AI 5": "Ryzen 5",
-            r"Ryzen AI7": "Ryzen 7",
-            r"Ryzen AI 7": "Ryzen 7",
-            r"Ryzen AI9": "Ryzen 9",
-            r"Ryzen AI 9": "Ryzen 9",
-            
-            # 一般的な音声認識エラー
-            r"ココパイロット": "コパイロット",  # 重複修正
-            r"パイロットプラス": "コパイロットプラス",
-            r"パイロット": "コパイロット",
-            
-            # 音声認識の不完全な単語
-            r"\bす\b": "",  # 単独の「す」
-            r"\br\b": "",  # 単独の「r」
-            r"\bned\b": "",  # 不完全な単語
-            r"\bOops\b": "",  # 音声認識エラー
-            r"\bs\b": "",  # 単独の「s」
-            r"\bgotten\b": "",  # 不完全な単語
-            
-            # 句読点の誤認識
-            r"、\s*、": "、",
-            r"。\s*。": "。",
-            r"！\s*！": "！",
-            r"？\s*？": "？",
-            
-            # 空白の誤認識
-            r"（削除）": "",
-            r"\(削除\)": "",
-        }
-        
-        for pattern, repl in speech_corrections.items():
-            text = re.sub(pattern, repl, text)
-        
-        return text
+        return self.rules["speech"].apply(text)
 
     def remove_speech_artifacts(self, text: str) -> str:
         """Remove speech recognition artifacts and noise."""
-        # 音声認識のノイズやアーティファクトを削除
-        artifacts_patterns = [
-            r"\[[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\]\s*speaker_[12]:\s*$",  # 空のタイムスタンプ行
-            r"^speaker_[12]:\s*$",  # 空の話者行
-            r"^\[[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\]\s*$",  # タイムスタンプのみの行
-            r"^[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\s*$",  # タイムスタンプのみの行（括弧なし）
-        ]
-        
-        lines = text.splitlines()
-        cleaned_lines = []
-        
-        for line in lines:
-            # アーティファクトパターンにマッチしない行のみ保持
-            is_artifact = False
-            for pattern in artifacts_patterns:
-                if re.match(pattern, line.strip()):
-                    is_artifact = True
-                    break
-            
-            if not is_artifact:
-                cleaned_lines.append(line)
-        
-        return "\n".join(cleaned_lines)
+        # アーティファクトパターンにマッチしない行のみ保持
+        return "\n".join(_without_speech_artifacts(text.splitlines()))
 
     def normalize_speech_text(self, text: str) -> str:
         """Normalize speech recognition text for better readability."""
-        # 音声認識テキストの正規化
-        lines = text.splitlines()
-        normalized_lines = []
-        
-        for line in lines:
-            if line.strip() == "":
-                normalized_lines.append("")
-                continue
-            
-            # タイムスタンプと話者情報を削除
-            # [0:00-12:02] speaker_2: の形式を削除
-            line = re.sub(r"^\[[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\]\s*speaker_[12]:\s*", "", line)
-            
-            # 行が空でない場合は追加
-            if line.strip():
-                normalized_lines.append(line.strip())
-        
-        # 連続する空行を削除
-        result_lines = []
-        prev_empty = False
-        for line in normalized_lines:
-            if line == "":
-                if not prev_empty:
-                    result_lines.append("")
-                prev_empty = True
-            else:
-                result_lines.append(line)
-                prev_empty = False
-        
-        # 最後の空行を削除
-        while result_lines and result_lines[-1] == "":
-            result_lines.pop()
-        
-        return "\n".join(result_lines)
+        return "\n".join(_speech_lines(text.splitlines()))
 
     def normalize_punctuation(self, text: str) -> str:
         """Normalize punctuation marks for better readability."""
-        lines = text.splitlines()
-        result_lines = []
-        
-        for line in lines:
-            if line.strip() == "":
-                result_lines.append("")
-            else:
-                # 行内の句読点正規化
-                normalized_line = line
-                # 全角スペースを半角に統一
-                normalized_line = re.sub(r"\u3000", " ", normalized_line)
-                
-                # 英語部分の句読点を半角に統一（日本語部分は保持）
-                normalized_line = re.sub(r"([a-zA-Z])\s*、\s*([a-zA-Z])", r"\1, \2", normalized_line)
-                normalized_line = re.sub(r"([a-zA-Z])\s*．\s*([a-zA-Z])", r"\1. \2", normalized_line)
-                normalized_line = re.sub(r"([a-zA-Z])\s*！\s*([a-zA-Z])", r"\1! \2", normalized_line)
-                normalized_line = re.sub(r"([a-zA-Z])\s*？\s*([a-zA-Z])", r"\1? \2", normalized_line)
-                
-                # 連続する句読点を整理（日本語・英語両方）
-                normalized_line = re.sub(r"[,，]{2,}", "、", normalized_line)
-                normalized_line = re.sub(r"[.．]{2,}", "。", normalized_line)
-                normalized_line = re.sub(r"[!！]{2,}", "！", normalized_line)
-                normalized_line = re.sub(r"[?？]{2,}", "？", normalized_line)
-                
-                # 括弧の前後の空白調整
-                normalized_line = re.sub(r"\s*\(\s*", " (", normalized_line)
-                normalized_line = re.sub(r"\s*\)\s*", ") ", normalized_line)
-                normalized_line = re.sub(r"\s*\[\s*", " [", normalized_line)
-                normalized_line = re.sub(r"\s*\]\s*", "] ", normalized_line)
-                
-                result_lines.append(normalized_line)
-        
-        return "\n".join(result_lines)
+        return self.rules["punctuation"].apply(_join_lines(text))
 
     def normalize_line_breaks(self, text: str) -> str:
         """Normalize line breaks and spacing for better structure."""
-        # 行頭・行末の空白削除
-        lines = text.splitlines()
-        cleaned_lines = [line.strip() for line in lines]
-        
-        # 空行を削除して2行以上の連続改行を2行に統一
-        result_lines = []
-        prev_empty = False
-        for line in cleaned_lines:
-            if line == "":
-                if not prev_empty:
-                    result_lines.append("")
-                prev_empty = True
-            else:
-                result_lines.append(line)
-                prev_empty = False
-        
-        # 最後の空行を削除
-        while result_lines and result_lines[-1] == "":
-            result_lines.pop()
-        
-        return "\n".join(result_lines)
+        # 行頭・行末の空白を削除し、連続する空行は1行に、末尾の空行は削除
+        return "\n".join(_tidy_lines(text.splitlines()))
 
     def _is_python_code(self, text: str) -> bool:
         """Check if the text appears to be Python source code."""
-        # Pythonコードの特徴を検出
-        python_indicators = [
-            r'import\s+\w+',
-            r'from\s+\w+\s+import',
-            r'def\s+\w+\s*\(',
-            r'class\s+\w+',
-            r'#\s*SPDX-',
-            r'__all__\s*=',
-        ]
-        
-        text_lower = text.lower()
-        for pattern in python_indicators:
-            if re.search(pattern, text_lower):
-                return True
-        
-        return False
+        if isinstance(text, Chunk):
+            return text.python
+        return is_python_code(text)
 
     def adjust_spacing(self, text: str) -> str:
         """Adjust spacing for better readability."""
         # Pythonコードの場合は特別な処理
         if self._is_python_code(text):
             return self._adjust_spacing_python(text)
-        
-        lines = text.splitlines()
-        result_lines = []
-        
-        for line in lines:
-            if line.strip() == "":
-                result_lines.append("")
-            else:
-                # 行内の空白調整
-                adjusted_line = line
-                # 連続する空白を1つに
-                adjusted_line = re.sub(r" {2,}", " ", adjusted_line)
-                # 句読点の前の空白を削除
-                adjusted_line = re.sub(r"\s+([,.!?;:、。！？：；])", r"\1", adjusted_line)
-                # 英語句読点の後の空白を1つに統一
-                adjusted_line = re.sub(r"([,.!?;:])\s*", r"\1 ", adjusted_line)
-                # 日本語句読点の後の空白を削除（行末は除く）
-                adjusted_line = re.sub(r"([、。！？：；])\s+(?!$)", r"\1", adjusted_line)
-                result_lines.append(adjusted_line)
-        
-        return "\n".join(result_lines)
+        return SPACING.apply(_join_lines(text))
 
     def _adjust_spacing_python(self, text: str) -> str:
         """Adjust spacing for Python source code while preserving syntax."""
-        lines = text.splitlines()
-        result_lines = []
-        
-        for line in lines:
-            if line.strip() == "":
-                result_lines.append("")
-            else:
-                # Pythonコードの場合は最小限の調整のみ
-                adjusted_line = line
-                # 連続する空白を1つに（ただしインデントは保持）
-                adjusted_line = re.sub(r"(?<!^) {2,}", " ", adjusted_line)
-                # 行末の空白を削除
-                adjusted_line = adjusted_line.rstrip()
-                result_lines.append(adjusted_line)
-        
-        return "\n".join(result_lines)
+        # Pythonコードの場合は最小限の調整のみ
+        return PYTHON_SPACING.apply(_join_lines(text))
 
     def improve_structure(self, text: str) -> str:
         """Improve document structure with proper line breaks after headings."""
-        lines = text.splitlines()
-        result_lines = []
-        
-        for i, line in enumerate(lines):
-            is_heading = self._is_heading(line)
+        return "\n".join(self._structured_lines(text.splitlines()))
 
+    def _structured_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        # 直前の行が見出しなら、空でない行の前に空行を入れる
+        after_heading = False
+        for line in lines:
+            if after_heading and line.strip() != "":
+                yield ""
+            is_heading = self._is_heading(line)
             if is_heading and self.enable_markdown_headings and not line.lstrip().startswith("#"):
                 line = "# " + line.strip()
+            yield line
+            after_heading = is_heading
 
-            result_lines.append(line)
-
-            # 見出しの後に改行を追加
-            if is_heading:
-                # 次の行が空でない場合は空行を追加
-                if i + 1 < len(lines) and lines[i + 1].strip() != "":
-                    result_lines.append("")
-        
-        return "\n".join(result_lines)
-    
     def _is_heading(self, line: str) -> bool:
         """Check if a line is a heading."""
         line = line.strip()
-
         # 数字を含む行は見出しとみなさない
-        if re.search(r"\d", line):
+        if _DIGIT.search(line):
             return False
-        
-        # 見出しのパターンを検出
-        heading_patterns = [
-            r"^#{1,6}\s+",  # Markdown形式
-            r"^[A-Z][A-Z\s]+$",  # 大文字のみの行
-            r"^[一二三四五六七八九十]+[、．]",  # 日本語の番号付き見出し
-            r"^[0-9]+[、．]",  # 数字の番号付き見出し
-            r"^[A-Z][^.!?]*$",  # 文頭が大文字で文末に句読点がない行
-            r"^[あ-んア-ン一-龯]+[：:]",  # 日本語見出し（：で終わる）
-            r"^第[一二三四五六七八九十\d]+[章節]",  # 第X章、第X節
-            r"^[一二三四五六七八九十\d]+[、．]\s*[あ-んア-ン一-龯]+",  # 番号付き見出し
-            r"^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$",  # Title Case見出し
-            r"^[（(][一二三四五六七八九十\d]+[）)]",  # （1）（一）形式
-            r"^[①②③④⑤⑥⑦⑧⑨⑩]",  # 丸数字
-            r"^[A-Z][A-Z\s]+[：:]",  # 英語見出し（：で終わる）
-            r"^[あ-んア-ン一-龯]{2,}[（(][一二三四五六七八九十\d]+[）)]",  # 日本語見出し（番号付き）
-            r"^[あ-んア-ン一-龯]{2,}\s*[（(][一二三四五六七八九十\d]+[）)]",  # 日本語見出し（番号付き、空白あり）
-        ]
-        
-        for pattern in heading_patterns:
-            if re.match(pattern, line):
-                return True
-        
-        return False
+        return _HEADING.match(line) is not None
 
     def process(self, text: str) -> Dict[str, Any]:
+        # 形式の判定は Chunk に一度だけ行わせる
+        chunk = as_chunk(text)
+        text = chunk.text
         original = text
         
         # Markdownファイルの場合は特別な処理
-        if is_markdown_file(text):
-            return self._process_markdown_text(text)
+        if chunk.markdown:
+            return self._process_markdown_text(chunk)
         
         # Pythonコードの場合は特別な処理
-        if self._is_python_code(text):
+        if chunk.python:
             return self._process_python_code(text)
         
         # 音声認識テキストの場合は特別な処理
-        if self._is_speech_text(text):
+        if chunk.speech:
             return self._process_speech_text(text)
         
-        # 処理順序を最適化
-        # 1. 基本的な修正
-        text = self.remove_duplicate_lines(text)
-        text = self.balance_parentheses(text)
-        text = self.fix_common_typos(text)
-        
-        # 2. 句読点の正規化（空白調整の前に実行）
-        text = self.normalize_punctuation(text)
-        
-        # 3. 空白・改行の正規化
-        text = self.normalize_line_breaks(text)
-        text = self.adjust_spacing(text)
-        
-        # 4. 構造の改善（最後に実行して他の処理で上書きされないようにする）
-        text = self.improve_structure(text)
-
-        # 5. LLM 生成物のディスクレーマーを削除
-        text = self.remove_llm_disclaimers(text)
+        # 1〜5. 基本的な修正から LLM ディスクレーマーの削除まで
+        text = self._fix_lines(text.splitlines())
 
         # 6. 用語集による置換
         text = self.apply_glossary(text)
@@ -396,31 +234,47 @@ class Fixer:
         changed = text != original
         return {"text": text, "changed": changed}
 
+    def _fix_lines(self, lines: Iterable[str], structure: bool = True, disclaimers: bool = True) -> str:
+        """Apply the common fixes to a stream of lines.
+
+        The result is identical to calling :meth:`remove_duplicate_lines`,
+        :meth:`balance_parentheses`, :meth:`fix_common_typos`,
+        :meth:`normalize_punctuation`, :meth:`normalize_line_breaks`,
+        :meth:`adjust_spacing`, :meth:`improve_structure` and
+        :meth:`remove_llm_disclaimers` one after another, but the text is
+        split into lines three times rather than once per step. The rule sets only
+        look inside a line and run over the whole text, which is faster than
+        calling the regexes line by line.
+        """
+        # 1. 基本的な修正（括弧の数は重複行を除いた全文で数える）
+        text = self.balance_parentheses("\n".join(_unique_lines(lines)))
+        text = self.fix_common_typos(text)
+
+        # 2. 句読点の正規化（空白調整の前に実行）
+        text = self.normalize_punctuation(text)
+
+        # 3. 空白・改行の正規化
+        text = self.adjust_spacing("\n".join(_tidy_lines(text.split("\n"))))
+
+        # 4. 構造の改善と 5. LLM 生成物のディスクレーマー削除を一度の走査で行う
+        out: Iterable[str] = text.splitlines()
+        if structure:
+            out = self._structured_lines(out)
+        if disclaimers:
+            out = _without_disclaimers(out)
+        text = "\n".join(out)
+        return text.strip() if disclaimers else text
+
     def _process_markdown_text(self, text: str) -> Dict[str, Any]:
         """Process Markdown text while preserving formatting."""
-        original = text
+        original = str(text)
         
         # Markdownブロックを抽出して保護
-        processed_text, markdown_blocks = extract_critical_markdown_blocks(text)
+        processed_text, markdown_blocks = as_chunk(text).protected
         
         # テキストコンテンツのみに処理を適用
-        # 1. 基本的な修正
-        processed_text = self.remove_duplicate_lines(processed_text)
-        processed_text = self.balance_parentheses(processed_text)
-        processed_text = self.fix_common_typos(processed_text)
-        
-        # 2. 句読点の正規化
-        processed_text = self.normalize_punctuation(processed_text)
-        
-        # 3. 空白・改行の正規化
-        processed_text = self.normalize_line_breaks(processed_text)
-        processed_text = self.adjust_spacing(processed_text)
-        
-        # 4. Markdownファイルの場合は構造改善をスキップ（既にMarkdown構造があるため）
-        # processed_text = self.improve_structure(processed_text)
-
-        # 5. LLM 生成物のディスクレーマーを削除
-        processed_text = self.remove_llm_disclaimers(processed_text)
+        # Markdownファイルの場合は構造改善をスキップ（既にMarkdown構造があるため）
+        processed_text = self._fix_lines(processed_text.splitlines(), structure=False)
 
         # 6. 用語集による置換
         processed_text = self.apply_glossary(processed_text)
@@ -433,18 +287,9 @@ class Fixer:
 
     def _is_speech_text(self, text: str) -> bool:
         """Check if the text appears to be speech recognition output."""
-        # 音声認識テキストの特徴を検出
-        speech_indicators = [
-            r"\[[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\]\s*speaker_[12]:",  # タイムスタンプと話者
-            r"speaker_[12]:",  # 話者情報
-            r"\[[0-9]+\.[0-9]+-[0-9]+\.[0-9]+\]",  # タイムスタンプ
-        ]
-        
-        for pattern in speech_indicators:
-            if re.search(pattern, text):
-                return True
-        
-        return False
+        if isinstance(text, Chunk):
+            return text.speech
+        return is_speech_text(text)
 
     def _process_speech_text(self, text: str) -> Dict[str, Any]:
         """Process speech recognition text with specialized corrections."""
@@ -455,25 +300,11 @@ class Fixer:
         text = self.fix_speech_recognition_errors(text)
         
         # 2. アーティファクトの削除
-        text = self.remove_speech_artifacts(text)
-        
         # 3. テキストの正規化（タイムスタンプ削除など）
-        text = self.normalize_speech_text(text)
-        
-        # 4. 基本的な修正
-        text = self.remove_duplicate_lines(text)
-        text = self.balance_parentheses(text)
-        text = self.fix_common_typos(text)
-        
-        # 5. 句読点の正規化
-        text = self.normalize_punctuation(text)
-        
-        # 6. 空白・改行の正規化
-        text = self.normalize_line_breaks(text)
-        text = self.adjust_spacing(text)
-        
-        # 7. 構造の改善
-        text = self.improve_structure(text)
+        lines = _speech_lines(_without_speech_artifacts(text.splitlines()))
+
+        # 4〜7. 基本的な修正から構造の改善まで
+        text = self._fix_lines(lines, disclaimers=False)
 
         # 8. 用語集による置換
         text = self.apply_glossary(text)
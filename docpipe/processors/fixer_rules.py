@@ -0,0 +1,257 @@
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+try:  # optional dependency
+    import yaml  # type: ignore
+except Exception:  # pragma: no cover - optional
+    yaml = None  # type: ignore
+
+from ..utils.aho_corasick import AhoCorasick
+
+# 正規表現の選択肢として扱う上限。これを超える辞書は Aho-Corasick で一括置換する
+_REGEX_LITERAL_LIMIT = 256
+
+
+class Rule(NamedTuple):
+    """One replacement rule: a regex, or a literal string when ``literal`` is set.
+
+    A regex rule with ``requires`` is skipped when none of those characters
+    occur in the text, which saves a full scan for rarely matching rules.
+    """
+
+    pattern: str
+    replacement: str = ""
+    literal: bool = False
+    ignore_case: bool = False
+    multiline: bool = False
+    requires: str = ""
+
+
+def literal(pattern: str, replacement: str = "") -> Rule:
+    return Rule(pattern, replacement, literal=True)
+
+
+# 音声認識でよく発生する誤認識パターン
+SPEECH_RULES: List[Rule] = [
+    # 専門用語の誤認識
+    literal("アイロン", "アライアンス"),
+    # 固有名詞の誤認識
+    literal("Win Hello", "Windows Hello"),
+    literal("Win EOS", "Windows EOS"),
+    literal("Win10", "Windows 10"),
+    literal("Win 10", "Windows 10"),
+    literal("Ryzen AI5", "Ryzen 5"),
+    literal("Ryzen AI 5", "Ryzen 5"),
+    literal("Ryzen AI7", "Ryzen 7"),
+    literal("Ryzen AI 7", "Ryzen 7"),
+    literal("Ryzen AI9", "Ryzen 9"),
+    literal("Ryzen AI 9", "Ryzen 9"),
+    # 一般的な音声認識エラー（正しい「コパイロット」はそのまま残す）
+    literal("コパイロット", "コパイロット"),
+    literal("ココパイロット", "コパイロット"),
+    literal("パイロット", "コパイロット"),
+    # 音声認識の不完全な単語
+    Rule(r"\b(?:す|r|ned|Oops|s|gotten)\b"),
+    # 句読点の誤認識
+    Rule(r"、\s*、", "、", requires="、"),
+    Rule(r"。\s*。", "。", requires="。"),
+    Rule(r"！\s*！", "！", requires="！"),
+    Rule(r"？\s*？", "？", requires="？"),
+    # 空白の誤認識
+    literal("（削除）"),
+    literal("(削除)"),
+]
+
+TYPO_RULES: List[Rule] = [
+    Rule(r"\bteh\b", "the", ignore_case=True, requires="tT"),
+    Rule(r"\brecieve\b", "receive", ignore_case=True, requires="rR"),
+    Rule(r" {2,}", " "),
+]
+
+# 行単位の処理と同じ結果になるよう、空白は改行を含まない [^\S\n] で表す
+PUNCTUATION_RULES: List[Rule] = [
+    # 空白だけの行は空行にする
+    Rule(r"^[^\S\n]+$", "", multiline=True),
+    # 全角スペースを半角に統一
+    literal("\u3000", " "),
+    # 英語部分の句読点を半角に統一（日本語部分は保持）
+    Rule(r"([a-zA-Z])[^\S\n]*、[^\S\n]*([a-zA-Z])", r"\1, \2", requires="、"),
+    Rule(r"([a-zA-Z])[^\S\n]*．[^\S\n]*([a-zA-Z])", r"\1. \2", requires="．"),
+    Rule(r"([a-zA-Z])[^\S\n]*！[^\S\n]*([a-zA-Z])", r"\1! \2", requires="！"),
+    Rule(r"([a-zA-Z])[^\S\n]*？[^\S\n]*([a-zA-Z])", r"\1? \2", requires="？"),
+    # 連続する句読点を整理（日本語・英語両方）
+    Rule(r"[,，]{2,}", "、", requires=",，"),
+    Rule(r"[.．]{2,}", "。", requires=".．"),
+    Rule(r"[!！]{2,}", "！", requires="!！"),
+    Rule(r"[?？]{2,}", "？", requires="?？"),
+    # 括弧の前後の空白調整
+    Rule(r"[^\S\n]*\([^\S\n]*", " (", requires="("),
+    Rule(r"[^\S\n]*\)[^\S\n]*", ") ", requires=")"),
+    Rule(r"[^\S\n]*\[[^\S\n]*", " [", requires="["),
+    Rule(r"[^\S\n]*\][^\S\n]*", "] ", requires="]"),
+]
+
+SPACING_RULES: List[Rule] = [
+    Rule(r"^[^\S\n]+$", "", multiline=True),
+    # 連続する空白を1つに
+    Rule(r" {2,}", " "),
+    # 句読点の前の空白を削除
+    Rule(r"[^\S\n]+([,.!?;:、。！？：；])", r"\1"),
+    # 英語句読点の後の空白を1つに統一
+    Rule(r"([,.!?;:])[^\S\n]*", r"\1 "),
+    # 日本語句読点の後の空白を削除（行末は除く）
+    Rule(r"([、。！？：；])[^\S\n]+(?!$)", r"\1", multiline=True),
+]
+
+PYTHON_SPACING_RULES: List[Rule] = [
+    # 連続する空白を1つに（ただしインデントは保持）
+    Rule(r"(?<!^) {2,}", " ", multiline=True),
+    # 行末の空白を削除
+    Rule(r"[^\S\n]+$", "", multiline=True),
+]
+
+DEFAULT_RULES: Dict[str, List[Rule]] = {
+    "speech": SPEECH_RULES,
+    "typos": TYPO_RULES,
+    "punctuation": PUNCTUATION_RULES,
+}
+
+
+class _LiteralPass:
+    """Replace many literal strings in one leftmost-longest scan."""
+
+    def __init__(self, mapping: Dict[str, str]) -> None:
+        self.mapping = mapping
+        self.terms = sorted(mapping, key=len, reverse=True)
+        self._regex: Optional["re.Pattern[str]"] = None
+        self._matcher: Optional[AhoCorasick] = None
+        if len(self.terms) <= _REGEX_LITERAL_LIMIT:
+            # 長い語を先に並べると、同じ位置では最長一致になる
+            self._regex = re.compile("|".join(map(re.escape, self.terms)))
+        else:
+            # 大きな辞書でも走査は本文の長さに比例するだけで済む
+            self._matcher = AhoCorasick(self.terms)
+
+    def __call__(self, text: str) -> str:
+        if self._regex is not None:
+            mapping = self.mapping
+            return self._regex.sub(lambda m: mapping[m.group()], text)
+        pieces: List[str] = []
+        pos = 0
+        for start, end, idx in self._matcher.leftmost_longest(text):  # type: ignore[union-attr]
+            pieces.append(text[pos:start])
+            pieces.append(self.mapping[self.terms[idx]])
+            pos = end
+        if not pieces:
+            return text
+        pieces.append(text[pos:])
+        return "".join(pieces)
+
+
+class _RegexStep:
+    def __init__(self, regex: "re.Pattern[str]", replacement: str, requires: str = "") -> None:
+        self.regex = regex
+        self.replacement = replacement
+        self.requires = requires
+
+    def __call__(self, text: str) -> str:
+        # 必要な文字が一つもなければ全文の走査を省く
+        if self.requires and not any(ch in text for ch in self.requires):
+            return text
+        return self.regex.sub(self.replacement, text)
+
+
+class RuleSet:
+    """Rules compiled once and applied to the whole text in table order.
+
+    Consecutive literal rules are merged into a single leftmost-longest pass
+    (a later rule for the same literal wins), so a dictionary costs one scan
+    however many entries it has. Rules loaded from a file are appended to
+    the defaults and join a trailing literal run.
+    """
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self.rules = list(rules)
+        self._steps: List[Callable[[str], str]] = []
+        mapping: Dict[str, str] = {}
+        for rule in self.rules:
+            if rule.literal:
+                if rule.pattern:
+                    mapping[rule.pattern] = rule.replacement
+                continue
+            if mapping:
+                self._steps.append(_LiteralPass(mapping))
+                mapping = {}
+            flags = (re.IGNORECASE if rule.ignore_case else 0) | (re.MULTILINE if rule.multiline else 0)
+            self._steps.append(_RegexStep(re.compile(rule.pattern, flags), rule.replacement, rule.requires))
+        if mapping:
+            self._steps.append(_LiteralPass(mapping))
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def apply(self, text: str) -> str:
+        for step in self._steps:
+            text = step(text)
+        return text
+
+
+def _parse_rule(item: Union[Dict, str], replacement: str = "") -> Rule:
+    if isinstance(item, str):
+        return literal(item, replacement)
+    if not isinstance(item, dict):
+        raise ValueError(f"Invalid fixer rule: {item!r}")
+    repl = str(item.get("replace", "") or "")
+    if "literal" in item:
+        return literal(str(item["literal"]), repl)
+    if "pattern" in item:
+        return Rule(
+            str(item["pattern"]),
+            repl,
+            ignore_case=bool(item.get("ignore_case", False)),
+            multiline=bool(item.get("multiline", False)),
+            requires=str(item.get("requires", "") or ""),
+        )
+    raise ValueError(f"Fixer rule needs 'literal' or 'pattern': {item!r}")
+
+
+def load_rules(path: Union[str, Path]) -> Dict[str, List[Rule]]:
+    """Load extra rules per section (``speech``, ``typos``, ``punctuation``) from YAML.
+
+    A section is either a mapping of literal replacements or a list of
+    ``{literal|pattern, replace, ignore_case, multiline, requires}`` entries.
+    """
+    if yaml is None:
+        raise ImportError("PyYAML is required for fixer rule files")
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    if not isinstance(data, dict):
+        raise ValueError(f"Fixer rule file must be a mapping of sections: {path}")
+    rules: Dict[str, List[Rule]] = {}
+    for section, entries in data.items():
+        if section not in DEFAULT_RULES:
+            raise ValueError(f"Unknown fixer rule section: {section}")
+        if isinstance(entries, dict):
+            rules[section] = [_parse_rule(str(k), str(v or "")) for k, v in entries.items()]
+        else:
+            rules[section] = [_parse_rule(item) for item in entries or []]
+    return rules
+
+
+def build_rule_sets(path: Optional[Union[str, Path]] = None) -> Dict[str, RuleSet]:
+    """Compile the default rules, extended by the rules in ``path`` if given."""
+    if path is None:
+        return dict(_DEFAULT_RULE_SETS)
+    extra = load_rules(path)
+    return {
+        section: RuleSet(rules + extra.get(section, []))
+        if section in extra
+        else _DEFAULT_RULE_SETS[section]
+        for section, rules in DEFAULT_RULES.items()
+    }
+
+
+_DEFAULT_RULE_SETS: Dict[str, RuleSet] = {section: RuleSet(rules) for section, rules in DEFAULT_RULES.items()}
+SPACING = RuleSet(SPACING_RULES)
+PYTHON_SPACING = RuleSet(PYTHON_SPACING_RULES)
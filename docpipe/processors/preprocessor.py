@@ -1,28 +1,46 @@
+import itertools
 import re
-from typing import Dict
-from ..utils.markdown_utils import (
-    is_markdown_file, 
-    extract_critical_markdown_blocks, 
-    restore_critical_markdown_blocks
-)
+from typing import Dict, Iterable, Iterator, List
+
+from ..document import Chunk, as_chunk
+from ..utils.markdown_utils import restore_critical_markdown_blocks
+
+# 段落を終える文末記号
+_SENTENCE_END = tuple(".!?。？！：:")
 
 
 class Preprocessor:
-    """Text normalization and cleanup processor."""
+    """Text normalization and cleanup processor.
+
+    :meth:`iter_paragraphs` does the same work on a stream of text pieces
+    (lines of a file, pages of an OCR dump) and yields each paragraph as
+    soon as it is complete, so memory use does not grow with the input.
+    """
 
     OCR_CORRECTIONS: Dict[str, str] = {
         "ﬁ": "fi",
         "ﬂ": "fl",
-        "'": "'",
-        """: '"',
-        """: '"',
+        "‘": "'",
+        "’": "'",
+        "“": '"',
+        "”": '"',
         "—": "-",
         "–": "-",
     }
 
+    def __init__(self) -> None:
+        # 1文字の置換は str.translate の一回の走査で済ませる
+        self._ocr_table = str.maketrans(
+            {wrong: correct for wrong, correct in self.OCR_CORRECTIONS.items() if len(wrong) == 1}
+        )
+        self._ocr_replacements = [
+            (wrong, correct) for wrong, correct in self.OCR_CORRECTIONS.items() if len(wrong) > 1
+        ]
+
     def correct_ocr_errors(self, text: str) -> str:
         """Apply common OCR corrections."""
-        for wrong, correct in self.OCR_CORRECTIONS.items():
+        text = text.translate(self._ocr_table)
+        for wrong, correct in self._ocr_replacements:
             text = text.replace(wrong, correct)
         return text
 
@@ -51,25 +69,89 @@ class Preprocessor:
         lines = [line.rstrip() for line in text.splitlines()]
         return "\n".join(lines).strip()
 
+    def _paragraphs(self, lines: Iterable[str]) -> Iterator[str]:
+        """Merge lines into paragraphs, the streaming form of the two steps above.
+
+        A blank line or a line ending with sentence punctuation ends a
+        paragraph; other lines are joined with a space. ``\\r\\n`` line ends
+        are accepted. As in :meth:`restore_line_breaks`, only an empty line
+        is blank: a line of spaces, tabs or ``\\u3000`` is joined like text,
+        and a paragraph made only of such lines is dropped. Unlike the regex
+        steps, which could leave several blank lines where such a line stood
+        between blank lines, paragraphs are always separated by exactly one
+        blank line.
+        """
+        para: List[str] = []
+        started = False
+        # 末尾の空行で最後の段落を確定させる
+        for line in itertools.chain(lines, [""]):
+            if line.endswith("\r"):
+                line = line[:-1]
+            if line:
+                para.append(line)
+                if not line.endswith(_SENTENCE_END):
+                    continue
+            if not para:
+                continue
+            text = " ".join(para)
+            para = []
+            if not started:
+                # 文書先頭の空白は落とす
+                text = text.lstrip()
+            text = "\n".join(part.rstrip() for part in text.splitlines())
+            if text:
+                started = True
+                yield text
+
+    def iter_lines(self, pieces: Iterable[str]) -> Iterator[str]:
+        """Split a stream of text pieces into OCR-corrected lines.
+
+        Pieces are concatenated as given, so a page that should not run into
+        the next one must end with a newline. Only the current partial line
+        is buffered.
+        """
+        rest = ""
+        for piece in pieces:
+            lines = (rest + piece).split("\n")
+            rest = lines.pop()
+            for line in lines:
+                yield self.correct_ocr_errors(line)
+        if rest:
+            yield self.correct_ocr_errors(rest)
+
+    def iter_paragraphs(self, pieces: Iterable[str]) -> Iterator[str]:
+        """Preprocess a stream of plain text and yield finished paragraphs.
+
+        ``"\\n\\n".join(...)`` of the result equals :meth:`process` on the
+        concatenated text when it is not Markdown. Memory is bounded by the
+        longest paragraph.
+        """
+        return self._paragraphs(self.iter_lines(pieces))
+
+    def _preprocess(self, text: str) -> str:
+        return "\n\n".join(self.iter_paragraphs([text]))
+
     def process(self, text: str) -> str:
-        """Run all preprocessing steps."""
+        """Run all preprocessing steps.
+
+        A :class:`~docpipe.document.Chunk` input keeps its format flags in
+        the returned chunk, so later stages do not detect them again.
+        """
+        chunk = as_chunk(text)
         # Check if this is a Markdown file
-        if is_markdown_file(text):
+        if chunk.markdown:
             # Extract Markdown blocks to protect them
-            processed_text, markdown_blocks = extract_critical_markdown_blocks(text)
-            
+            processed_text, markdown_blocks = chunk.protected
+
             # Apply preprocessing to the text content only
-            processed_text = self.correct_ocr_errors(processed_text)
-            processed_text = self.restore_line_breaks(processed_text)
-            processed_text = self.standardize_format(processed_text)
-            
+            processed_text = self._preprocess(processed_text)
+
             # Restore Markdown blocks
             processed_text = restore_critical_markdown_blocks(processed_text, markdown_blocks)
-            
-            return processed_text
         else:
             # Original processing for non-Markdown files
-            text = self.correct_ocr_errors(text)
-            text = self.restore_line_breaks(text)
-            text = self.standardize_format(text)
-            return text
+            processed_text = self._preprocess(chunk.text)
+
+        if isinstance(text, Chunk):
+            return text.with_text(processed_text)
+        return processed_text
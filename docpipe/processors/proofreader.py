@@ -5,9 +5,12 @@ except Exception:  # pragma: no cover - optional dependency
     openai = None  # type: ignore
     OpenAI = None  # type: ignore
 
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence
 
 from ..glossary import Glossary
+from ..streaming import complete
+from ..tracing import record_usage
 
 
 class Proofreader:
@@ -24,6 +27,7 @@ class Proofreader:
             "結果だけを出力してください。"
         ),
         glossary: Optional[Glossary] = None,
+        stream: bool = False,
     ) -> None:
         if openai is None:
             raise ImportError("openai is required for Proofreader")
@@ -32,14 +36,14 @@ class Proofreader:
         self.temperature = temperature
         self.prompt = prompt
         self.glossary = glossary
+        self.stream = stream
 
-    def proofread(
+    def _messages(
         self,
         text: str,
         error_rate: Optional[float] = None,
         readability: Optional[float] = None,
-    ) -> str:
-        """Return text corrected by ChatGPT."""
+    ) -> List[Dict[str, str]]:
         prompt = self.prompt.format(style=self.style)
         metrics: list[str] = []
         if error_rate is not None:
@@ -48,19 +52,80 @@ class Proofreader:
             metrics.append(f"readability score {readability:.2f}")
         if metrics:
             prompt += " Current metrics: " + ", ".join(metrics) + "."
+        return [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": text},
+        ]
+
+    def _finish(self, content: str) -> str:
+        text = content.strip()
+        if self.glossary is not None:
+            text = self.glossary.replace(text)
+        return text
+
+    def proofread(
+        self,
+        text: str,
+        error_rate: Optional[float] = None,
+        readability: Optional[float] = None,
+    ) -> str:
+        """Return text corrected by ChatGPT."""
         client = OpenAI()
-        resp = client.chat.completions.create(
+        content = complete(
+            client,
+            "proofread",
+            self.stream,
             model=self.model,
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": text},
-            ],
+            messages=self._messages(text, error_rate, readability),
             temperature=self.temperature,
         )
-        text = resp.choices[0].message.content.strip()
-        if self.glossary is not None:
-            text = self.glossary.replace(text)
-        return text
+        return self._finish(content)
+
+    def proofread_candidates(
+        self,
+        text: str,
+        n: int,
+        temperatures: Sequence[float] = (),
+        error_rate: Optional[float] = None,
+        readability: Optional[float] = None,
+    ) -> List[str]:
+        """Return several proofreading candidates from one parallel round.
+
+        With ``temperatures`` one request per temperature is sent
+        concurrently; otherwise a single request asks for ``n`` choices at
+        the configured temperature. Candidates are never streamed.
+        """
+        messages = self._messages(text, error_rate, readability)
+        client = OpenAI()
+        if not temperatures:
+            resp = client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                n=n,
+            )
+            record_usage(resp)
+            return [self._finish(choice.message.content) for choice in resp.choices]
+
+        def request(temperature: float) -> Any:
+            return client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+            )
+
+        with ThreadPoolExecutor(max_workers=len(temperatures), thread_name_prefix="proofread") as pool:
+            responses = list(pool.map(request, temperatures))
+        candidates = []
+        for resp in responses:
+            # 使用量の記録はトレーサーのあるこのスレッドで行う
+            record_usage(resp)
+            candidates.append(self._finish(resp.choices[0].message.content))
+        return candidates
+
+    def _result(self, original: str, corrected: str) -> Dict[str, Any]:
+        quality_score = 1.0 if corrected == original else 0.95
+        return {"text": corrected, "quality_score": quality_score}
 
     def process(
         self,
@@ -70,5 +135,18 @@ class Proofreader:
     ) -> Dict[str, Any]:
         """Proofread text and return corrections with a simple quality score."""
         corrected = self.proofread(text, error_rate=error_rate, readability=readability)
-        quality_score = 1.0 if corrected == text else 0.95
-        return {"text": corrected, "quality_score": quality_score}
+        return self._result(text, corrected)
+
+    def process_candidates(
+        self,
+        text: str,
+        n: int,
+        temperatures: Sequence[float] = (),
+        error_rate: Optional[float] = None,
+        readability: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Like :meth:`process` for each of :meth:`proofread_candidates`."""
+        candidates = self.proofread_candidates(
+            text, n, temperatures, error_rate=error_rate, readability=readability
+        )
+        return [self._result(text, corrected) for corrected in candidates]
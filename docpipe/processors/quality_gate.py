@@ -0,0 +1,128 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ..document import as_chunk
+from .evaluator import EvaluationResult, Evaluator
+
+
+class QualityGate:
+    """Cheap first-stage quality estimate in front of :meth:`Evaluator.evaluate`.
+
+    The estimate is a linear function of the readability score, which only
+    needs character counts. Without calibration it is the evaluator's own
+    quality formula with no grammar errors, i.e. an upper bound. Only a
+    chunk whose estimate is more than ``margin`` below the quality threshold
+    is rejected from the estimate alone, skipping the LanguageTool check;
+    every chunk that could pass gets the full evaluation, including the
+    grammar error rate gate.
+    """
+
+    def __init__(
+        self,
+        margin: float = 0.05,
+        slope: Optional[float] = None,
+        intercept: Optional[float] = None,
+    ) -> None:
+        self.margin = margin
+        self.slope = slope
+        self.intercept = intercept
+
+    @classmethod
+    def from_config(cls, pipeline_cfg: Any) -> Optional["QualityGate"]:
+        """Build the gate from ``PipelineConfig``, or ``None`` when disabled."""
+        if not getattr(pipeline_cfg, "quality_gate", False):
+            return None
+        path = getattr(pipeline_cfg, "quality_gate_calibration", None)
+        if path:
+            return cls.load(path)
+        return cls(margin=pipeline_cfg.quality_gate_margin)
+
+    def estimate(self, evaluator: Evaluator, text: Any) -> Tuple[float, float]:
+        """Return ``(estimated quality, readability)`` without grammar checking."""
+        chunk = as_chunk(text)
+        language = evaluator.detect_language(chunk)
+        if language == "ja":
+            readability = evaluator.readability_score_japanese(chunk)
+        else:
+            readability = evaluator.readability_score_english(chunk)
+
+        if self.slope is not None and self.intercept is not None:
+            quality = self.slope * readability + self.intercept
+        elif language == "ja":
+            quality = 0.3 + 0.7 * readability
+        else:
+            quality = (1 + readability) / 2
+        return max(0.0, min(1.0, quality)), readability
+
+    def evaluate(self, evaluator: Evaluator, text: Any, threshold: float) -> Optional[EvaluationResult]:
+        """Return an estimated result for a sure reject, or ``None`` when the full check is needed."""
+        quality, readability = self.estimate(evaluator, text)
+        # 推定値は文法誤りを無視した上限なので、確実に不合格のときだけ省略できる
+        if quality >= threshold - self.margin:
+            return None
+        return {
+            "grammar_error_rate": None,
+            "readability_score": readability,
+            "bleu_score": None,
+            "quality_score": quality,
+        }
+
+    @classmethod
+    def fit(cls, samples: Iterable[Tuple[float, float]], coverage: float = 0.95) -> "QualityGate":
+        """Fit the gate on ``(readability, quality)`` pairs.
+
+        The line is a least-squares fit and the margin is the ``coverage``
+        quantile of the absolute residuals, so that share of the historical
+        chunks rejected by the estimate would also have failed the full
+        evaluation.
+        """
+        pairs = list(samples)
+        if len(pairs) < 2:
+            raise ValueError("At least two samples are needed to calibrate the quality gate")
+        n = len(pairs)
+        mean_x = sum(x for x, _ in pairs) / n
+        mean_y = sum(y for _, y in pairs) / n
+        var_x = sum((x - mean_x) ** 2 for x, _ in pairs)
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in pairs) / var_x if var_x else 0.0
+        intercept = mean_y - slope * mean_x
+        residuals = sorted(abs(y - (slope * x + intercept)) for x, y in pairs)
+        idx = min(n - 1, max(0, int(round(coverage * n)) - 1))
+        return cls(margin=residuals[idx], slope=slope, intercept=intercept)
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {"slope": self.slope, "intercept": self.intercept, "margin": self.margin}
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "QualityGate":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(margin=data["margin"], slope=data.get("slope"), intercept=data.get("intercept"))
+
+
+def _metadata_samples(metadata: Dict[str, Any]) -> Iterator[Tuple[float, float]]:
+    # 複数チャンクの場合はチャンクごとの指標を使う
+    entries: List[Dict[str, Any]] = metadata.get("chunks") or [metadata]
+    for entry in entries:
+        readability = entry.get("readability_score")
+        quality = entry.get("quality_score")
+        # 推定だけで判定したチャンクは学習に使わない
+        if readability is None or quality is None or entry.get("quality_estimated"):
+            continue
+        yield float(readability), float(quality)
+
+
+def load_calibration_samples(paths: Iterable[Union[str, Path]]) -> List[Tuple[float, float]]:
+    """Collect ``(readability, quality)`` pairs from ``final_metadata.json`` files.
+
+    Directories are searched recursively.
+    """
+    samples: List[Tuple[float, float]] = []
+    for path in map(Path, paths):
+        files = sorted(path.rglob("final_metadata.json")) if path.is_dir() else [path]
+        for file in files:
+            metadata = json.loads(file.read_text(encoding="utf-8"))
+            samples.extend(_metadata_samples(metadata))
+    return samples
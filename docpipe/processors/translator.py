@@ -6,12 +6,13 @@ except Exception:  # pragma: no cover - optional dependency
     OpenAI = None  # type: ignore
 
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
+from ..document import as_chunk
 from ..glossary import Glossary
+from ..streaming import complete
 from ..utils.markdown_utils import (
     is_markdown_file, 
-    extract_critical_markdown_blocks,
     restore_critical_markdown_blocks
 )
 
@@ -28,6 +29,8 @@ class Translator:
             "翻訳結果のみを返してください。"
         ),
         glossary: Optional[Glossary] = None,
+        glossary_in_prompt: bool = False,
+        stream: bool = False,
     ) -> None:
         if openai is None:
             raise ImportError("openai is required for Translator")
@@ -35,6 +38,22 @@ class Translator:
         self.temperature = temperature
         self.prompt = prompt
         self.glossary = glossary
+        self.glossary_in_prompt = glossary_in_prompt
+        self.stream = stream
+
+    def _messages(self, prompt: str, text: str) -> List[Dict[str, str]]:
+        """Build chat messages, adding the glossary entries found in ``text``."""
+        messages = [{"role": "user", "content": prompt}]
+        if self.glossary is None or not self.glossary_in_prompt:
+            return messages
+        entries = self.glossary.entries_in(text)
+        if entries:
+            lines = "\n".join(f"- {term} → {canonical}" for term, canonical in entries)
+            messages.insert(0, {
+                "role": "system",
+                "content": f"以下の用語は必ず指定の訳語で翻訳してください。\n{lines}",
+            })
+        return messages
 
     def detect_language(self, text: str) -> str:
         """Enhanced language detection for multiple languages."""
@@ -72,15 +91,16 @@ class Translator:
             return text
         
         # Markdownファイルの場合は見出し・表・画像を絶対保護
+        chunk = as_chunk(text)
         critical_blocks = {}
-        if is_markdown_file(text):
+        if chunk.markdown:
             print("DEBUG: Translator - Markdown file detected")
             # 見出し・表・画像を絶対保護
-            text, critical_blocks = extract_critical_markdown_blocks(text)
+            text, critical_blocks = chunk.protected
             print(f"DEBUG: Translator - Protected {len(critical_blocks)} critical blocks (headers, tables, images)")
         
         # 通常の翻訳処理
-        if is_markdown_file(text):
+        if chunk.markdown and is_markdown_file(text):
             # Markdown対応翻訳
             result = self._translate_with_markdown_preservation(text, target_lang, {})
         else:
@@ -98,7 +118,7 @@ class Translator:
     def translate_markdown(self, text: str, target_lang: str = "ja") -> str:
         """Translate Markdown text while preserving formatting."""
         # Markdownブロックを抽出して保護（重要な要素のみ）
-        processed_text, markdown_blocks = extract_critical_markdown_blocks(text)
+        processed_text, markdown_blocks = as_chunk(text).protected
         
         # テキストコンテンツのみを翻訳（Markdown構造保持の指示付き）
         translated_text = self._translate_with_markdown_preservation(processed_text, target_lang, markdown_blocks)
@@ -136,12 +156,14 @@ class Translator:
         
         # 新APIで統一
         client = OpenAI()
-        resp = client.chat.completions.create(
+        text = complete(
+            client,
+            "translate",
+            self.stream,
             model=self.model,
-            messages=[{"role": "user", "content": prompt}],
+            messages=self._messages(prompt, text),
             temperature=self.temperature,
-        )
-        text = resp.choices[0].message.content.strip()
+        ).strip()
         if self.glossary is not None:
             text = self.glossary.replace(text)
         return text
@@ -170,12 +192,14 @@ class Translator:
         
         # 新APIで統一
         client = OpenAI()
-        resp = client.chat.completions.create(
+        translated = complete(
+            client,
+            "translate",
+            self.stream,
             model=self.model,
-            messages=[{"role": "user", "content": prompt}],
+            messages=self._messages(prompt, text),
             temperature=self.temperature,
-        )
-        translated = resp.choices[0].message.content.strip()
+        ).strip()
         
         print(f"=== Translator: LLM返却テキスト（最初の100文字） ===")
         print(repr(translated[:100]))
@@ -187,12 +211,13 @@ class Translator:
 
     def process(self, text: str) -> Dict[str, Any]:
         src_lang = self.detect_language(text)
+        chunk = as_chunk(text)
         
         # Markdownファイルの場合は特別な処理
-        if is_markdown_file(text):
-            translated = self.translate_markdown(text, "ja")
+        if chunk.markdown:
+            translated = self.translate_markdown(chunk, "ja")
         else:
-            translated = self.translate(text, "en", "ja")
+            translated = self.translate(chunk, "en", "ja")
             
         return {
             "text": translated,
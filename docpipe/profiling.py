@@ -0,0 +1,104 @@
+"""Per-source profiling for ``text-agent process --profile``.
+
+:class:`SourceProfiler` runs :mod:`cProfile` for exact call counts and
+times, plus a sampling thread that records the stack of the profiled thread
+at a fixed interval. The samples are written in the collapsed-stack format
+read by ``flamegraph.pl`` and speedscope. With ``memory=True``
+:mod:`tracemalloc` is started as well and every tracing span records its
+peak memory (``peak_memory_bytes``).
+"""
+
+import collections
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import tracemalloc
+from pathlib import Path
+from types import FrameType
+from typing import Counter, Dict, List, Optional, Union
+
+from .tracing import close_peak, open_peak
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def _collapse(frame: Optional[FrameType]) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SourceProfiler:
+    """Profile the calling thread between :meth:`start` and :meth:`stop`."""
+
+    def __init__(self, interval: float = 0.005, memory: bool = False) -> None:
+        self.interval = interval
+        self.memory = memory
+        self.samples: Counter[str] = collections.Counter()
+        self.peak_memory: Optional[int] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started_tracemalloc = False
+        self._peak: Optional[List[int]] = None
+
+    def start(self) -> None:
+        self.samples.clear()
+        self.peak_memory = None
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if tracemalloc.is_tracing():
+            # スパンの reset_peak をまたいでソース全体のピークを保つ
+            self._peak = open_peak()
+        target = threading.get_ident()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample, args=(target,), name="docpipe-profiler", daemon=True)
+        self._sampler.start()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def _sample(self, target: int) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            if frame is not None:
+                self.samples[_collapse(frame)] += 1
+
+    def stop(self) -> None:
+        if self._profile is None:
+            return
+        self._profile.disable()
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self._peak is not None:
+            self.peak_memory = close_peak(self._peak)
+            self._peak = None
+        if tracemalloc.is_tracing():
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    def stats(self) -> pstats.Stats:
+        if self._profile is None:
+            raise RuntimeError("Profiler was not started")
+        return pstats.Stats(self._profile, stream=io.StringIO())
+
+    def dump(self, directory: Union[str, Path], name: str = "profile") -> Dict[str, Path]:
+        """Write ``<name>.pstats`` and ``<name>.collapsed`` to ``directory``."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        pstats_path = directory / f"{name}.pstats"
+        collapsed_path = directory / f"{name}.collapsed"
+        self.stats().dump_stats(str(pstats_path))
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+        return {"pstats": pstats_path, "collapsed": collapsed_path}
@@ -0,0 +1,99 @@
+"""HTTP API for ``text-agent serve``.
+
+``POST /jobs`` takes ``{"source": url}`` or ``{"text": ...}`` and answers
+``202`` with the job ID. ``GET /jobs/{id}`` polls the status and, once done,
+returns the text and metadata; ``GET /jobs/{id}/events`` streams the job's
+events (streamed LLM deltas, finished chunks, completion) as server-sent
+events. ``/healthz`` and ``/metrics`` report the service state.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+try:
+    from fastapi import FastAPI, HTTPException
+    from fastapi.responses import PlainTextResponse, StreamingResponse
+except Exception:  # pragma: no cover - optional dependency
+    FastAPI = None  # type: ignore
+    HTTPException = None  # type: ignore
+
+try:
+    import uvicorn  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    uvicorn = None  # type: ignore
+
+from pydantic import BaseModel
+
+from .config import Config
+from .metrics import REGISTRY
+from .service import Job, JobManager, QueueFullError
+
+
+class JobRequest(BaseModel):
+    source: Optional[str] = None
+    text: Optional[str] = None
+
+
+async def _events(job: Job, poll_interval: float) -> AsyncIterator[str]:
+    sent = 0
+    while True:
+        finished = job.done
+        for event in job.events_since(sent):
+            sent += 1
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
+        if finished:
+            return
+        await asyncio.sleep(poll_interval)
+
+
+def create_app(manager: JobManager, poll_interval: float = 0.05) -> "FastAPI":
+    """Return the FastAPI application serving the jobs of ``manager``."""
+    if FastAPI is None:
+        raise ImportError("fastapi is required for the HTTP service")
+    app = FastAPI(title="text-agent")
+
+    def find(job_id: str) -> Job:
+        job = manager.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+        return job
+
+    @app.post("/jobs", status_code=202)
+    async def submit(request: JobRequest) -> Dict[str, Any]:
+        try:
+            job = manager.submit(source=request.source, text=request.text)
+        except QueueFullError as exc:
+            raise HTTPException(status_code=503, detail=str(exc))
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        return {"id": job.id, "status": job.status}
+
+    @app.get("/jobs/{job_id}")
+    async def status(job_id: str) -> Dict[str, Any]:
+        return find(job_id).to_dict()
+
+    @app.get("/jobs/{job_id}/events")
+    async def events(job_id: str) -> StreamingResponse:
+        return StreamingResponse(_events(find(job_id), poll_interval), media_type="text/event-stream")
+
+    @app.get("/healthz")
+    async def healthz() -> Dict[str, Any]:
+        return {"status": "ok", "jobs": manager.stats()}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics() -> str:
+        return REGISTRY.render()
+
+    return app
+
+
+def serve(cfg: Config) -> None:
+    """Load the components once and serve them with uvicorn until stopped."""
+    if FastAPI is None or uvicorn is None:
+        raise ImportError("fastapi and uvicorn are required for the HTTP service")
+    manager = JobManager.from_config(cfg)
+    try:
+        uvicorn.run(create_app(manager), host=cfg.serve.host, port=cfg.serve.port, log_level=cfg.log_level.lower())
+    finally:
+        manager.shutdown(wait=False)
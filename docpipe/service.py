@@ -0,0 +1,418 @@
+"""Warm pipeline components and background jobs for long-running processes.
+
+:class:`Components` builds the extractors and processors once (LanguageTool,
+Whisper and the glossary are loaded at start-up) and runs a source or a text
+through the same extract → preprocess → :func:`process_text` path as
+``text-agent process``. :class:`JobManager` runs such documents on a bounded
+thread pool and keeps their progress as events for polling or streaming;
+``text-agent serve`` exposes it over HTTP (see :mod:`docpipe.server`).
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .budget import Budget
+from .config import Config
+from .document import Chunk
+from .extractors.audio import AudioExtractor
+from .extractors.ocr_image import OCRImageExtractor
+from .extractors.pdf import PDFExtractor
+from .extractors.plain import PlainTextExtractor
+from .extractors.web import WebExtractor
+from .extractors.youtube import YouTubeExtractor
+from .glossary import Glossary
+from .metrics import DOCUMENTS, QUEUE_DEPTH
+from .pipeline import process_text
+from .processors import DiffProcessor, Evaluator, Fixer, Preprocessor, Proofreader, SpellChecker, Translator
+from .streaming import streaming
+from .tracing import count, merge_summary, span, tracing
+
+logger = logging.getLogger(__name__)
+
+
+def _optional(factory: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    # Whisper など未インストールの抽出器は外して起動する
+    try:
+        return factory(*args, **kwargs)
+    except ImportError as exc:
+        logger.warning("%s disabled: %s", factory.__name__, exc)
+        return None
+
+
+class Components:
+    """Extractors and processors built once and shared by every document.
+
+    The evaluator (LanguageTool and the MeCab tagger) is not safe to share
+    between threads, so every thread that runs documents builds its own from
+    ``evaluator_factory``. The diff processor keeps state and history files
+    per document and is built for each run from ``diff_processor_factory``.
+    """
+
+    def __init__(
+        self,
+        cfg: Config,
+        extractors: List[Any],
+        preprocessor: Preprocessor,
+        translator: Translator,
+        proofreader: Proofreader,
+        evaluator_factory: Callable[[], Evaluator],
+        fixer: Fixer,
+        spellchecker: SpellChecker,
+        diff_processor_factory: Optional[Callable[..., DiffProcessor]] = None,
+    ) -> None:
+        self.cfg = cfg
+        self.extractors = extractors
+        self.preprocessor = preprocessor
+        self.translator = translator
+        self.proofreader = proofreader
+        self.evaluator_factory = evaluator_factory
+        self.fixer = fixer
+        self.spellchecker = spellchecker
+        self.diff_processor_factory = diff_processor_factory
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, cfg: Config, warm_up: bool = True) -> "Components":
+        """Build the components of ``cfg``.
+
+        With ``warm_up`` the evaluator of the calling thread is built right
+        away; pass ``False`` when documents run on other threads only.
+        """
+        glossary = None
+        if cfg.glossary.enabled and cfg.glossary.path:
+            try:
+                glossary = Glossary(
+                    str(cfg.glossary.path),
+                    artifact_path=str(cfg.glossary.artifact_path) if cfg.glossary.artifact_path else None,
+                    reload_interval=cfg.glossary.reload_interval,
+                )
+            except Exception as exc:
+                logger.warning("Failed to load glossary: %s", exc)
+        extractors = [
+            _optional(YouTubeExtractor, cfg.temp_dir),
+            _optional(
+                WebExtractor,
+                max_connections=cfg.web.max_connections,
+                per_host_limit=cfg.web.per_host_limit,
+                timeout=cfg.web.timeout,
+                cache_dir=cfg.web.cache_dir,
+                extraction_mode=cfg.web.extraction_mode,
+                parse_workers=cfg.web.parse_workers,
+            ),
+            _optional(PDFExtractor),
+            _optional(OCRImageExtractor),
+            _optional(AudioExtractor, cfg.whisper.model),
+            PlainTextExtractor(),
+        ]
+        diff_processor_factory = None
+        if cfg.diff_processor.enabled:
+            diff_processor_factory = partial(
+                DiffProcessor,
+                model=cfg.diff_processor.model,
+                max_chunk_size=cfg.diff_processor.max_chunk_size,
+                max_retries=cfg.diff_processor.max_retries,
+                output_history=cfg.diff_processor.output_history,
+                history_dir=cfg.diff_processor.history_dir,
+                improvement_focus=cfg.diff_processor.improvement_focus,
+                stream=cfg.diff_processor.stream,
+            )
+        components = cls(
+            cfg,
+            [e for e in extractors if e is not None],
+            Preprocessor(),
+            Translator(
+                cfg.translator.model,
+                cfg.translator.temperature,
+                cfg.translator.prompt,
+                glossary=glossary,
+                glossary_in_prompt=cfg.translator.glossary_in_prompt,
+                stream=cfg.translator.stream,
+            ),
+            Proofreader(
+                cfg.proofreader.model,
+                cfg.proofreader.style,
+                cfg.proofreader.temperature,
+                cfg.proofreader.prompt,
+                glossary=glossary,
+                stream=cfg.proofreader.stream,
+            ),
+            Evaluator,
+            Fixer(
+                cfg.enable_markdown_headings,
+                glossary=glossary,
+                rules_path=str(cfg.fixer.rules_path) if cfg.fixer.rules_path else None,
+            ),
+            SpellChecker(),
+            diff_processor_factory,
+        )
+        if warm_up:
+            # 起動時に読み込んでおき、依存関係の不足をここで知らせる
+            components.evaluator
+        return components
+
+    @property
+    def evaluator(self) -> Evaluator:
+        """The evaluator of the calling thread."""
+        evaluator = getattr(self._local, "evaluator", None)
+        if evaluator is None:
+            evaluator = self._local.evaluator = self.evaluator_factory()
+        return evaluator
+
+    def diff_processor(self, temp_dir: Optional[str] = None) -> Optional[DiffProcessor]:
+        """Build a diff processor for one document, or ``None`` when disabled."""
+        if self.diff_processor_factory is None:
+            return None
+        try:
+            return self.diff_processor_factory(temp_dir=temp_dir)
+        except Exception as exc:
+            logger.warning("DiffProcessor disabled: %s", exc)
+            return None
+
+    def extract(self, source: str) -> Dict[str, Any]:
+        """Return the result of the first extractor that handles ``source``."""
+        errors = []
+        for extractor in self.extractors:
+            if not extractor.can_handle(source):
+                continue
+            try:
+                with span("extract", extractor=extractor.__class__.__name__):
+                    result = extractor.extract(source)
+                    if result["metadata"].get("http_cache_hit"):
+                        count("cache_hits")
+                return result
+            except Exception as exc:
+                errors.append(f"{extractor.__class__.__name__}: {exc}")
+        detail = "; ".join(errors) or "no extractor can handle it"
+        raise ValueError(f"No extractor succeeded for {source} ({detail})")
+
+    def load(
+        self,
+        source: Optional[str] = None,
+        text: Optional[str] = None,
+        extracted: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Extract ``source`` (or take ``text``) and return the result with its preprocessed text.
+
+        ``extracted`` is used instead of extracting ``source`` again, e.g.
+        for pages that were fetched together up front.
+        """
+        if extracted is not None:
+            result = extracted
+        elif source is not None:
+            result = self.extract(source)
+        else:
+            result = {"text": text or "", "metadata": {"source_type": "text"}}
+        # 形式（Markdown・音声認識・Pythonコード）は抽出時に一度だけ判定する
+        source_chunk = Chunk(result["text"])
+        result["metadata"]["text_format"] = source_chunk.flags._asdict()
+        with span("preprocess"):
+            preprocessed = self.preprocessor.process(source_chunk)
+        return result, preprocessed
+
+    def process(
+        self,
+        result: Dict[str, Any],
+        text: str,
+        trace: Optional[Dict[str, Dict[str, float]]] = None,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        budget: Optional[Budget] = None,
+        temp_dir: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run :func:`process_text` on the preprocessed ``text`` of ``result``.
+
+        ``trace`` is the stage summary of loading the document; the
+        pipeline's stages are merged into it. ``temp_dir`` receives the diff
+        processor's history files.
+        """
+        pipeline_result = process_text(
+            text,
+            self.cfg,
+            self.translator,
+            self.proofreader,
+            self.evaluator,
+            self.fixer,
+            self.spellchecker,
+            self.diff_processor(temp_dir),
+            budget=budget,
+            on_chunk=on_chunk,
+        )
+        result["text"] = pipeline_result["text"]
+        result["metadata"].update(pipeline_result["metadata"])
+        trace = dict(trace or {})
+        merge_summary(trace, pipeline_result["metadata"].get("trace", {}))
+        result["metadata"]["trace"] = trace
+        DOCUMENTS.inc(source_type=result["metadata"].get("source_type", "unknown"))
+        return result
+
+    def run(
+        self,
+        source: Optional[str] = None,
+        text: Optional[str] = None,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        budget: Optional[Budget] = None,
+        temp_dir: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Extract ``source`` (or take ``text``), preprocess it and run :func:`process_text`."""
+        with tracing() as tracer:
+            result, preprocessed = self.load(source, text)
+        return self.process(result, preprocessed, tracer.summary(), on_chunk, budget, temp_dir)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while ``max_queued_jobs`` are waiting."""
+
+
+class Job:
+    """One submitted document and the events of its progress.
+
+    Events are ``{"event", "data"}`` records: ``delta`` (streamed LLM text
+    with its stage), ``chunk`` (a finished piece of the final text) and a
+    last ``done`` or ``failed``.
+    """
+
+    def __init__(self, source: Optional[str] = None, text: Optional[str] = None) -> None:
+        self.id = uuid.uuid4().hex
+        self.source = source
+        self.text = text
+        self.status = "queued"
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def emit(self, event: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self.events.append({"event": event, "data": data})
+
+    def events_since(self, index: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self.events[index:]
+
+    def to_dict(self) -> Dict[str, Any]:
+        info: Dict[str, Any] = {"id": self.id, "status": self.status, "source": self.source}
+        if self.result is not None:
+            info["text"] = self.result["text"]
+            info["metadata"] = self.result["metadata"]
+        if self.error is not None:
+            info["error"] = self.error
+        return info
+
+
+class JobManager:
+    """Run submitted documents on at most ``max_concurrent_jobs`` threads.
+
+    All threads are started with the manager and build their evaluator
+    then, so no job waits for LanguageTool to start. Jobs are limited by the
+    ``max_document_*`` budgets only; a service has no run for the
+    ``max_run_*`` budgets to cover.
+    """
+
+    def __init__(
+        self,
+        components: Components,
+        max_concurrent_jobs: int = 2,
+        max_queued_jobs: int = 100,
+        job_ttl: float = 3600.0,
+        allow_local_sources: bool = False,
+    ) -> None:
+        self.components = components
+        self.max_queued_jobs = max_queued_jobs
+        self.job_ttl = job_ttl
+        self.allow_local_sources = allow_local_sources
+        self.jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_jobs,
+            thread_name_prefix="docpipe-job",
+            initializer=lambda: self.components.evaluator,
+        )
+        # 全スレッドを今起動し、各スレッドの評価器（LanguageTool）を最初のジョブより先に読み込む
+        started = threading.Barrier(max_concurrent_jobs)
+        for future in [self._executor.submit(started.wait) for _ in range(max_concurrent_jobs)]:
+            future.result()
+
+    @classmethod
+    def from_config(cls, cfg: Config) -> "JobManager":
+        return cls(
+            Components.from_config(cfg, warm_up=False),
+            cfg.serve.max_concurrent_jobs,
+            cfg.serve.max_queued_jobs,
+            cfg.serve.job_ttl,
+            cfg.serve.allow_local_sources,
+        )
+
+    def _queued(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status == "queued")
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.job_ttl
+        for job_id in [i for i, job in self.jobs.items() if job.finished is not None and job.finished < cutoff]:
+            del self.jobs[job_id]
+
+    def submit(self, source: Optional[str] = None, text: Optional[str] = None) -> Job:
+        """Queue a source (URL, or path if allowed) or a text and return its job."""
+        if (source is None) == (text is None):
+            raise ValueError("Give exactly one of source or text")
+        if source is not None and not self.allow_local_sources and not source.startswith(("http://", "https://")):
+            raise ValueError("Only http(s) sources are accepted")
+        job = Job(source, text)
+        with self._lock:
+            self._purge()
+            if self._queued() >= self.max_queued_jobs:
+                raise QueueFullError(f"{self.max_queued_jobs} jobs are already waiting")
+            self.jobs[job.id] = job
+            QUEUE_DEPTH.set(self._queued(), queue="jobs")
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _run(self, job: Job) -> None:
+        with self._lock:
+            job.status = "running"
+            QUEUE_DEPTH.set(self._queued(), queue="jobs")
+
+        def on_delta(stage: str, delta: str) -> None:
+            job.emit("delta", {"stage": stage, "text": delta})
+
+        try:
+            with streaming(on_delta):
+                result = self.components.run(
+                    job.source,
+                    job.text,
+                    on_chunk=lambda piece: job.emit("chunk", {"text": piece}),
+                    temp_dir=str(Path(self.components.cfg.diff_processor.history_dir) / job.id),
+                )
+        except Exception as exc:
+            logger.exception("Job %s failed", job.id)
+            job.error = str(exc)
+            status, data = "failed", {"error": job.error}
+        else:
+            job.result = result
+            status, data = "done", {"metadata": result["metadata"]}
+        # 最後のイベントを出してから状態を変える（ストリームが取りこぼさないように）
+        job.finished = time.time()
+        job.emit(status, data)
+        job.status = status
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            statuses = [job.status for job in self.jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "done", "failed")}
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,65 @@
+"""Streamed LLM completions for live progress.
+
+With ``stream=True`` the processors request their completion with
+``stream=True`` and :func:`complete` hands every text delta to the listener
+activated with :func:`streaming`, while still returning the full content.
+Only complete texts reach the evaluator, so the quality gates behave as
+without streaming; the deltas are a preview of the stage's output.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from .tracing import record_usage
+
+# (段階名, 追加テキスト) を受け取るコールバック
+Listener = Callable[[str, str], None]
+
+_current: ContextVar[Optional[Listener]] = ContextVar("docpipe_stream_listener", default=None)
+
+
+@contextmanager
+def streaming(listener: Listener) -> Iterator[Listener]:
+    """Send the text deltas of streamed completions inside the block to ``listener``."""
+    token = _current.set(listener)
+    try:
+        yield listener
+    finally:
+        _current.reset(token)
+
+
+def iter_completion(client: Any, **kwargs: Any) -> Iterator[str]:
+    """Request a streamed chat completion and yield its text deltas.
+
+    The usage reported in the last event is recorded like that of a
+    non-streamed response.
+    """
+    events = client.chat.completions.create(
+        stream=True,
+        stream_options={"include_usage": True},
+        **kwargs,
+    )
+    for event in events:
+        if getattr(event, "usage", None) is not None:
+            record_usage(event)
+        if not event.choices:
+            continue
+        delta = event.choices[0].delta.content
+        if delta:
+            yield delta
+
+
+def complete(client: Any, stage: str, stream: bool = False, **kwargs: Any) -> str:
+    """Return the content of a chat completion, streaming it when ``stream`` is set."""
+    if not stream:
+        resp = client.chat.completions.create(**kwargs)
+        record_usage(resp)
+        return resp.choices[0].message.content
+    listener = _current.get()
+    parts = []
+    for delta in iter_completion(client, **kwargs):
+        parts.append(delta)
+        if listener is not None:
+            listener(stage, delta)
+    return "".join(parts)
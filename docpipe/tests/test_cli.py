@@ -5,6 +5,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..",
 
 from docpipe.cli import _expand_sources  # noqa: E402
 from docpipe import cli as cli_module  # noqa: E402
+from docpipe import service as service_module  # noqa: E402
 
 
 def test_expand_sources(tmp_path):
@@ -55,7 +56,7 @@ def test_cli_uses_whisper_model(monkeypatch):
         def extract(self, source):
             return {}
 
-    monkeypatch.setattr(cli_module, "AudioExtractor", DummyAE)
+    monkeypatch.setattr(service_module, "AudioExtractor", DummyAE)
     monkeypatch.setattr(cli_module, "_expand_sources", lambda s: [])
 
     class Dummy:
@@ -72,11 +73,11 @@ def test_cli_uses_whisper_model(monkeypatch):
         def evaluate(self, text, reference=None):
             return {"quality_score": 1.0}
 
-    monkeypatch.setattr(cli_module, "Preprocessor", Dummy)
-    monkeypatch.setattr(cli_module, "Translator", Dummy)
-    monkeypatch.setattr(cli_module, "Proofreader", Dummy)
-    monkeypatch.setattr(cli_module, "Fixer", Dummy)
-    monkeypatch.setattr(cli_module, "Evaluator", DummyEval)
+    monkeypatch.setattr(service_module, "Preprocessor", Dummy)
+    monkeypatch.setattr(service_module, "Translator", Dummy)
+    monkeypatch.setattr(service_module, "Proofreader", Dummy)
+    monkeypatch.setattr(service_module, "Fixer", Dummy)
+    monkeypatch.setattr(service_module, "Evaluator", DummyEval)
 
     cfg = cli_module.Config()
     cfg.whisper.model = "custom"
@@ -124,7 +125,7 @@ def test_cli_uses_progressbar(monkeypatch, tmp_path):
         "AudioExtractor",
         "PlainTextExtractor",
     ]:
-        monkeypatch.setattr(cli_module, name, DummyExtractor)
+        monkeypatch.setattr(service_module, name, DummyExtractor)
 
     class Dummy:
         def __init__(self, *a, **k):
@@ -137,13 +138,13 @@ def test_cli_uses_progressbar(monkeypatch, tmp_path):
         def evaluate(self, text, reference=None):
             return {"quality_score": 1.0}
 
-    monkeypatch.setattr(cli_module, "Preprocessor", Dummy)
-    monkeypatch.setattr(cli_module, "Translator", Dummy)
-    monkeypatch.setattr(cli_module, "Proofreader", Dummy)
-    monkeypatch.setattr(cli_module, "Fixer", Dummy)
-    monkeypatch.setattr(cli_module, "Evaluator", DummyEval)
-    monkeypatch.setattr(cli_module, "SpellChecker", Dummy)
-    monkeypatch.setattr(cli_module, "process_text", lambda *a, **k: {"text": "", "metadata": {}})
+    monkeypatch.setattr(service_module, "Preprocessor", Dummy)
+    monkeypatch.setattr(service_module, "Translator", Dummy)
+    monkeypatch.setattr(service_module, "Proofreader", Dummy)
+    monkeypatch.setattr(service_module, "Fixer", Dummy)
+    monkeypatch.setattr(service_module, "Evaluator", DummyEval)
+    monkeypatch.setattr(service_module, "SpellChecker", Dummy)
+    monkeypatch.setattr(service_module, "process_text", lambda *a, **k: {"text": "", "metadata": {}})
 
     cfg = cli_module.Config()
     cfg.output_dir = tmp_path
@@ -154,3 +155,201 @@ def test_cli_uses_progressbar(monkeypatch, tmp_path):
     assert called["called"]
     assert called["length"] == 2
     assert called["label"] == "Processing sources"
+
+
+def test_compile_glossary_command(tmp_path):
+    from click.testing import CliRunner
+
+    gfile = tmp_path / "gl.csv"
+    gfile.write_text("ja,en\n人工知能,AI\n", encoding="utf-8")
+    artifact = tmp_path / "gl.bin"
+
+    result = CliRunner().invoke(cli_module.cli, ["compile-glossary", str(gfile), str(artifact)])
+
+    assert result.exit_code == 0
+    assert artifact.exists()
+
+
+def test_compile_glossary_command_reports_unwritable_artifact(tmp_path):
+    from click.testing import CliRunner
+
+    gfile = tmp_path / "gl.csv"
+    gfile.write_text("ja,en\n人工知能,AI\n", encoding="utf-8")
+    artifact = tmp_path / "missing" / "gl.bin"
+
+    result = CliRunner().invoke(cli_module.cli, ["compile-glossary", str(gfile), str(artifact)])
+
+    assert result.exit_code != 0
+    assert "Could not write" in result.output
+    assert not artifact.exists()
+
+
+def test_preprocess_command_streams_file(tmp_path):
+    from click.testing import CliRunner
+
+    src = tmp_path / "in.txt"
+    src.write_text("one\ntwo.\n\nthree\n", encoding="utf-8")
+    out = tmp_path / "out.txt"
+
+    result = CliRunner().invoke(cli_module.cli, ["preprocess", str(src), str(out)])
+
+    assert result.exit_code == 0, result.output
+    assert out.read_text(encoding="utf-8") == "one two.\n\nthree\n"
+
+
+def test_calibrate_gate_command(tmp_path):
+    import json
+
+    from click.testing import CliRunner
+
+    case = tmp_path / "case" / "sub"
+    case.mkdir(parents=True)
+    (case / "final_metadata.json").write_text(
+        json.dumps({"chunks": [
+            {"readability_score": 0.2, "quality_score": 0.4},
+            {"readability_score": 0.6, "quality_score": 0.8},
+        ]}),
+        encoding="utf-8",
+    )
+    (tmp_path / "case" / "final_metadata.json").write_text(
+        json.dumps({"readability_score": 1.0, "quality_score": 1.2}), encoding="utf-8"
+    )
+    out = tmp_path / "gate.json"
+
+    result = CliRunner().invoke(cli_module.cli, ["calibrate-gate", str(tmp_path), "-o", str(out)])
+
+    assert result.exit_code == 0, result.output
+    gate = json.loads(out.read_text(encoding="utf-8"))
+    assert abs(gate["slope"] - 1.0) < 1e-9
+    assert abs(gate["intercept"] - 0.2) < 1e-9
+    assert gate["margin"] < 1e-9
+
+
+def test_process_stream_writes_final_chunk_by_chunk(monkeypatch, tmp_path):
+    from click.testing import CliRunner
+
+    class DummyExtractor:
+        def __init__(self, *a, **k):
+            pass
+
+        def can_handle(self, source):
+            return True
+
+        def extract(self, source):
+            return {"text": "one\n\ntwo", "metadata": {"title": "doc", "source_type": "plain"}}
+
+    for name in [
+        "YouTubeExtractor",
+        "WebExtractor",
+        "PDFExtractor",
+        "OCRImageExtractor",
+        "AudioExtractor",
+        "PlainTextExtractor",
+    ]:
+        monkeypatch.setattr(service_module, name, DummyExtractor)
+
+    created = {}
+
+    class Dummy:
+        def __init__(self, *a, **k):
+            created[type(self).__name__] = k
+
+        def process(self, text):
+            return {"text": text, "metadata": {}}
+
+    monkeypatch.setattr(service_module, "Preprocessor", Dummy)
+    monkeypatch.setattr(service_module, "Translator", type("Translator", (Dummy,), {}))
+    monkeypatch.setattr(service_module, "Proofreader", type("Proofreader", (Dummy,), {}))
+    monkeypatch.setattr(service_module, "Fixer", Dummy)
+    monkeypatch.setattr(service_module, "Evaluator", Dummy)
+    monkeypatch.setattr(service_module, "SpellChecker", Dummy)
+
+    written = []
+
+    def fake_process_text(text, cfg, *args, on_chunk=None, **kwargs):
+        final = next(tmp_path.glob("*/final.md"))
+        on_chunk("ONE")
+        written.append(final.read_text(encoding="utf-8"))
+        on_chunk("\n\nTWO")
+        return {"text": "ONE\n\nTWO", "metadata": {}}
+
+    monkeypatch.setattr(service_module, "process_text", fake_process_text)
+    cfg = cli_module.Config()
+    cfg.output_dir = tmp_path
+    cfg.diff_processor.enabled = False
+    monkeypatch.setattr(cli_module.Config, "load", classmethod(lambda cls, path=None: cfg))
+
+    result = CliRunner().invoke(cli_module.cli, ["process", "--stream", "doc.txt"])
+
+    assert result.exit_code == 0, result.output
+    assert created["Translator"]["stream"] is True
+    assert created["Proofreader"]["stream"] is True
+    assert written == ["ONE"]
+    assert next(tmp_path.glob("*/final.md")).read_text(encoding="utf-8") == "ONE\n\nTWO"
+
+
+def test_enqueue_and_queue_status(monkeypatch, tmp_path):
+    from click.testing import CliRunner
+
+    cfg = cli_module.Config()
+    cfg.queue.path = tmp_path / "jobs.sqlite3"
+    monkeypatch.setattr(cli_module.Config, "load", classmethod(lambda cls, path=None: cfg))
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.txt").write_text("a", encoding="utf-8")
+    (docs / "b.md").write_text("b", encoding="utf-8")
+
+    result = CliRunner().invoke(cli_module.cli, ["enqueue", str(docs), "https://example.com"])
+    assert result.exit_code == 0, result.output
+    assert "Queued 3 jobs" in result.output
+
+    result = CliRunner().invoke(cli_module.cli, ["queue-status"])
+    assert result.exit_code == 0, result.output
+    assert "queued: 3" in result.output
+
+
+def test_worker_applies_no_run_budget(monkeypatch, tmp_path):
+    from click.testing import CliRunner
+
+    cfg = cli_module.Config()
+    cfg.queue.path = tmp_path / "jobs.sqlite3"
+    cfg.pipeline.max_run_tokens = 10
+    monkeypatch.setattr(cli_module.Config, "load", classmethod(lambda cls, path=None: cfg))
+    monkeypatch.setattr(cli_module.Components, "from_config", classmethod(lambda cls, cfg: None))
+    called = {}
+
+    def fake_run_worker(queue, components, output_dir, worker_id, **kwargs):
+        called.update(kwargs)
+        return 0
+
+    monkeypatch.setattr(cli_module, "run_worker", fake_run_worker)
+
+    result = CliRunner().invoke(cli_module.cli, ["worker", "--exit-when-empty"])
+
+    assert result.exit_code == 0, result.output
+    assert called["exit_when_empty"] is True
+    assert called.get("budget") is None
+
+
+def test_process_continues_when_metrics_port_is_taken(monkeypatch):
+    from click.testing import CliRunner
+
+    cfg = cli_module.Config()
+    cfg.metrics.enabled = True
+    monkeypatch.setattr(cli_module.Config, "load", classmethod(lambda cls, path=None: cfg))
+    monkeypatch.setattr(cli_module, "_expand_sources", lambda s: [])
+
+    class NoComponents:
+        extractors = []
+
+    monkeypatch.setattr(cli_module.Components, "from_config", classmethod(lambda cls, cfg: NoComponents()))
+
+    def taken(port, host):
+        raise OSError("Address already in use")
+
+    monkeypatch.setattr(cli_module, "start_http_server", taken)
+
+    result = CliRunner().invoke(cli_module.cli, ["process", "doc.txt"])
+
+    assert result.exit_code == 0, result.output
+    assert "Metrics disabled: Address already in use" in result.output
@@ -195,4 +195,26 @@ print("コードブロック")
         assert "# タイトル" in result["text"]
         assert "**太字**" in result["text"]
         assert "- リスト項目" in result["text"]
-        assert "```python" in result["text"] 
\ No newline at end of file
+        assert "```python" in result["text"] 
+
+    def test_process_chunk_uses_cached_blocks_without_resplitting(self, monkeypatch):
+        """A pipeline chunk is improved as one unit with its protected blocks."""
+        from docpipe.document import Chunk
+
+        processor = DiffProcessor(max_chunk_size=10, output_history=False)
+        chunk = Chunk("# 見出し\n\n本文です。\n\n次の段落です。", "c0001")
+        seen = []
+
+        def fake_process_chunk(text, chunk_num):
+            seen.append(text)
+            return text.replace("本文", "改善した本文")
+
+        monkeypatch.setattr(processor, "_process_chunk", fake_process_chunk)
+        monkeypatch.setattr(
+            processor, "split_text_into_chunks", lambda text: pytest.fail("re-split")
+        )
+        result = processor.process(chunk)
+
+        assert seen == [chunk.protected[0]]
+        assert result["text"] == "# 見出し\n\n改善した本文です。\n\n次の段落です。"
+        assert result["metadata"]["changed"] is True
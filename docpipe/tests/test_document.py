@@ -0,0 +1,88 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from docpipe.document import Chunk, Document, TextFormat  # noqa: E402
+
+
+def test_document_chunks_have_stable_ids_and_offsets(monkeypatch):
+    monkeypatch.setattr("docpipe.utils.tokenizer.tiktoken", None)
+    text = "第一段落です。\n\n第二段落です。\n\n第三段落です。"
+    doc = Document.from_text(text, max_tokens=8)
+
+    assert [c.chunk_id for c in doc] == ["c0000", "c0001", "c0002"]
+    for chunk in doc:
+        assert text[chunk.start:chunk.end] == chunk.text
+    assert doc.join(["A", "B", "C"]) == "A\n\nB\n\nC"
+    assert "".join(doc.piece(i, out) for i, out in enumerate("ABC")) == doc.join(["A", "B", "C"])
+
+
+def test_single_chunk_keeps_whole_text():
+    doc = Document.from_text("  short text\n", max_tokens=100)
+
+    assert len(doc) == 1
+    assert doc.chunks[0].text == "  short text\n"
+    assert doc.join(["done"]) == "done"
+
+
+def test_chunk_protects_blocks_once(monkeypatch):
+    calls = []
+    import docpipe.document as document
+
+    original = document.extract_critical_markdown_blocks
+
+    def counting(text):
+        calls.append(text)
+        return original(text)
+
+    monkeypatch.setattr(document, "extract_critical_markdown_blocks", counting)
+    chunk = Chunk("# 見出し\n\n本文です。")
+
+    protected, blocks = chunk.protected
+    assert "# 見出し" not in protected
+    assert chunk.protected is chunk.protected
+    assert chunk.restore(protected) == chunk.text
+    assert chunk.with_text(chunk.text) is chunk
+    assert len(calls) == 1
+
+    edited = chunk.with_text("# 見出し\n\n本文を直しました。")
+    assert edited.chunk_id == "c0000"
+    edited.protected
+    assert len(calls) == 2
+
+
+def test_chunk_flags_survive_stage_edits(monkeypatch):
+    import docpipe.document as document
+
+    calls = []
+    monkeypatch.setattr(document, "detect_format", lambda text: calls.append(text) or TextFormat(True, False, False))
+    source = Chunk("[0.0-1.5] speaker_1: こんにちは")
+
+    assert source.flags == TextFormat(True, False, False)
+    edited = source.with_text("[0.0-1.5] speaker_1: こんにちは。")
+    assert isinstance(edited, str) and edited.markdown
+    assert len(calls) == 1
+
+
+def test_chunks_detect_code_and_speech_per_chunk(monkeypatch):
+    monkeypatch.setattr("docpipe.utils.tokenizer.tiktoken", None)
+    text = "# 見出し\n\n本文の段落です。\n\nclass Foo が出てくる段落。\n\n最後の段落です。"
+    source = Chunk(text)
+    assert source.flags == TextFormat(True, False, True)
+
+    doc = Document.from_text(source, max_tokens=8)
+
+    assert len(doc) > 2
+    assert [c.python for c in doc] == ["class Foo" in c.text for c in doc]
+    assert sum(c.python for c in doc) == 1
+    # Markdown の文書ではすべてのチャンクを Markdown として扱う
+    assert all(c.markdown for c in doc)
+
+
+def test_detect_format():
+    from docpipe.document import detect_format
+
+    assert detect_format("# Title\n\ntext") == TextFormat(True, False, False)
+    assert detect_format("[0.0-1.5] speaker_1: はい") == TextFormat(False, True, False)
+    assert detect_format("import os\nprint(os.name)") == TextFormat(False, False, True)
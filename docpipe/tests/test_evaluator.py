@@ -178,3 +178,17 @@ def test_bleu_score_english_default(monkeypatch):
     assert store["tokenize"] is None
 
 
+
+
+def test_readability_scores_matches_single(monkeypatch):
+    monkeypatch.setattr(
+        "docpipe.processors.evaluator.lt", _dummy_language_tool_module()
+    )
+    monkeypatch.setattr(
+        "docpipe.processors.evaluator.lang_detect",
+        _dummy_langdetect("ja"),
+    )
+    monkeypatch.setattr("docpipe.processors.evaluator.Tagger", None)
+    ev = Evaluator()
+    texts = ["今日は晴れ。散歩、します！", "", "これは テスト です。\n\n次の文。"]
+    assert ev.readability_scores(texts) == [ev.readability_score(t) for t in texts]
@@ -0,0 +1,217 @@
+import asyncio
+import gzip
+import os
+import sys
+import threading
+import time
+import types
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from docpipe.extractors.fetcher import WebFetcher  # noqa: E402
+from docpipe.extractors.web import WebExtractor  # noqa: E402
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        state = self.server.state
+        with state["lock"]:
+            state["requests"].append((self.path, self.headers.get("If-None-Match")))
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        try:
+            time.sleep(state["delay"])
+            if self.path == "/redirect":
+                self.send_response(302)
+                self.send_header("Location", "/page/1")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if self.path.startswith("/encoded/"):
+                self._send_encoded(self.path.rsplit("/", 1)[1])
+                return
+            if self.path == "/missing":
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            etag = '"v1"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if self.path.startswith("/article"):
+                paragraph = "This article paragraph is long enough to be kept as main content. " * 5
+                body = (
+                    f"<html><head><title>Article {self.path}</title></head><body><article>"
+                    f"<p>{paragraph}</p><p>{paragraph}</p></article></body></html>"
+                ).encode("utf-8")
+            else:
+                body = f"<html><body>{self.path}</body></html>".encode("utf-8")
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with state["lock"]:
+                state["active"] -= 1
+
+    def _send_encoded(self, kind):
+        plain = b"<html><body>compressed page</body></html>"
+        raw = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        bodies = {
+            "gzip": ("gzip", gzip.compress(plain)),
+            "deflate": ("deflate", zlib.compress(plain)),
+            "raw-deflate": ("deflate", raw.compress(plain) + raw.flush()),
+            "empty": ("deflate", b""),
+        }
+        encoding, body = bodies[kind]
+        self.send_response(204 if kind == "empty" else 200)
+        self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.daemon_threads = True
+    srv.state = {"lock": threading.Lock(), "requests": [], "active": 0, "peak": 0, "delay": 0.0}
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _base(srv) -> str:
+    host, port = srv.server_address
+    return f"http://{host}:{port}"
+
+
+def test_fetch_and_revalidate_from_cache(server, tmp_path):
+    fetcher = WebFetcher(cache_dir=tmp_path)
+    url = _base(server) + "/page/1"
+
+    first = fetcher.fetch_sync(url)
+    assert first["status"] == 200
+    assert not first["from_cache"]
+    assert b"/page/1" in first["content"]
+
+    second = fetcher.fetch_sync(url)
+    assert second["from_cache"]
+    assert second["content"] == first["content"]
+    assert server.state["requests"][-1] == ("/page/1", '"v1"')
+    fetcher.close()
+
+
+def test_fetch_follows_redirect_and_reports_errors(server):
+    fetcher = WebFetcher()
+    redirected = fetcher.fetch_sync(_base(server) + "/redirect")
+    assert b"/page/1" in redirected["content"]
+
+    missing = fetcher.fetch_sync(_base(server) + "/missing")
+    assert missing["content"] is None
+    assert missing["error"] == "HTTP 404"
+    fetcher.close()
+
+
+def test_refetch_after_vanished_cache_body_reports_errors(server, monkeypatch, tmp_path):
+    fetcher = WebFetcher(cache_dir=tmp_path)
+    url = _base(server) + "/page/1"
+    assert fetcher.fetch_sync(url)["status"] == 200
+
+    # 304 の後にキャッシュ本体が消え、再取得も失敗する
+    monkeypatch.setattr(fetcher.cache, "read_body", lambda url: None)
+    request = fetcher._request
+    calls = []
+
+    def flaky_request(url, headers):
+        calls.append(headers)
+        if len(calls) > 1:
+            raise ConnectionResetError("connection reset")
+        return request(url, headers)
+
+    monkeypatch.setattr(fetcher, "_request", flaky_request)
+    result = fetcher.fetch_sync(url)
+
+    assert calls[1] == {}
+    assert result["status"] == 0
+    assert result["content"] is None
+    assert result["error"] == "connection reset"
+    fetcher.close()
+
+
+def test_fetch_decodes_compressed_bodies(server):
+    fetcher = WebFetcher()
+    for kind in ("gzip", "deflate", "raw-deflate"):
+        result = fetcher.fetch_sync(_base(server) + f"/encoded/{kind}")
+        assert result["error"] is None, kind
+        assert result["content"] == b"<html><body>compressed page</body></html>"
+
+    # 本文のない応答は復号せずにステータスをそのまま返す
+    empty = fetcher.fetch_sync(_base(server) + "/encoded/empty")
+    assert empty["error"] == "HTTP 204"
+    fetcher.close()
+
+
+def test_per_host_limit(server):
+    server.state["delay"] = 0.05
+    fetcher = WebFetcher(max_connections=8, per_host_limit=2)
+    urls = [_base(server) + f"/page/{i}" for i in range(8)]
+
+    results = asyncio.run(fetcher.fetch_all(urls))
+
+    assert all(r["status"] == 200 for r in results)
+    assert server.state["peak"] <= 2
+    fetcher.close()
+
+
+def test_extract_many_against_local_server(server, monkeypatch, tmp_path):
+    dummy = types.SimpleNamespace(
+        extract=lambda html, include_comments=False, include_tables=False: html.decode("utf-8"),
+    )
+    monkeypatch.setattr("docpipe.extractors.web.trafilatura", dummy)
+    monkeypatch.setattr("docpipe.extractors.web.extract_metadata", lambda html: {"title": "T"})
+
+    extractor = WebExtractor(per_host_limit=3, cache_dir=tmp_path)
+    urls = [_base(server) + f"/page/{i}" for i in range(5)] + [_base(server) + "/missing"]
+    results = extractor.extract_many(urls)
+
+    assert "/page/3" in results[urls[3]]["text"]
+    assert results[urls[0]]["metadata"]["title"] == "T"
+    assert results[urls[0]]["metadata"]["http_cache_hit"] is False
+    assert isinstance(results[urls[-1]], RuntimeError)
+
+    again = extractor.extract_many(urls[:1])
+    assert again[urls[0]]["metadata"]["http_cache_hit"] is True
+    extractor.close()
+
+
+def test_extract_many_single_pass_process_pool(server):
+    pytest.importorskip("trafilatura")
+
+    extractor = WebExtractor(extraction_mode="single_pass", parse_workers=2)
+    urls = [_base(server) + f"/article/{i}" for i in range(3)]
+    results = extractor.extract_many(urls)
+
+    for url in urls:
+        result = results[url]
+        assert "main content" in result["text"]
+        assert result["metadata"]["url"] == url
+        assert result["metadata"]["title"].startswith("Article /article/")
+    extractor.close()
@@ -63,3 +63,85 @@ def test_apply_glossary(tmp_path):
     fixer = Fixer(glossary=glossary)
     result = fixer.process("AIを使う")
     assert "人工知能" in result["text"]
+
+
+def test_speech_corrections_single_pass():
+    fixer = Fixer()
+    text = "アイロンとココパイロットとコパイロット、パイロットプラス"
+    result = fixer.fix_speech_recognition_errors(text)
+    assert result == "アライアンスとコパイロットとコパイロット、コパイロットプラス"
+
+
+def test_normalize_punctuation_keeps_lines():
+    fixer = Fixer()
+    text = "a 　、 b\n  \nx(  y )\r\nend\n"
+    assert fixer.normalize_punctuation(text) == "a, b\n\nx (y) \nend"
+
+
+def test_rules_from_yaml(tmp_path):
+    rules = tmp_path / "rules.yaml"
+    rules.write_text(
+        "speech:\n"
+        "  ジェミナイ: Gemini\n"
+        "typos:\n"
+        "  - pattern: '\\bwierd\\b'\n"
+        "    replace: weird\n"
+        "    ignore_case: true\n",
+        encoding="utf-8",
+    )
+    fixer = Fixer(rules_path=str(rules))
+    assert fixer.fix_speech_recognition_errors("ジェミナイとアイロン") == "Geminiとアライアンス"
+    assert fixer.fix_common_typos("Wierd  teh") == "weird the"
+
+
+def test_large_literal_dictionary_matches_regex_pass(monkeypatch):
+    from docpipe.processors import fixer_rules
+    from docpipe.processors.fixer_rules import RuleSet, literal
+
+    rules = [literal(f"語{i:03d}", f"W{i}") for i in range(300)] + [literal("語00", "X")]
+    text = "前語001語299語00語9後"
+    big = RuleSet(rules)
+    assert big._steps[0]._matcher is not None
+    monkeypatch.setattr(fixer_rules, "_REGEX_LITERAL_LIMIT", 10_000)
+    small = RuleSet(rules)
+    assert small._steps[0]._regex is not None
+    assert big.apply(text) == small.apply(text) == "前W1W299X語9後"
+
+
+def _stepwise(fixer, text, speech=False):
+    # the step-by-step pipeline that the fused pass replaces
+    if speech:
+        text = fixer.fix_speech_recognition_errors(text)
+        text = fixer.remove_speech_artifacts(text)
+        text = fixer.normalize_speech_text(text)
+    text = fixer.remove_duplicate_lines(text)
+    text = fixer.balance_parentheses(text)
+    text = fixer.fix_common_typos(text)
+    text = fixer.normalize_punctuation(text)
+    text = fixer.normalize_line_breaks(text)
+    text = fixer.adjust_spacing(text)
+    text = fixer.improve_structure(text)
+    if not speech:
+        text = fixer.remove_llm_disclaimers(text)
+    return text
+
+
+def test_fused_pass_matches_stepwise():
+    fixer = Fixer()
+    texts = [
+        "\n\n  Introduction  \nBody text,,  here (note\n\n\n\nBody text\nBody text\n  \n",
+        "ここでは文章を修正しました\r\nOVERVIEW\r\n第一章 はじめに\r\n本文です 。 次(です\n\n",
+        "a\x0cb c  d！！ e\n\n",
+        "",
+    ]
+    for text in texts:
+        assert fixer.process(text)["text"] == _stepwise(fixer, text)
+
+    speech = (
+        "[0.0-1.0] speaker_1: アイロンの話です。。\n"
+        "[1.0-2.0] speaker_2:\n\n\n"
+        "[2.0-3.0] speaker_1: Win10 で  teh 確認 (削除)\n"
+        "[2.0-3.0] speaker_1: Win10 で  teh 確認 (削除)\n"
+        "3.0-4.0\n\n"
+    )
+    assert fixer.process(speech)["text"] == _stepwise(fixer, speech, speech=True)
@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 import pytest
@@ -24,3 +25,108 @@ def test_load_yaml(tmp_path):
     gl = Glossary(str(gfile))
     assert gl.replace("computerを使う") == "パソコンを使う"
 
+
+
+def test_longest_term_wins(tmp_path):
+    gfile = tmp_path / "gl.csv"
+    gfile.write_text("ja,en\n機械,machine\n機械学習,machine learning\n", encoding="utf-8")
+    gl = Glossary(str(gfile))
+    assert gl.replace("machine learning and machine") == "機械学習 and 機械"
+
+
+def test_ascii_terms_match_whole_words_only(tmp_path):
+    gfile = tmp_path / "gl.csv"
+    gfile.write_text("ja,en\n人工知能,AI\n", encoding="utf-8")
+    gl = Glossary(str(gfile))
+    assert gl.replace("AI, MAIL and AI_X") == "人工知能, MAIL and AI_X"
+    assert gl.replace("AI技術") == "人工知能技術"
+
+
+def test_find_reports_positions(tmp_path):
+    gfile = tmp_path / "gl.csv"
+    gfile.write_text("ja,en\nパソコン,computer\n", encoding="utf-8")
+    gl = Glossary(str(gfile))
+    assert gl.find("a computer or パソコン") == [(2, 10, "computer"), (14, 18, "パソコン")]
+
+
+def test_artifact_is_reused_without_parsing(tmp_path, monkeypatch):
+    gfile = tmp_path / "gl.csv"
+    gfile.write_text("ja,en\n人工知能,AI\n機械学習,machine learning\n", encoding="utf-8")
+    artifact = tmp_path / "gl.bin"
+    Glossary(str(gfile), artifact_path=str(artifact))
+    assert artifact.exists()
+
+    def fail(self):
+        raise AssertionError("source should not be parsed")
+
+    monkeypatch.setattr(Glossary, "_load_csv", fail)
+    gl = Glossary(str(gfile), artifact_path=str(artifact))
+    assert gl.replace("AI and machine learning") == "人工知能 and 機械学習"
+    assert gl.mapping["AI"] == "人工知能"
+
+
+def test_stale_artifact_is_rebuilt(tmp_path):
+    gfile = tmp_path / "gl.csv"
+    gfile.write_text("ja,en\n人工知能,AI\n", encoding="utf-8")
+    artifact = tmp_path / "gl.bin"
+    Glossary(str(gfile), artifact_path=str(artifact))
+
+    gfile.write_text("ja,en\nパソコン,computer\n", encoding="utf-8")
+    os.utime(gfile, ns=(1, 1))
+    gl = Glossary(str(gfile), artifact_path=str(artifact))
+    assert gl.replace("computer AI") == "パソコン AI"
+
+
+def test_hot_reload_on_mtime_change(tmp_path):
+    gfile = tmp_path / "gl.csv"
+    gfile.write_text("ja,en\n人工知能,AI\n", encoding="utf-8")
+    gl = Glossary(str(gfile), reload_interval=0.001)
+    assert gl.replace("AI") == "人工知能"
+
+    gfile.write_text("ja,en\nエーアイ,AI\n", encoding="utf-8")
+    os.utime(gfile, ns=(10**18, 10**18))
+    time.sleep(0.01)
+    assert gl.replace("AI") == "エーアイ"
+
+
+def test_failed_reload_keeps_previous_terms(tmp_path):
+    gfile = tmp_path / "gl.yaml"
+    gfile.write_text("- ja: 人工知能\n  en: AI\n", encoding="utf-8")
+    gl = Glossary(str(gfile), reload_interval=0.001)
+    assert gl.replace("AI") == "人工知能"
+
+    # 保存途中の壊れたファイル
+    gfile.write_text("- ja: [エーアイ\n  en: AI\n", encoding="utf-8")
+    os.utime(gfile, ns=(10**18, 10**18))
+    time.sleep(0.01)
+    assert gl.maybe_reload() is False
+    assert gl.replace("AI") == "人工知能"
+    assert gl.mapping == {"人工知能": "人工知能", "AI": "人工知能"}
+
+    gfile.write_text("- ja: エーアイ\n  en: AI\n", encoding="utf-8")
+    os.utime(gfile, ns=(2 * 10**18, 2 * 10**18))
+    time.sleep(0.01)
+    assert gl.maybe_reload() is True
+    assert gl.replace("AI") == "エーアイ"
+    assert gl.mapping["AI"] == "エーアイ"
+
+
+def test_unwritable_artifact_keeps_parsed_glossary(tmp_path):
+    gfile = tmp_path / "gl.csv"
+    gfile.write_text("ja,en\n人工知能,AI\n", encoding="utf-8")
+    artifact = tmp_path / "missing" / "gl.bin"
+
+    gl = Glossary(str(gfile), artifact_path=str(artifact))
+
+    assert not artifact.exists()
+    assert gl.replace("AI") == "人工知能"
+
+
+def test_entries_in_lists_only_present_terms(tmp_path):
+    gfile = tmp_path / "gl.csv"
+    gfile.write_text("ja,en\n人工知能,AI\nパソコン,computer\n", encoding="utf-8")
+    gl = Glossary(str(gfile))
+    assert gl.entries_in("AI on a computer, AI again, パソコン") == [
+        ("AI", "人工知能"),
+        ("computer", "パソコン"),
+    ]
@@ -0,0 +1,114 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from docpipe.config import QueueConfig  # noqa: E402
+from docpipe.jobqueue import SQLiteJobQueue, open_queue  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _queue(tmp_path, clock=None, **kwargs):
+    return SQLiteJobQueue(tmp_path / "q" / "jobs.sqlite3", clock=clock or Clock(), **kwargs)
+
+
+def test_claim_complete_in_order(tmp_path):
+    queue = _queue(tmp_path)
+    ids = queue.enqueue(["a.txt", "b.txt"])
+
+    job = queue.claim("w1")
+    assert (job.id, job.source, job.attempts) == (ids[0], "a.txt", 1)
+    assert queue.claim("w2").source == "b.txt"
+    assert queue.claim("w3") is None
+
+    assert not queue.complete(job.id, "w2", "out")  # 他のワーカーのリース
+    assert queue.complete(job.id, "w1", "out/a")
+    assert queue.counts() == {"queued": 0, "running": 1, "done": 1, "failed": 0}
+    assert queue.jobs("done")[0]["output"] == "out/a"
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    clock = Clock()
+    queue = _queue(tmp_path, clock, lease_seconds=10)
+    queue.enqueue(["a.txt"])
+    job = queue.claim("crashed")
+
+    clock.now += 5
+    assert queue.heartbeat(job.id, "crashed")
+    clock.now += 8
+    assert queue.claim("w2") is None  # heartbeat で延長済み
+
+    clock.now += 3
+    again = queue.claim("w2")
+    assert again.id == job.id
+    assert again.attempts == 2
+    assert not queue.heartbeat(job.id, "crashed")
+    assert not queue.complete(job.id, "crashed", "late")
+    assert queue.complete(job.id, "w2", "out")
+
+
+def test_failures_retry_until_max_attempts(tmp_path):
+    clock = Clock()
+    queue = _queue(tmp_path, clock, lease_seconds=10, max_attempts=2)
+    queue.enqueue(["bad.txt", "crash.txt"])
+
+    job = queue.claim("w")
+    assert queue.fail(job.id, "w", "boom")
+    assert queue.claim("w").id == job.id  # 再投入されたジョブは元の順番のまま
+    assert queue.fail(job.id, "w", "boom again")
+    assert queue.claim("w").source == "crash.txt"
+    assert queue.counts()["failed"] == 1
+    assert queue.jobs("failed")[0]["error"] == "boom again"
+
+    # crash.txt のリースが二度切れたら諦める
+    clock.now += 11
+    assert queue.claim("w").source == "crash.txt"
+    clock.now += 11
+    assert queue.claim("w") is None
+    failed = queue.jobs("failed")
+    assert [j["source"] for j in failed] == ["bad.txt", "crash.txt"]
+    assert failed[1]["error"] == "lease expired 2 times"
+
+
+def test_concurrent_claims_are_exclusive(tmp_path):
+    queue = _queue(tmp_path)
+    ids = queue.enqueue([f"{i}.txt" for i in range(40)])
+    claimed = []
+    lock = threading.Lock()
+
+    def work(name):
+        worker_queue = SQLiteJobQueue(queue.path, clock=queue.clock)
+        while True:
+            job = worker_queue.claim(name)
+            if job is None:
+                return
+            with lock:
+                claimed.append(job.id)
+            worker_queue.complete(job.id, name, "out")
+
+    threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(claimed) == sorted(ids)
+    assert queue.counts()["done"] == 40
+
+
+def test_open_queue_by_backend(tmp_path):
+    queue = open_queue(QueueConfig(path=tmp_path / "jobs.sqlite3", lease_seconds=5))
+    assert isinstance(queue, SQLiteJobQueue)
+    assert queue.lease_seconds == 5
+    with pytest.raises(ValueError):
+        open_queue(QueueConfig(backend="redis"))
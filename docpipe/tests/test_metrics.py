@@ -0,0 +1,55 @@
+import os
+import sys
+import urllib.request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from docpipe.metrics import Registry, start_http_server  # noqa: E402
+from docpipe import metrics  # noqa: E402
+from docpipe.tracing import span, tracing  # noqa: E402
+
+
+def test_render_prometheus_text():
+    registry = Registry()
+    docs = registry.counter("test_documents_total", "Documents", ["source_type"])
+    depth = registry.gauge("test_queue_depth", "Queue depth")
+    latency = registry.histogram("test_seconds", "Latency", ["stage"], buckets=(0.1, 1.0))
+    docs.inc(source_type="pdf")
+    docs.inc(2, source_type="web")
+    depth.set(3)
+    latency.observe(0.5, stage="fix")
+    latency.observe(2.0, stage="fix")
+
+    text = registry.render()
+
+    assert "# TYPE test_documents_total counter" in text
+    assert 'test_documents_total{source_type="web"} 2' in text
+    assert "test_queue_depth 3" in text
+    assert 'test_seconds_bucket{stage="fix",le="0.1"} 0' in text
+    assert 'test_seconds_bucket{stage="fix",le="1"} 1' in text
+    assert 'test_seconds_bucket{stage="fix",le="+Inf"} 2' in text
+    assert 'test_seconds_sum{stage="fix"} 2.5' in text
+    assert 'test_seconds_count{stage="fix"} 2' in text
+
+
+def test_spans_feed_stage_metrics():
+    before = metrics.STAGE_SECONDS.count(stage="test_stage")
+    with tracing():
+        with span("test_stage"):
+            pass
+    assert metrics.STAGE_SECONDS.count(stage="test_stage") == before + 1
+
+
+def test_scrape_endpoint():
+    registry = Registry()
+    registry.counter("test_scrapes_total", "Scrapes").inc()
+    server = start_http_server(0, registry=registry)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            body = resp.read().decode("utf-8")
+            assert resp.headers["Content-Type"].startswith("text/plain")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert "test_scrapes_total 1" in body
@@ -1,5 +1,6 @@
 import os
 import sys
+import types
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
@@ -138,6 +139,67 @@ def test_long_text_chunking():
     assert len(result["metadata"]["chunks"]) == 5
 
 
+def test_chunked_text_keeps_paragraph_breaks(monkeypatch):
+    monkeypatch.setattr("docpipe.utils.tokenizer.tiktoken", None)
+    cfg = Config()
+    cfg.pipeline = PipelineConfig(max_retries=0, quality_threshold=0.0)
+
+    class UpperTranslator:
+        def process(self, text):
+            return {"text": text.upper() + "\n", "metadata": {}}
+
+    class Eval:
+        def evaluate(self, text, reference=None):
+            return {"quality_score": 1.0}
+
+    text = "第一段落です。\n\nsecond paragraph here.\n\n第三段落です。"
+    result = process_text(
+        text,
+        cfg,
+        UpperTranslator(),
+        DummyProofreader([1.0] * 3),
+        Eval(),
+        DummyFixer(),
+        SpellChecker(quality_threshold=0.0),
+        max_tokens=8,
+    )
+
+    assert result["text"] == "第一段落です。\n\nSECOND PARAGRAPH HERE.\n\n第三段落です。"
+    assert len(result["metadata"]["chunks"]) == 3
+
+
+def test_on_chunk_receives_pieces_in_order(monkeypatch):
+    monkeypatch.setattr("docpipe.utils.tokenizer.tiktoken", None)
+    cfg = Config()
+    cfg.pipeline = PipelineConfig(max_retries=0, quality_threshold=0.0)
+
+    class UpperTranslator:
+        def process(self, text):
+            return {"text": text.upper(), "metadata": {}}
+
+    class Eval:
+        def evaluate(self, text, reference=None):
+            return {"quality_score": 1.0}
+
+    pieces = []
+    text = "first paragraph.\n\nsecond paragraph here.\n\nthird one.\n"
+    result = process_text(
+        text,
+        cfg,
+        UpperTranslator(),
+        DummyProofreader([1.0] * 3),
+        Eval(),
+        DummyFixer(),
+        SpellChecker(quality_threshold=0.0),
+        max_tokens=8,
+        on_chunk=pieces.append,
+    )
+
+    assert len(pieces) == len(result["metadata"]["chunks"]) > 1
+    assert pieces[0] == "FIRST PARAGRAPH."
+    assert "".join(pieces) == result["text"]
+
+
 def test_skip_proofreader_when_disabled():
     cfg = Config()
     cfg.pipeline = PipelineConfig()
@@ -219,3 +281,193 @@ def test_proofreader_receives_metrics():
     assert result["metadata"]["retries"] == 1
     assert proofreader.received[0] == (None, None)
     assert proofreader.received[1] == (0.3, 0.5)
+
+
+def test_format_detected_once_per_chunk(monkeypatch):
+    import docpipe.document as document
+    from docpipe.processors.fixer import Fixer
+
+    calls = []
+    original = document.is_markdown_file
+    monkeypatch.setattr(document, "is_markdown_file", lambda text: calls.append(text) or original(text))
+    cfg = Config()
+    cfg.pipeline = PipelineConfig(quality_threshold=0.9, max_retries=2, min_improvement=-1.0)
+
+    result = process_text(
+        "# 見出し\n\n本文です。",
+        cfg,
+        DummyTranslator(),
+        DummyProofreader([0.5] * 3),
+        DummyEvaluator([0.5] * 3),
+        Fixer(),
+        SpellChecker(quality_threshold=0.0),
+    )
+
+    assert result["metadata"]["retries"] == 2
+    assert result["text"].startswith("# 見出し")
+    assert len(calls) == 1
+
+
+class GateEvaluator(DummyEvaluator):
+    """Evaluator whose cheap readability is fixed per call."""
+
+    def __init__(self, scores, readability, errs=None):
+        super().__init__(scores, errs)
+        self.readability = readability
+
+    def detect_language(self, text):
+        return "en"
+
+    def readability_score_english(self, text):
+        return self.readability.pop(0)
+
+
+def test_quality_gate_skips_full_evaluation_far_from_threshold():
+    cfg = Config()
+    cfg.pipeline = PipelineConfig(
+        quality_threshold=0.8, max_retries=3, min_improvement=0.0, quality_gate=True, quality_gate_margin=0.05
+    )
+    proofreader = DummyProofreader([0.5, 0.5, 0.5])
+    # 推定値: 0.3 -> 0.65（明らかに不合格）, 0.56 -> 0.78（閾値付近）, 1.0 -> 1.0（合格し得る）
+    evaluator = GateEvaluator([0.7, 0.9], readability=[0.3, 0.56, 1.0])
+    fixer = DummyFixer()
+    spellchecker = SpellChecker(quality_threshold=0.0)
+
+    result = process_text("bad", cfg, DummyTranslator(), proofreader, evaluator, fixer, spellchecker)
+
+    assert evaluator.idx == 2  # 明らかな不合格の一回だけ LanguageTool を省く
+    assert result["metadata"]["quality_estimated"] is False
+    assert result["metadata"]["quality_score"] == 0.9
+    assert proofreader.received[1] == (None, 0.3)
+    assert fixer.calls == 2
+
+
+def test_quality_gate_never_passes_on_the_estimate():
+    cfg = Config()
+    cfg.pipeline = PipelineConfig(
+        quality_threshold=0.8, max_retries=0, quality_gate=True, quality_gate_margin=0.05, language_tool_threshold=0.02
+    )
+    # 読みやすさは満点だが文法誤りが多い
+    evaluator = GateEvaluator([0.95], readability=[1.0], errs=[0.2])
+
+    result = process_text(
+        "bad", cfg, DummyTranslator(), DummyProofreader([0.5]), evaluator, DummyFixer(), SpellChecker(quality_threshold=0.0)
+    )
+
+    assert evaluator.idx == 1
+    assert result["metadata"]["quality_estimated"] is False
+    assert result["metadata"]["grammar_error_rate"] == 0.2
+    assert result["metadata"]["quality_score"] == 0.0
+
+
+def test_stage_trace_in_metadata():
+    cfg = Config()
+    cfg.pipeline = PipelineConfig(quality_threshold=0.8, max_retries=3, min_improvement=0.05)
+    proofreader = DummyProofreader([0.4, 0.6, 0.9])
+    evaluator = DummyEvaluator([0.4, 0.65, 0.85])
+    fixer = DummyFixer()
+    spellchecker = SpellChecker(quality_threshold=0.3)
+
+    result = process_text("bad", cfg, DummyTranslator(), proofreader, evaluator, fixer, spellchecker)
+
+    trace = result["metadata"]["trace"]
+    assert trace["translate"]["calls"] == 1  # 翻訳はリトライしない
+    assert trace["proofread"]["calls"] == 3
+    assert trace["evaluate"]["calls"] == 3
+    assert trace["fix"]["calls"] == 2
+    assert "spellcheck" not in trace
+
+
+class UsageProofreader(DummyProofreader):
+    """Proofreader whose every call reports ``tokens`` of LLM usage."""
+
+    def __init__(self, scores, tokens):
+        super().__init__(scores)
+        self.tokens = tokens
+
+    def process(self, text, error_rate=None, readability=None):
+        from docpipe.tracing import record_usage
+
+        usage = types.SimpleNamespace(prompt_tokens=self.tokens, completion_tokens=0)
+        record_usage(types.SimpleNamespace(usage=usage, model="gpt-4o-2024-08-06"))
+        return super().process(text, error_rate, readability)
+
+
+def test_document_token_budget_stops_retries():
+    cfg = Config()
+    cfg.pipeline = PipelineConfig(
+        quality_threshold=0.9, max_retries=5, min_improvement=0.0, max_document_tokens=1000
+    )
+    proofreader = UsageProofreader([0.5] * 6, tokens=600)
+    evaluator = DummyEvaluator([0.4, 0.5, 0.6, 0.7, 0.8, 0.85])
+    fixer = DummyFixer()
+    spellchecker = SpellChecker(quality_threshold=0.0)
+
+    result = process_text("bad", cfg, DummyTranslator(), proofreader, evaluator, fixer, spellchecker)
+
+    meta = result["metadata"]
+    assert meta["budget_exhausted"] == "document tokens"
+    assert meta["retries"] == 1
+    assert fixer.calls == 1
+    assert meta["budget"]["tokens"] == 1200
+
+
+def test_run_cost_budget_skips_diff_stage():
+    from docpipe.budget import Budget
+
+    class DummyDiff:
+        calls = 0
+
+        def process(self, text):
+            DummyDiff.calls += 1
+            return {"text": text, "metadata": {"changed": False, "iterations": 0}}
+
+    cfg = Config()
+    cfg.pipeline = PipelineConfig(quality_threshold=0.9, max_retries=0, diff_improvement_threshold=0.9)
+    cfg.llm.prices = {"gpt-4o": [5.0, 15.0]}
+    run_budget = Budget(cost=0.002, prices=cfg.llm.prices)
+    proofreader = UsageProofreader([0.5], tokens=500)  # 500 * 5 / 1e6 = 0.0025 USD
+    evaluator = DummyEvaluator([0.5])
+    spellchecker = SpellChecker(quality_threshold=0.0)
+
+    result = process_text(
+        "bad", cfg, DummyTranslator(), proofreader, evaluator, DummyFixer(), spellchecker,
+        DummyDiff(), budget=run_budget,
+    )
+
+    assert DummyDiff.calls == 0
+    assert result["metadata"]["diff_skipped"] is True
+    assert result["metadata"]["budget_exhausted"] == "run cost"
+    assert abs(run_budget.spent_cost - 0.0025) < 1e-12
+
+
+def test_parallel_proofreading_keeps_best_candidate():
+    class CandidateProofreader:
+        def __init__(self):
+            self.calls = []
+
+        def process_candidates(self, text, n, temperatures, error_rate=None, readability=None):
+            self.calls.append((n, list(temperatures)))
+            return [{"text": f"{text}-{t}", "quality_score": 0.95} for t in temperatures]
+
+    class TextEvaluator:
+        scores = {"bad-0.0": 0.5, "bad-0.5": 0.9, "bad-1.0": 0.7}
+
+        def evaluate(self, text, reference=None):
+            return {"quality_score": self.scores[text.text]}
+
+    cfg = Config()
+    cfg.pipeline = PipelineConfig(quality_threshold=0.85, max_retries=3)
+    cfg.proofreader.candidate_temperatures = [0.0, 0.5, 1.0]
+    proofreader = CandidateProofreader()
+    fixer = DummyFixer()
+
+    result = process_text(
+        "bad", cfg, DummyTranslator(), proofreader, TextEvaluator(), fixer, SpellChecker(quality_threshold=0.0)
+    )
+
+    assert result["text"] == "bad-0.5"
+    assert proofreader.calls == [(3, [0.0, 0.5, 1.0])]
+    assert fixer.calls == 0
+    assert result["metadata"]["proofread_candidate"] == 1
+    assert result["metadata"]["proofread_candidates"] == 3
@@ -38,3 +38,42 @@ def test_multiple_blank_lines_collapse_to_one():
     pre = Preprocessor()
     processed = pre.process(text)
     assert processed == "First.\n\nSecond."
+
+
+def test_iter_paragraphs_is_lazy():
+    consumed = []
+
+    def lines():
+        for line in ["First line\n", "continues here.\n", "Second\n", "paragraph.\n"]:
+            consumed.append(line)
+            yield line
+
+    paragraphs = Preprocessor().iter_paragraphs(lines())
+    assert next(paragraphs) == "First line continues here."
+    assert len(consumed) == 2
+    assert list(paragraphs) == ["Second paragraph."]
+
+
+def test_iter_paragraphs_matches_process_across_pieces():
+    text = "  ﬁrst line\nof “page” one\n\n\nnext — para.\ntail  \n"
+    pre = Preprocessor()
+    pieces = [text[i:i + 5] for i in range(0, len(text), 5)]
+    assert "\n\n".join(pre.iter_paragraphs(pieces)) == pre.process(text)
+    assert pre.process(text) == 'first line of "page" one\n\nnext - para.\n\ntail'
+
+
+def test_crlf_line_ends():
+    pre = Preprocessor()
+    assert pre.process("First.\r\nSecond\r\nline.\r\n") == "First.\n\nSecond line."
+
+
+
+def test_whitespace_only_lines():
+    pre = Preprocessor()
+    # 空白だけの行は空行ではなく、段落の一部として連結される
+    assert pre.process("a\n\t\nb") == "a \t b"
+    assert pre.process("a\n\u3000\nb") == "a \u3000 b"
+    assert pre.process("a。\n\u3000\nb") == "a。\n\n\u3000 b"
+    # 空行に挟まれた空白だけの行は消え、段落の間は空行一つになる
+    assert pre.process("a b\n\n\n\u3000\u3000\n\nb") == "a b\n\nb"
+    assert list(pre.iter_paragraphs(["a\n\n\u3000\t\n\nb"])) == ["a", "b"]
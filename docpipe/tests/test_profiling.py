@@ -0,0 +1,74 @@
+import os
+import pstats
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from docpipe.profiling import SourceProfiler  # noqa: E402
+from docpipe.tracing import span, tracing  # noqa: E402
+
+
+def _busy_stage(seconds: float) -> int:
+    total = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+def test_profile_dump_writes_pstats_and_collapsed_stacks(tmp_path):
+    profiler = SourceProfiler(interval=0.001)
+    profiler.start()
+    _busy_stage(0.1)
+    profiler.stop()
+
+    paths = profiler.dump(tmp_path)
+
+    stats = pstats.Stats(str(paths["pstats"]))
+    assert any(func[2] == "_busy_stage" for func in stats.stats)
+    lines = paths["collapsed"].read_text(encoding="utf-8").splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("_busy_stage (test_profiling.py" in line for line in lines)
+
+
+def test_memory_profile_records_stage_peaks():
+    profiler = SourceProfiler(memory=True)
+    profiler.start()
+    with tracing() as tracer:
+        with span("outer"):
+            with span("inner"):
+                data = bytearray(4 * 2**20)
+                del data
+            small = bytearray(2**10)
+            del small
+    profiler.stop()
+
+    summary = tracer.summary()
+    assert summary["inner"]["peak_memory_bytes"] >= 3 * 2**20
+    # 内側のピークは外側にも含まれる
+    assert summary["outer"]["peak_memory_bytes"] >= summary["inner"]["peak_memory_bytes"]
+    assert profiler.peak_memory >= 3 * 2**20
+
+
+def test_nested_spans_keep_the_outer_and_source_peaks():
+    profiler = SourceProfiler(memory=True)
+    profiler.start()
+    with tracing() as tracer:
+        with span("outer"):
+            # 内側のスパンが始まる前だけに確保されるメモリ
+            data = bytearray(4 * 2**20)
+            del data
+            with span("inner"):
+                small = bytearray(2**10)
+                del small
+        with span("next"):
+            pass
+    profiler.stop()
+
+    summary = tracer.summary()
+    assert summary["outer"]["peak_memory_bytes"] >= 3 * 2**20
+    assert summary["inner"]["peak_memory_bytes"] < 2**20
+    assert profiler.peak_memory >= 3 * 2**20
@@ -4,6 +4,7 @@ import types
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
+from docpipe.processors import proofreader as proofreader_module  # noqa: E402
 from docpipe.processors.proofreader import Proofreader  # noqa: E402
 from docpipe.glossary import Glossary
 
@@ -70,3 +71,38 @@ def test_proofreader_applies_glossary(monkeypatch, tmp_path):
     pf = Proofreader(glossary=glossary)
     result = pf.process("Microsoft")
     assert "マイクロソフト" in result["text"]
+
+
+def _fake_client_class(store: list):
+    class Completions:
+        def create(self, model, messages, temperature=0.0, n=1):
+            store.append((temperature, n))
+            choices = [
+                types.SimpleNamespace(message=types.SimpleNamespace(content=f" t={temperature} #{i} "))
+                for i in range(n)
+            ]
+            return types.SimpleNamespace(choices=choices, usage=None)
+
+    class Client:
+        def __init__(self):
+            self.chat = types.SimpleNamespace(completions=Completions())
+
+    return Client
+
+
+def test_proofread_candidates_per_temperature(monkeypatch):
+    store = []
+    monkeypatch.setattr(proofreader_module, "OpenAI", _fake_client_class(store))
+    pf = Proofreader()
+    candidates = pf.proofread_candidates("x", 3, [0.0, 0.5, 1.0])
+    assert candidates == ["t=0.0 #0", "t=0.5 #0", "t=1.0 #0"]
+    assert sorted(store) == [(0.0, 1), (0.5, 1), (1.0, 1)]
+
+
+def test_proofread_candidates_with_n(monkeypatch):
+    store = []
+    monkeypatch.setattr(proofreader_module, "OpenAI", _fake_client_class(store))
+    pf = Proofreader(temperature=0.7)
+    results = pf.process_candidates("x", 2)
+    assert [r["text"] for r in results] == ["t=0.7 #0", "t=0.7 #1"]
+    assert store == [(0.7, 2)]
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from docpipe.server import create_app  # noqa: E402
+from docpipe.service import JobManager  # noqa: E402
+from docpipe.tests.test_service import _components, _wait  # noqa: E402
+
+
+@pytest.fixture()
+def client_and_manager():
+    manager = JobManager(_components(), max_concurrent_jobs=1)
+    yield TestClient(create_app(manager, poll_interval=0.01)), manager
+    manager.shutdown()
+
+
+def test_submit_and_poll(client_and_manager):
+    client, manager = client_and_manager
+
+    resp = client.post("/jobs", json={"text": "hello"})
+    assert resp.status_code == 202
+    job_id = resp.json()["id"]
+    _wait(manager.get(job_id))
+
+    body = client.get(f"/jobs/{job_id}").json()
+    assert body["status"] == "done"
+    assert body["text"] == "HELLO"
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_event_stream_ends_with_done(client_and_manager):
+    client, _ = client_and_manager
+    job_id = client.post("/jobs", json={"text": "hello"}).json()["id"]
+
+    with client.stream("GET", f"/jobs/{job_id}/events") as resp:
+        body = "".join(resp.iter_text())
+
+    assert "event: chunk" in body
+    assert body.rstrip().split("\n\n")[-1].startswith("event: done")
+
+
+def test_rejects_local_paths(client_and_manager):
+    client, _ = client_and_manager
+    assert client.post("/jobs", json={"source": "/etc/passwd"}).status_code == 422
+    assert client.get("/healthz").json()["status"] == "ok"
@@ -0,0 +1,211 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from docpipe.config import Config, PipelineConfig  # noqa: E402
+from docpipe.processors.spellchecker import SpellChecker  # noqa: E402
+from docpipe.service import Components, JobManager, QueueFullError  # noqa: E402
+
+
+class Pre:
+    def process(self, text):
+        return text
+
+
+class Fix:
+    def process(self, text):
+        return {"text": text, "changed": False}
+
+
+class UpperTranslator:
+    def process(self, text):
+        return {"text": text.upper(), "metadata": {}}
+
+
+class Proof:
+    def process(self, text, **kwargs):
+        return {"text": text, "quality_score": 1.0}
+
+
+class Eval:
+    def evaluate(self, text, reference=None):
+        return {"quality_score": 1.0}
+
+
+class PageExtractor:
+    def can_handle(self, source):
+        return source.startswith("https://")
+
+    def extract(self, source):
+        return {"text": f"page {source}", "metadata": {"source_type": "web"}}
+
+
+def _components(translator=None):
+    cfg = Config()
+    cfg.pipeline = PipelineConfig(max_retries=0)
+    return Components(
+        cfg,
+        [PageExtractor()],
+        Pre(),
+        translator or UpperTranslator(),
+        Proof(),
+        Eval,
+        Fix(),
+        SpellChecker(quality_threshold=0.0),
+    )
+
+
+def _wait(job, timeout=5.0):
+    for _ in range(int(timeout / 0.01)):
+        if job.done:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError(f"job still {job.status}")
+
+
+def test_components_run_source_and_text():
+    components = _components()
+
+    result = components.run(source="https://example.com")
+    assert result["text"] == "PAGE HTTPS://EXAMPLE.COM"
+    assert result["metadata"]["source_type"] == "web"
+    assert "extract" in result["metadata"]["trace"]
+
+    result = components.run(text="hello")
+    assert result["text"] == "HELLO"
+    assert result["metadata"]["source_type"] == "text"
+
+
+def test_job_manager_builds_an_evaluator_per_thread_and_a_diff_processor_per_job(tmp_path):
+    both_running = threading.Barrier(2, timeout=5)
+
+    class Paired(UpperTranslator):
+        def process(self, text):
+            if text in ("a", "b"):
+                both_running.wait()
+            return super().process(text)
+
+    threads = []
+
+    class ThreadEval(Eval):
+        def __init__(self):
+            threads.append(threading.get_ident())
+
+    temp_dirs = []
+
+    def diff_processor_factory(temp_dir=None):
+        temp_dirs.append(temp_dir)
+        return None
+
+    components = _components(Paired())
+    components.cfg.diff_processor.history_dir = str(tmp_path)
+    components.evaluator_factory = ThreadEval
+    components.diff_processor_factory = diff_processor_factory
+    manager = JobManager(components, max_concurrent_jobs=2)
+    try:
+        jobs = [manager.submit(text=text) for text in ("a", "b")]
+        jobs += [manager.submit(text=text) for text in ("c", "d")]
+        for job in jobs:
+            _wait(job)
+    finally:
+        manager.shutdown()
+
+    assert [job.status for job in jobs] == ["done"] * 4
+    assert len(threads) == len(set(threads)) == 2
+    assert sorted(temp_dirs) == sorted(str(tmp_path / job.id) for job in jobs)
+
+
+def test_job_manager_builds_evaluators_at_startup():
+    built = []
+    used = []
+
+    class StartupEval(Eval):
+        def __init__(self):
+            built.append(self)
+
+        def evaluate(self, text, reference=None):
+            used.append(self)
+            return super().evaluate(text, reference)
+
+    components = _components()
+    components.evaluator_factory = StartupEval
+    manager = JobManager(components, max_concurrent_jobs=2)
+    try:
+        assert len(built) == 2
+        jobs = [manager.submit(text=text) for text in ("a", "b", "c")]
+        for job in jobs:
+            _wait(job)
+    finally:
+        manager.shutdown()
+
+    assert [job.status for job in jobs] == ["done"] * 3
+    assert used
+    assert len(built) == 2
+    assert all(any(evaluator is b for b in built) for evaluator in used)
+
+
+def test_job_manager_runs_jobs_and_records_events():
+    manager = JobManager(_components(), max_concurrent_jobs=2)
+    try:
+        job = manager.submit(text="hello")
+        _wait(job)
+    finally:
+        manager.shutdown()
+
+    assert manager.get(job.id) is job
+    info = job.to_dict()
+    assert info["status"] == "done"
+    assert info["text"] == "HELLO"
+    assert [e["event"] for e in job.events] == ["chunk", "done"]
+    assert job.events[0]["data"] == {"text": "HELLO"}
+
+
+def test_job_manager_reports_failures():
+    class Broken:
+        def process(self, text):
+            raise RuntimeError("boom")
+
+    manager = JobManager(_components(Broken()))
+    try:
+        job = manager.submit(text="hello")
+        _wait(job)
+    finally:
+        manager.shutdown()
+
+    assert job.status == "failed"
+    assert job.error == "boom"
+    assert job.events[-1] == {"event": "failed", "data": {"error": "boom"}}
+
+
+def test_job_manager_limits_queue_and_sources():
+    release = threading.Event()
+
+    class Blocking(UpperTranslator):
+        def process(self, text):
+            release.wait(5)
+            return super().process(text)
+
+    manager = JobManager(_components(Blocking()), max_concurrent_jobs=1, max_queued_jobs=1)
+    try:
+        with pytest.raises(ValueError):
+            manager.submit(source="/etc/passwd")
+        with pytest.raises(ValueError):
+            manager.submit()
+        running = manager.submit(text="a")
+        for _ in range(500):
+            if running.status == "running":
+                break
+            threading.Event().wait(0.01)
+        queued = manager.submit(text="b")
+        with pytest.raises(QueueFullError):
+            manager.submit(text="c")
+        assert manager.stats()["queued"] == 1
+    finally:
+        release.set()
+        _wait(running)
+        _wait(queued)
+        manager.shutdown()
@@ -0,0 +1,73 @@
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from docpipe.processors import proofreader as proofreader_module  # noqa: E402
+from docpipe.processors.proofreader import Proofreader  # noqa: E402
+from docpipe.streaming import complete, streaming  # noqa: E402
+from docpipe.tracing import span, tracing  # noqa: E402
+
+
+def _event(content=None, usage=None):
+    choices = [] if content is None else [types.SimpleNamespace(delta=types.SimpleNamespace(content=content))]
+    return types.SimpleNamespace(choices=choices, usage=usage, model="fake")
+
+
+class StreamingClient:
+    def __init__(self, parts, store):
+        usage = types.SimpleNamespace(prompt_tokens=7, completion_tokens=len(parts))
+        events = [_event(part) for part in parts] + [_event(usage=usage)]
+
+        class Completions:
+            def create(self, **kwargs):
+                store.append(kwargs)
+                if kwargs.get("stream"):
+                    return iter(events)
+                message = types.SimpleNamespace(content="".join(parts))
+                return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+        self.chat = types.SimpleNamespace(completions=Completions())
+
+
+def test_complete_streams_deltas_to_listener():
+    store = []
+    client = StreamingClient(["校正", "済み", "です"], store)
+    received = []
+    with tracing() as tracer, streaming(lambda stage, delta: received.append((stage, delta))):
+        with span("proofread"):
+            text = complete(client, "proofread", True, model="m", messages=[])
+
+    assert text == "校正済みです"
+    assert received == [("proofread", "校正"), ("proofread", "済み"), ("proofread", "です")]
+    assert store[0]["stream"] is True
+    assert store[0]["stream_options"] == {"include_usage": True}
+    summary = tracer.summary()["proofread"]
+    assert summary["llm_calls"] == 1
+    assert summary["prompt_tokens"] == 7
+    assert summary["completion_tokens"] == 3
+
+
+def test_complete_without_stream_is_unchanged():
+    store = []
+    client = StreamingClient(["a", "b"], store)
+    received = []
+    with streaming(lambda stage, delta: received.append(delta)):
+        text = complete(client, "translate", False, model="m", messages=[])
+
+    assert text == "ab"
+    assert received == []
+    assert "stream" not in store[0]
+
+
+def test_proofreader_streams_and_returns_full_text(monkeypatch):
+    store = []
+    client = StreamingClient(["  Fixed ", "text.  "], store)
+    monkeypatch.setattr(proofreader_module, "OpenAI", lambda: client)
+    received = []
+    with streaming(lambda stage, delta: received.append(delta)):
+        result = Proofreader(stream=True).process("Fixd text.")
+
+    assert result["text"] == "Fixed text."
+    assert "".join(received) == "  Fixed text.  "
@@ -0,0 +1,54 @@
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from docpipe.tracing import merge_summary, record_usage, span, tracing  # noqa: E402
+
+
+def _response(prompt_tokens, completion_tokens):
+    usage = types.SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    return types.SimpleNamespace(usage=usage)
+
+
+def test_span_is_noop_without_tracer():
+    with span("translate") as record:
+        record_usage(_response(10, 5))
+    assert record == {}
+
+
+def test_usage_counts_in_innermost_span():
+    with tracing() as tracer:
+        with span("translate"):
+            record_usage(_response(10, 5))
+            record_usage(_response(3, 2))
+        with span("proofread"):
+            record_usage(types.SimpleNamespace())  # usage を返さない API
+
+    summary = tracer.summary()
+    assert summary["translate"]["calls"] == 1
+    assert summary["translate"]["llm_calls"] == 2
+    assert summary["translate"]["prompt_tokens"] == 13
+    assert summary["translate"]["completion_tokens"] == 7
+    assert summary["proofread"]["llm_calls"] == 1
+    assert "prompt_tokens" not in summary["proofread"]
+    assert summary["translate"]["seconds"] >= 0.0
+
+
+def test_nested_tracers_report_to_parent():
+    with tracing() as outer:
+        with tracing() as inner:
+            with span("fix"):
+                pass
+        with span("fix"):
+            pass
+
+    assert inner.summary()["fix"]["calls"] == 1
+    assert outer.summary()["fix"]["calls"] == 2
+
+
+def test_merge_summary_adds_totals():
+    total = {"fix": {"calls": 1, "seconds": 0.5}}
+    merge_summary(total, {"fix": {"calls": 2, "seconds": 0.25}, "diff": {"calls": 1, "seconds": 1.0}})
+    assert total == {"fix": {"calls": 3, "seconds": 0.75}, "diff": {"calls": 1, "seconds": 1.0}}
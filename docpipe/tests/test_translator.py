@@ -73,3 +73,30 @@ def test_translator_applies_glossary(monkeypatch, tmp_path):
     tr = Translator(glossary=glossary)
     out = tr.process("computer")
     assert out["text"] == "パソコン"
+
+
+def test_glossary_entries_in_prompt(monkeypatch, tmp_path):
+    gfile = tmp_path / "gl.csv"
+    gfile.write_text("ja,en\nパソコン,computer\n人工知能,AI\n", encoding="utf-8")
+    glossary = Glossary(str(gfile))
+    store = {}
+
+    class DummyCompletions:
+        @staticmethod
+        def create(model, messages, temperature=0.0):
+            store["messages"] = messages
+            message = types.SimpleNamespace(content="パソコン")
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+    dummy_openai = types.SimpleNamespace(chat=types.SimpleNamespace(completions=DummyCompletions))
+    module = sys.modules[Translator.__module__]
+    monkeypatch.setattr(module, "openai", dummy_openai)
+    monkeypatch.setattr(module, "OpenAI", lambda: dummy_openai)
+
+    tr = Translator(glossary=glossary, glossary_in_prompt=True)
+    tr.translate("my computer")
+
+    system = store["messages"][0]
+    assert system["role"] == "system"
+    assert "computer → パソコン" in system["content"]
+    assert "AI" not in system["content"]
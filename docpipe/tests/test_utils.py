@@ -8,7 +8,7 @@ from docpipe.utils import split_into_chunks  # noqa: E402
 
 
 def test_split_into_chunks_word_fallback(monkeypatch):
-    monkeypatch.setattr("docpipe.utils.text_utils.tiktoken", None)
+    monkeypatch.setattr("docpipe.utils.tokenizer.tiktoken", None)
     text = "one two three four five six seven eight nine"
     chunks = split_into_chunks(text, max_tokens=3)
     assert chunks == [
@@ -20,14 +20,14 @@ def test_split_into_chunks_word_fallback(monkeypatch):
 
 def test_split_into_chunks_with_dummy_tokenizer(monkeypatch):
     class DummyTokenizer:
-        def encode(self, text: str):
+        def encode_ordinary(self, text: str):
             return text.split()
 
-        def decode(self, tokens):
-            return " ".join(tokens)
+        def encode_ordinary_batch(self, texts, num_threads=8):
+            return [self.encode_ordinary(t) for t in texts]
 
     dummy_module = types.SimpleNamespace(get_encoding=lambda name: DummyTokenizer())
-    monkeypatch.setattr("docpipe.utils.text_utils.tiktoken", dummy_module)
+    monkeypatch.setattr("docpipe.utils.tokenizer.tiktoken", dummy_module)
 
     text = "one two three four five six seven eight nine"
     chunks = split_into_chunks(text, max_tokens=4)
@@ -43,7 +43,7 @@ def test_split_into_chunks_handles_tiktoken_failure(monkeypatch):
         def get_encoding(self, name):
             raise RuntimeError("download failed")
 
-    monkeypatch.setattr("docpipe.utils.text_utils.tiktoken", FailingModule())
+    monkeypatch.setattr("docpipe.utils.tokenizer.tiktoken", FailingModule())
 
     text = "one two three four five six seven eight nine"
     chunks = split_into_chunks(text, max_tokens=3)
@@ -52,3 +52,139 @@ def test_split_into_chunks_handles_tiktoken_failure(monkeypatch):
         "four five six",
         "seven eight nine",
     ]
+
+
+def test_aho_corasick_leftmost_longest():
+    from docpipe.utils.aho_corasick import AhoCorasick
+
+    matcher = AhoCorasick(["he", "she", "hers", "his"])
+    assert matcher.leftmost_longest("ushers his") == [(1, 4, 1), (7, 10, 3)]
+    # rejecting the longer candidate lets a shorter one match
+    assert matcher.leftmost_longest("hers", accept=lambda i, s, e: i != 2) == [(0, 2, 0)]
+
+
+def test_chunk_text_keeps_sentences_and_offsets(monkeypatch):
+    from docpipe.utils import chunk_text, join_chunks
+
+    monkeypatch.setattr("docpipe.utils.tokenizer.tiktoken", None)
+    text = "# 見出し\n\n最初の文です。二番目の文です！\n\nFirst sentence. Second one.\n"
+    chunks = chunk_text(text, max_tokens=12)
+
+    assert [c.text for c in chunks] == [
+        "# 見出し\n\n最初の文です。",
+        "二番目の文です！",
+        "First sentence. Second one.",
+    ]
+    for chunk in chunks:
+        assert text[chunk.start:chunk.end] == chunk.text
+    assert join_chunks(text, chunks, [c.text for c in chunks]) == text
+
+
+def test_chunk_text_keeps_heading_with_following_block(monkeypatch):
+    from docpipe.utils import chunk_text
+
+    monkeypatch.setattr("docpipe.utils.tokenizer.tiktoken", None)
+    text = "aaa bbb ccc\n\n## Title\n\nddd eee fff"
+    chunks = chunk_text(text, max_tokens=6)
+
+    assert [c.text for c in chunks] == ["aaa bbb ccc", "## Title\n\nddd eee fff"]
+
+
+def test_chunk_text_hard_splits_unbroken_text(monkeypatch):
+    from docpipe.utils import chunk_text
+
+    monkeypatch.setattr("docpipe.utils.tokenizer.tiktoken", None)
+    text = "あ" * 25
+    chunks = chunk_text(text, max_tokens=10)
+
+    assert [len(c.text) for c in chunks] == [10, 10, 5]
+    assert "".join(c.text for c in chunks) == text
+
+
+def test_tokenizer_per_model_cache_and_batch(monkeypatch):
+    from docpipe.utils import get_tokenizer, tokenizer
+
+    loaded = []
+
+    class DummyEncoding:
+        def __init__(self, name):
+            self.name = name
+
+        def encode_ordinary(self, text):
+            return list(text)
+
+        def encode_ordinary_batch(self, texts, num_threads=8):
+            return [list(t) for t in texts]
+
+    def get_encoding(name):
+        loaded.append(name)
+        return DummyEncoding(name)
+
+    monkeypatch.setattr(tokenizer, "tiktoken", types.SimpleNamespace(get_encoding=get_encoding))
+
+    assert get_tokenizer("gpt-4o-mini").encoding_name == "o200k_base"
+    assert get_tokenizer("gpt-4").encoding_name == "cl100k_base"
+    assert get_tokenizer("gpt-4") is get_tokenizer("gpt-4")
+    tok = get_tokenizer("gpt-4.1-mini")
+    assert tok.count_batch(["ab", "cde", ""]) == [2, 3, 0]
+    assert tok.encode_batch(["ab"]) == [["a", "b"]]
+    assert tok.count("xyz") == 3
+    assert loaded == ["o200k_base"]
+
+
+def test_tokenizer_estimate_without_tiktoken(monkeypatch):
+    from docpipe.utils import estimate_tokens, get_tokenizer
+
+    monkeypatch.setattr("docpipe.utils.tokenizer.tiktoken", None)
+    assert estimate_tokens("one two w10") == 4
+    assert estimate_tokens("日本語です。") == 6
+    assert get_tokenizer().count_batch(["one two", "三"]) == [2, 1]
+    assert not get_tokenizer().exact
+
+
+def test_critical_markdown_round_trip_skips_code_fences():
+    from docpipe.utils.markdown_utils import (
+        extract_critical_markdown_blocks,
+        restore_critical_markdown_blocks,
+    )
+
+    text = (
+        "# Title\n\nSee ![fig](a.png) here.\n\n| a | b |\n|---|---|\n\n"
+        "```python\n# comment\n| not | table |\n```\n\n## End"
+    )
+    protected, blocks = extract_critical_markdown_blocks(text)
+
+    assert list(blocks) == [
+        "__CRITICAL_HEADER_0__",
+        "__CRITICAL_IMAGE_1__",
+        "__CRITICAL_TABLE_2__",
+        "__CRITICAL_HEADER_3__",
+    ]
+    assert "# comment\n| not | table |" in protected
+    assert restore_critical_markdown_blocks(protected, blocks) == text
+    # a header glued to its paragraph by an LLM goes back on its own line
+    glued = protected.replace("__CRITICAL_HEADER_0__\n\n", "__CRITICAL_HEADER_0__")
+    assert restore_critical_markdown_blocks(glued, blocks).startswith("# Title\nSee ")
+
+
+def test_is_markdown_file():
+    from docpipe.utils.markdown_utils import is_markdown_file
+
+    assert is_markdown_file("intro\n## Heading")
+    assert is_markdown_file("text with **bold** inside")
+    assert is_markdown_file("  - item")
+    assert is_markdown_file("see [link](http://example.com)")
+    assert not is_markdown_file("普通の文章です。\nplain text only.")
+
+
+def test_char_stats_batch_matches_regex_counts(monkeypatch):
+    from docpipe.utils import text_stats
+
+    texts = ["今日は晴れ。散歩、します！ ", "", "  \n。。？", "English only. 𠀋漢字　です"]
+    batch = text_stats.char_stats_batch(texts)
+    assert batch == [text_stats._char_stats_regex(text) for text in texts]
+    assert batch[0] == text_stats.CharStats(chars=14, spaces=1, punctuation=3, kanji=5, hiragana=5, sentences=2)
+    assert text_stats.char_stats(texts[2]).sentences == 0
+
+    monkeypatch.setattr(text_stats, "_CLASS_TABLE", None)
+    assert text_stats.char_stats_batch(texts) == batch
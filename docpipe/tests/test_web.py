@@ -73,3 +73,27 @@ def test_extract_fetch_failure(monkeypatch):
     extractor = WebExtractor()
     with pytest.raises(RuntimeError):
         extractor.extract("https://example.com")
+
+
+def test_single_pass_extraction(monkeypatch):
+    calls = []
+
+    def bare_extraction(html, url=None, with_metadata=False, **kwargs):
+        calls.append(html)
+        return types.SimpleNamespace(text="TEXT", title="Example", author=None)
+
+    monkeypatch.setattr(
+        "docpipe.extractors.web.trafilatura",
+        types.SimpleNamespace(fetch_url=lambda url: "DUMMY", bare_extraction=bare_extraction),
+    )
+    extractor = WebExtractor(extraction_mode="single_pass")
+    result = extractor.extract("https://example.com")
+    assert calls == ["DUMMY"]
+    assert result["text"] == "TEXT"
+    assert result["metadata"]["title"] == "Example"
+    assert "author" not in result["metadata"]
+
+
+def test_invalid_extraction_mode():
+    with pytest.raises(ValueError):
+        WebExtractor(extraction_mode="unknown")
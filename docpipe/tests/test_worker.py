@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from docpipe.jobqueue import SQLiteJobQueue  # noqa: E402
+from docpipe.tests.test_jobqueue import Clock  # noqa: E402
+from docpipe.tests.test_service import _components  # noqa: E402
+from docpipe.worker import run_worker  # noqa: E402
+
+
+def test_worker_processes_queue_and_writes_results(tmp_path):
+    queue = SQLiteJobQueue(tmp_path / "jobs.sqlite3", max_attempts=2)
+    ok, bad = queue.enqueue(["https://example.com/a", "missing.pdf"])
+
+    processed = run_worker(queue, _components(), tmp_path / "out", "w1", exit_when_empty=True)
+
+    assert processed == 3  # 失敗したジョブは max_attempts まで再試行される
+    assert (tmp_path / "out" / ok / "final.md").read_text(encoding="utf-8") == "PAGE HTTPS://EXAMPLE.COM/A"
+    metadata = json.loads((tmp_path / "out" / ok / "final_metadata.json").read_text(encoding="utf-8"))
+    assert metadata["job_id"] == ok
+    assert metadata["attempts"] == 1
+    assert queue.jobs("done")[0]["output"] == str(tmp_path / "out" / ok)
+    failed = queue.jobs("failed")
+    assert [(j["id"], j["attempts"]) for j in failed] == [(bad, 2)]
+    assert "No extractor" in failed[0]["error"]
+
+
+def test_worker_heartbeats_keep_the_lease(tmp_path):
+    queue = SQLiteJobQueue(tmp_path / "jobs.sqlite3", lease_seconds=0.3)
+    queue.enqueue(["https://example.com/slow"])
+    components = _components()
+    translator = components.translator
+    stolen = []
+
+    class Slow:
+        def process(self, text):
+            threading.Event().wait(0.8)
+            # リースが生きていれば他のワーカーは取得できない
+            stolen.append(queue.claim("other"))
+            return translator.process(text)
+
+    components.translator = Slow()
+    processed = run_worker(
+        queue, components, tmp_path / "out", "w1", heartbeat_interval=0.05, exit_when_empty=True
+    )
+
+    assert processed == 1
+    assert stolen == [None]
+    assert queue.counts()["done"] == 1
+
+
+def test_worker_abandons_job_after_losing_the_lease(tmp_path):
+    clock = Clock()
+    queue = SQLiteJobQueue(tmp_path / "jobs.sqlite3", lease_seconds=10, clock=clock)
+    (job_id,) = queue.enqueue(["https://example.com/stalled"])
+    components = _components()
+    translator = components.translator
+
+    class Stalled:
+        def process(self, text):
+            # 停止している間にリースが切れ、他のワーカーが引き継ぐ
+            clock.now += 11
+            assert queue.claim("other").id == job_id
+            threading.Event().wait(0.3)
+            return translator.process(text)
+
+    components.translator = Stalled()
+    out = tmp_path / "out"
+    (out / job_id).mkdir(parents=True)
+    (out / job_id / "final.md").write_text("from the new lease holder", encoding="utf-8")
+
+    processed = run_worker(queue, components, out, "w1", heartbeat_interval=0.05, exit_when_empty=True)
+
+    assert processed == 1
+    assert (out / job_id / "final.md").read_text(encoding="utf-8") == "from the new lease holder"
+    assert not any((out / ".work").iterdir())
+    (row,) = queue.jobs()
+    assert (row["status"], row["worker"], row["attempts"]) == ("running", "other", 2)
@@ -0,0 +1,166 @@
+"""Lightweight spans for per-stage timing and token accounting.
+
+Processors call :func:`span` around their work and :func:`record_usage`
+after each LLM request. Both are no-ops unless a :class:`Tracer` is active
+(see :func:`tracing`), so the processors need no extra arguments. Finished
+spans are also recorded in :mod:`docpipe.metrics`.
+"""
+
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from .budget import charge_usage
+from .metrics import observe_span
+
+# 集計時に合計する数値カウンタ
+COUNTERS = ("prompt_tokens", "completion_tokens", "llm_calls", "cache_hits")
+
+_current: ContextVar[Optional["Tracer"]] = ContextVar("docpipe_tracer", default=None)
+
+# tracemalloc のピークはプロセスで一つなので、reset_peak の前に開いている全ての
+# 計測（スパン・プロファイラ）へ現在のピークを畳み込む
+_peak_slots: List[List[int]] = []
+_peak_lock = threading.Lock()
+
+
+def open_peak() -> List[int]:
+    """Start tracking the traced-memory peak; pass the result to :func:`close_peak`.
+
+    The tracemalloc peak is reset so that the measurement starts now, but
+    the peak reached so far is first folded into every other open
+    measurement, so nested measurements never lose an outer one's peak.
+    """
+    with _peak_lock:
+        current, peak = tracemalloc.get_traced_memory()
+        for slot in _peak_slots:
+            slot[0] = max(slot[0], peak)
+        tracemalloc.reset_peak()
+        slot = [current]
+        _peak_slots.append(slot)
+    return slot
+
+
+def close_peak(slot: List[int]) -> int:
+    """Stop tracking ``slot`` and return its peak traced memory in bytes."""
+    with _peak_lock:
+        # 値が等しい別の計測を消さないよう同一性で探す
+        del _peak_slots[next(i for i, open_slot in enumerate(_peak_slots) if open_slot is slot)]
+        return max(slot[0], tracemalloc.get_traced_memory()[1])
+
+
+class Tracer:
+    """Collect finished spans as ``{"name", "seconds", <counters>}`` records."""
+
+    def __init__(self) -> None:
+        self.spans: List[Dict[str, Any]] = []
+        self._stack: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+        record: Dict[str, Any] = {"name": name, **attrs}
+        peak = open_peak() if tracemalloc.is_tracing() else None
+        if peak is not None:
+            base = peak[0]
+        self._stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            self._stack.pop()
+            if peak is not None:
+                record["peak_memory_bytes"] = close_peak(peak) - base
+            self.spans.append(record)
+            observe_span(record)
+
+    def count(self, key: str, value: float = 1) -> None:
+        """Add ``value`` to counter ``key`` of the innermost open span."""
+        if self._stack:
+            record = self._stack[-1]
+            record[key] = record.get(key, 0) + value
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage totals: ``calls``, ``seconds`` and the counters.
+
+        Durations of nested spans are inclusive; counters belong to the
+        innermost span only. ``peak_memory_bytes`` (with tracemalloc running)
+        is the largest peak above the memory in use when the span started.
+        """
+        stages: Dict[str, Dict[str, float]] = {}
+        for record in self.spans:
+            stage = stages.setdefault(record["name"], {"calls": 0, "seconds": 0.0})
+            stage["calls"] += 1
+            stage["seconds"] += record["seconds"]
+            for key in COUNTERS:
+                if key in record:
+                    stage[key] = stage.get(key, 0) + record[key]
+            if "peak_memory_bytes" in record:
+                stage["peak_memory_bytes"] = max(stage.get("peak_memory_bytes", 0), record["peak_memory_bytes"])
+        return stages
+
+
+def merge_summary(into: Dict[str, Dict[str, float]], summary: Dict[str, Dict[str, float]]) -> None:
+    """Add the totals of ``summary`` to ``into`` in place."""
+    for name, stage in summary.items():
+        target = into.setdefault(name, {})
+        for key, value in stage.items():
+            if key == "peak_memory_bytes":
+                target[key] = max(target.get(key, 0), value)
+            else:
+                target[key] = target.get(key, 0) + value
+
+
+@contextmanager
+def tracing() -> Iterator[Tracer]:
+    """Activate a new tracer for the enclosed block.
+
+    Spans recorded inside are also handed to the tracer that was active
+    before, so a document-level trace contains its chunk-level traces.
+    """
+    parent = _current.get()
+    tracer = Tracer()
+    token = _current.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current.reset(token)
+        if parent is not None:
+            parent.spans.extend(tracer.spans)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """Time the enclosed block as stage ``name`` of the active tracer."""
+    tracer = _current.get()
+    if tracer is None:
+        yield {}
+        return
+    with tracer.span(name, **attrs) as record:
+        yield record
+
+
+def count(key: str, value: float = 1) -> None:
+    tracer = _current.get()
+    if tracer is not None:
+        tracer.count(key, value)
+
+
+def record_usage(resp: Any) -> None:
+    """Count one LLM call and its ``resp.usage`` tokens in the current span.
+
+    The usage is also charged to the active budget.
+    """
+    charge_usage(resp)
+    tracer = _current.get()
+    if tracer is None:
+        return
+    tracer.count("llm_calls")
+    usage = getattr(resp, "usage", None)
+    if usage is None:
+        return
+    tracer.count("prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0)
+    tracer.count("completion_tokens", getattr(usage, "completion_tokens", 0) or 0)
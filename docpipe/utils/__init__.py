@@ -1,5 +1,15 @@
 # Utils package for text-agent 
 
-from .text_utils import split_into_chunks
+from .text_utils import TextChunk, chunk_text, join_chunks, split_into_chunks
+from .tokenizer import Tokenizer, count_tokens, estimate_tokens, get_tokenizer
 
-__all__ = ['split_into_chunks'] 
\ No newline at end of file
+__all__ = [
+    'TextChunk',
+    'Tokenizer',
+    'chunk_text',
+    'count_tokens',
+    'estimate_tokens',
+    'get_tokenizer',
+    'join_chunks',
+    'split_into_chunks',
+]
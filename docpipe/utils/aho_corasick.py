@@ -0,0 +1,151 @@
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+# Unicode code points fit in 21 bits, so (state, char) packs into one integer key.
+_CP_BITS = 21
+
+AcceptFn = Callable[[int, int, int], bool]
+IntArray = Union[array, memoryview]
+
+# (attribute, array typecode) in serialization order
+ARRAY_LAYOUT = (
+    ("edge_keys", "Q"),
+    ("edge_next", "I"),
+    ("fail", "I"),
+    ("out", "i"),
+    ("term", "i"),
+    ("depth", "I"),
+)
+
+
+class AhoCorasick:
+    """Multi-pattern matcher with leftmost-longest match selection.
+
+    The automaton is stored in flat arrays: transitions are sorted
+    ``(state << 21) | codepoint`` keys searched with :func:`bisect`, which
+    keeps memory compact for large vocabularies. The arrays can be exported
+    with :meth:`arrays` and wrapped again with :meth:`from_arrays`, for
+    example over a memory-mapped file shared by several processes.
+    """
+
+    edge_keys: IntArray
+    edge_next: IntArray
+    fail: IntArray
+    out: IntArray
+    term: IntArray
+    depth: IntArray
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        term = [-1]
+        depth = [0]
+        for idx, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    term.append(-1)
+                    depth.append(depth[state] + 1)
+                state = nxt
+            if pattern:
+                term[state] = idx
+
+        fail = [0] * len(goto)
+        # nearest state on the failure chain that ends a pattern
+        out = [-1] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                out[nxt] = fail[nxt] if term[fail[nxt]] >= 0 else out[fail[nxt]]
+                queue.append(nxt)
+
+        edges = sorted(
+            ((state << _CP_BITS) | ord(ch), nxt)
+            for state, children in enumerate(goto)
+            for ch, nxt in children.items()
+        )
+        self.edge_keys = array("Q", (k for k, _ in edges))
+        self.edge_next = array("I", (v for _, v in edges))
+        self.fail = array("I", fail)
+        self.out = array("i", out)
+        self.term = array("i", term)
+        self.depth = array("I", depth)
+        self._root = dict(goto[0])
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, IntArray]) -> "AhoCorasick":
+        """Wrap prebuilt arrays (e.g. memoryviews over an mmap) without copying."""
+        self = cls.__new__(cls)
+        for name, _ in ARRAY_LAYOUT:
+            setattr(self, name, arrays[name])
+        # root transitions sort first because state 0 is the smallest key prefix
+        root_end = bisect_left(self.edge_keys, 1 << _CP_BITS)
+        self._root = {
+            chr(self.edge_keys[i]): self.edge_next[i] for i in range(root_end)
+        }
+        return self
+
+    def arrays(self) -> Dict[str, IntArray]:
+        return {name: getattr(self, name) for name, _ in ARRAY_LAYOUT}
+
+    def __len__(self) -> int:
+        return len(self.term)
+
+    def _step(self, state: int, ch: str) -> int:
+        if state == 0:
+            return self._root.get(ch, 0)
+        cp = ord(ch)
+        keys = self.edge_keys
+        size = len(keys)
+        while state:
+            key = (state << _CP_BITS) | cp
+            i = bisect_left(keys, key)
+            if i < size and keys[i] == key:
+                return self.edge_next[i]
+            state = self.fail[state]
+        return self._root.get(ch, 0)
+
+    def leftmost_longest(
+        self, text: str, accept: Optional[AcceptFn] = None
+    ) -> List[Tuple[int, int, int]]:
+        """Return non-overlapping ``(start, end, pattern_index)`` matches.
+
+        At each start position the longest pattern wins, and matches are
+        taken left to right. ``accept(index, start, end)`` can reject a
+        candidate, letting a shorter pattern match at the same position.
+        """
+        best: Dict[int, Tuple[int, int]] = {}
+        term, out, depth = self.term, self.out, self.depth
+        state = 0
+        for end, ch in enumerate(text, 1):
+            state = self._step(state, ch)
+            hit = state if term[state] >= 0 else out[state]
+            while hit >= 0:
+                length = depth[hit]
+                start = end - length
+                if length > best.get(start, (0, -1))[0] and (
+                    accept is None or accept(term[hit], start, end)
+                ):
+                    best[start] = (length, term[hit])
+                hit = out[hit]
+
+        matches: List[Tuple[int, int, int]] = []
+        pos = 0
+        for start in sorted(best):
+            if start < pos:
+                continue
+            length, idx = best[start]
+            matches.append((start, start + length, idx))
+            pos = start + length
+        return matches
@@ -2,111 +2,93 @@ import re
 from typing import List, Tuple, Dict, Any
 
 
+# Markdown の兆候: 行頭の構文（見出し・リスト・引用・表・水平線）と行内の構文
+# （強調・インラインコード・リンク/画像）。**太字**, ```コード```, 画像はそれぞれ
+# *...*, `...`, [...](...) に含まれるので二つの正規表現で判定できる
+_MARKDOWN_LINE = re.compile(
+    r'^(?:#{1,6}\s|\s*(?:[-*+]\s|\d+\.\s|>\s|---+\s*$)|\|.*\|$)', re.MULTILINE
+)
+_MARKDOWN_INLINE = re.compile(r'\*.*?\*|`.*?`|\[.*?\]\(.*?\)')
+
+# 保護対象ブロックを一度の走査で見つけるスキャナ。コードフェンスは内部の
+# "#" や "|" を見出し・表と誤認しないよう読み飛ばすだけで保護はしない。
+_CRITICAL_SCANNER = re.compile(
+    r"""
+    (?P<FENCE>^[ \t]*(?P<fch>```|~~~)[^\n]*(?:\n.*?)*?(?:\n[ \t]*(?P=fch)[^\n]*|\Z))
+    |(?P<TABLE>^[ \t]*\|(?:.*\|)?[ \t]*$(?:\n[ \t]*\|(?:.*\|)?[ \t]*$)*)
+    |(?P<HEADER>^\#{1,6}[ \t]+.*$)
+    |(?P<IMAGE>!\[(?:[^\]]|\](?!\())*\]\([^)]+\))
+    """,
+    re.MULTILINE | re.VERBOSE,
+)
+
+CRITICAL_PLACEHOLDER = re.compile(r'__CRITICAL_(?:TABLE|IMAGE|HEADER)_\d+__')
+_MARKDOWN_PLACEHOLDER = re.compile(r'__MARKDOWN_[A-Z_]+?_\d+__')
+
+
 def is_markdown_file(text: str) -> bool:
     """Check if the text contains Markdown formatting."""
-    markdown_patterns = [
-        r'^#{1,6}\s+',  # Headers
-        r'\*\*.*?\*\*',  # Bold
-        r'\*.*?\*',      # Italic
-        r'`.*?`',        # Inline code
-        r'```[\s\S]*?```',  # Code blocks
-        r'!\[.*?\]\(.*?\)',  # Images
-        r'\[.*?\]\(.*?\)',   # Links
-        r'^\s*[-*+]\s+',     # Unordered lists
-        r'^\s*\d+\.\s+',     # Ordered lists
-        r'^\s*>\s+',         # Blockquotes
-        r'^\|.*\|$',         # Tables
-        r'^\s*---+\s*$',     # Horizontal rules
-    ]
-    
-    for pattern in markdown_patterns:
-        if re.search(pattern, text, re.MULTILINE):
-            return True
-    return False
+    return bool(_MARKDOWN_LINE.search(text) or _MARKDOWN_INLINE.search(text))
 
 
 def extract_critical_markdown_blocks(text: str) -> Tuple[str, Dict[str, str]]:
     """
-    Extract only table, image, and header blocks as critical Markdown, in that order.
+    Extract only table, image, and header blocks as critical Markdown.
     Do NOT protect bold, link, or other markdown elements.
-    """
-    blocks = {}
-    block_counter = 0
-
-    # 1. 表を最優先で検出・保護
-    def find_and_replace_tables(text):
-        nonlocal block_counter
-        lines = text.split('\n')
-        result_lines = []
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            # | で始まり | で終わる行が連続している部分を表とみなす
-            if line.strip().startswith('|') and line.strip().endswith('|'):
-                table_lines = [line]
-                i += 1
-                while i < len(lines):
-                    next_line = lines[i]
-                    if next_line.strip().startswith('|') and next_line.strip().endswith('|'):
-                        table_lines.append(next_line)
-                        i += 1
-                    else:
-                        break
-                table_block = '\n'.join(table_lines)
-                placeholder = f"__CRITICAL_TABLE_{block_counter}__"
-                blocks[placeholder] = table_block
-                block_counter += 1
-                result_lines.append(placeholder)
-            else:
-                result_lines.append(line)
-                i += 1
-        return '\n'.join(result_lines)
-    text = find_and_replace_tables(text)
 
-    # 2. 画像 (![...](...))
-    def replace_image(match):
-        nonlocal block_counter
-        placeholder = f"__CRITICAL_IMAGE_{block_counter}__"
+    Blocks are found in a single scan and numbered in document order.
+    Code fences are skipped so their contents are never taken for headers
+    or tables.
+    """
+    blocks: Dict[str, str] = {}
+    pieces: List[str] = []
+    pos = 0
+    for match in _CRITICAL_SCANNER.finditer(text):
+        kind = match.lastgroup
+        if kind == 'FENCE':
+            continue
+        placeholder = f"__CRITICAL_{kind}_{len(blocks)}__"
         blocks[placeholder] = match.group(0)
-        block_counter += 1
-        return placeholder
-    text = re.sub(r'!\[.*?\]\([^)]+\)', replace_image, text, flags=re.MULTILINE | re.DOTALL)
-
-    # 3. 見出し (# ...) - 行の先頭にある見出しのみを検出（前後の改行も含める）
-    def replace_header(match):
-        nonlocal block_counter
-        # 見出しの前後の改行も含めて保存
-        line_start = match.start()
-        line_end = match.end()
-        
-        # 前の改行を検出
-        prev_newline = ""
-        if line_start > 0 and text[line_start-1] == '\n':
-            prev_newline = "\n"
-        
-        # 後の改行を検出
-        next_newline = ""
-        if line_end < len(text) and text[line_end] == '\n':
-            next_newline = "\n"
-        
-        placeholder = f"__CRITICAL_HEADER_{block_counter}__"
-        # 前後の改行も含めて保存
-        blocks[placeholder] = prev_newline + match.group(0) + next_newline
-        block_counter += 1
-        return placeholder
-    
-    # 行の先頭にある見出しのみを検出（行の途中の見出し記号は無視）
-    text = re.sub(r'^#{1,6}\s+.*$', replace_header, text, flags=re.MULTILINE)
-
-    return text, blocks
+        pieces.append(text[pos:match.start()])
+        pieces.append(placeholder)
+        pos = match.end()
+    if not blocks:
+        return text, blocks
+    pieces.append(text[pos:])
+    return ''.join(pieces), blocks
+
+
+def _restore(text: str, blocks: Dict[str, str], pattern: "re.Pattern[str]") -> str:
+    """Replace every known placeholder in one scan and join the output once."""
+    if not blocks:
+        return text
+    pieces: List[str] = []
+    pos = 0
+    for match in pattern.finditer(text):
+        original = blocks.get(match.group(0))
+        if original is None:
+            continue
+        start, end = match.span()
+        pieces.append(text[pos:start])
+        if '_HEADER_' in match.group(0):
+            # 見出しは必ず独立した行に戻す
+            if start > 0 and text[start - 1] != '\n':
+                pieces.append('\n')
+            pieces.append(original)
+            if end < len(text) and text[end] != '\n':
+                pieces.append('\n')
+        else:
+            pieces.append(original)
+        pos = end
+    if not pieces:
+        return text
+    pieces.append(text[pos:])
+    return ''.join(pieces)
 
 
 def restore_critical_markdown_blocks(text: str, blocks: Dict[str, str]) -> str:
     """Restore critical Markdown formatting blocks from placeholders."""
-    for placeholder, original in blocks.items():
-        # 見出しの場合は前後の改行が既に含まれているのでそのまま復元
-        text = text.replace(placeholder, original)
-    return text
+    return _restore(text, blocks, CRITICAL_PLACEHOLDER)
 
 
 def extract_markdown_blocks(text: str) -> Tuple[str, Dict[str, str]]:
@@ -234,9 +216,12 @@ def extract_markdown_blocks(text: str) -> Tuple[str, Dict[str, str]]:
 
 def restore_markdown_blocks(text: str, blocks: Dict[str, str]) -> str:
     """Restore Markdown formatting blocks from placeholders."""
+    # 後から抽出したブロックは先に抽出したプレースホルダーを含みうるので、
+    # 抽出順に展開してから本文を一度で復元する
+    resolved: Dict[str, str] = {}
     for placeholder, original in blocks.items():
-        text = text.replace(placeholder, original)
-    return text
+        resolved[placeholder] = _restore(original, resolved, _MARKDOWN_PLACEHOLDER)
+    return _restore(text, resolved, _MARKDOWN_PLACEHOLDER)
 
 
 def get_text_for_evaluation(text: str) -> str:
@@ -248,7 +233,11 @@ def get_text_for_evaluation(text: str) -> str:
     
     # Extract and remove critical Markdown blocks only
     processed_text, blocks = extract_critical_markdown_blocks(text)
-    
+    return clean_for_evaluation(processed_text)
+
+
+def clean_for_evaluation(processed_text: str) -> str:
+    """Remove remaining Markdown syntax from text whose critical blocks are already extracted."""
     # Remove remaining Markdown syntax that might interfere with evaluation
     # Remove horizontal rules
     processed_text = re.sub(r'^\s*[-*_]{3,}\s*$', '', processed_text, flags=re.MULTILINE)
@@ -260,4 +249,4 @@ def get_text_for_evaluation(text: str) -> str:
     processed_text = re.sub(r'\n\s*\n\s*\n', '\n\n', processed_text)
     processed_text = processed_text.strip()
     
-    return processed_text 
\ No newline at end of file
+    return processed_text
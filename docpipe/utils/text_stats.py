@@ -0,0 +1,99 @@
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None  # type: ignore
+
+import re
+from typing import List, NamedTuple, Sequence
+
+
+class CharStats(NamedTuple):
+    """Character-class counts used by the readability metrics."""
+
+    chars: int
+    spaces: int  # str.isspace() characters
+    punctuation: int  # 。、！？
+    kanji: int  # U+4E00..U+9FFF
+    hiragana: int  # U+3040..U+309F
+    sentences: int  # non-blank segments between 。！？
+
+
+# character classes of the lookup table
+_OTHER, _SPACE, _KANJI, _HIRAGANA, _COMMA, _SENTENCE_END = range(6)
+_NUM_CLASSES = 6
+
+_SENTENCE_SPLIT = re.compile(r"[。！？]")
+_PUNCTUATION = re.compile(r"[。、！？]")
+_KANJI_RE = re.compile(r"[一-鿿]")
+_HIRAGANA_RE = re.compile(r"[぀-ゟ]")
+
+_CLASS_TABLE = None
+if np is not None:
+    # 全コードポイントの文字種（空白文字はすべて BMP 内にある）
+    _CLASS_TABLE = np.zeros(0x110000, dtype=np.uint8)
+    _CLASS_TABLE[[cp for cp in range(0x10000) if chr(cp).isspace()]] = _SPACE
+    _CLASS_TABLE[0x4E00:0xA000] = _KANJI
+    _CLASS_TABLE[0x3040:0x30A0] = _HIRAGANA
+    _CLASS_TABLE[ord("、")] = _COMMA
+    _CLASS_TABLE[[ord(ch) for ch in "。！？"]] = _SENTENCE_END
+
+
+def _char_stats_regex(text: str) -> CharStats:
+    sentences = [s for s in _SENTENCE_SPLIT.split(text) if s.strip()]
+    return CharStats(
+        len(text),
+        sum(1 for ch in text if ch.isspace()),
+        len(_PUNCTUATION.findall(text)),
+        len(_KANJI_RE.findall(text)),
+        len(_HIRAGANA_RE.findall(text)),
+        len(sentences),
+    )
+
+
+def char_stats(text: str) -> CharStats:
+    """Count character classes and sentences of ``text`` in one pass."""
+    return char_stats_batch([text])[0]
+
+
+def char_stats_batch(texts: Sequence[str]) -> List[CharStats]:
+    """Return :class:`CharStats` for many texts at once.
+
+    With NumPy all texts are concatenated into one UTF-32 buffer, every
+    code point is mapped to its class through a lookup table and the
+    per-text histograms come from a single ``bincount``. Without NumPy the
+    counts fall back to regular expressions.
+    """
+    if _CLASS_TABLE is None:
+        return [_char_stats_regex(text) for text in texts]
+    if not texts:
+        return []
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    buf = "".join(texts).encode("utf-32-le", "surrogatepass")
+    codepoints = np.frombuffer(buf, dtype=np.uint32)
+    classes = _CLASS_TABLE[codepoints]
+
+    doc = np.repeat(np.arange(len(texts), dtype=np.int32), lengths)
+    hist = np.bincount(doc * _NUM_CLASSES + classes, minlength=len(texts) * _NUM_CLASSES)
+    hist = hist.reshape(len(texts), _NUM_CLASSES)
+
+    # 文の数: 文末記号と文書の先頭で区切った区間のうち、空白以外の文字を含むもの
+    starts = np.zeros(len(classes), dtype=bool)
+    starts[(np.cumsum(lengths) - lengths)[lengths > 0]] = True
+    segment = np.cumsum(starts | (classes == _SENTENCE_END))
+    content = (classes != _SPACE) & (classes != _SENTENCE_END)
+    content_segment = segment[content]
+    first = np.ones(len(content_segment), dtype=bool)
+    first[1:] = content_segment[1:] != content_segment[:-1]
+    sentences = np.bincount(doc[content][first], minlength=len(texts))
+
+    return [
+        CharStats(
+            int(length),
+            int(row[_SPACE]),
+            int(row[_COMMA] + row[_SENTENCE_END]),
+            int(row[_KANJI]),
+            int(row[_HIRAGANA]),
+            int(count),
+        )
+        for length, row, count in zip(lengths, hist, sentences)
+    ]
@@ -1,33 +1,198 @@
-try:
-    import tiktoken
-except Exception:  # pragma: no cover - optional dependency
-    tiktoken = None  # type: ignore
+import re
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
-from typing import List
+from .tokenizer import get_tokenizer
 
+# 文末: 和文の句点類（閉じ括弧込み）、空白が続く欧文の終止符、改行
+_SENTENCE_END = re.compile(r"[。！？]+[」』）】〕]*|[.!?]+[\"'”’)\]]*(?=\s)|\n")
+_LINE_END = re.compile(r"\n")
+_WORD = re.compile(r"\S+")
+_HEADING = re.compile(r"#{1,6}\s")
 
-def split_into_chunks(text: str, max_tokens: int = 2048) -> List[str]:
+_MAX_CHARS_PER_TOKEN = 32
+
+# block kinds
+_TEXT, _HEADING_BLOCK, _CODE = 0, 1, 2
+
+
+class TextChunk(NamedTuple):
+    """A chunk of the source text and its ``[start, end)`` offsets."""
+
+    text: str
+    start: int
+    end: int
+
+
+def _blocks(text: str) -> Iterator[Tuple[int, int, int]]:
+    """Yield ``(start, end, kind)`` for paragraphs, headings and code fences."""
+    start: Optional[int] = None
+    end = 0
+    kind = _TEXT
+    fence = ""
+    pos = 0
+    for line in text.splitlines(True):
+        line_start = pos
+        pos += len(line)
+        body = line.strip()
+        if fence:
+            end = line_start + len(line.rstrip())
+            if body.startswith(fence):
+                yield start, end, _CODE  # type: ignore[misc]
+                start, fence = None, ""
+            continue
+        if not body:
+            if start is not None:
+                yield start, end, kind
+                start = None
+            continue
+        is_fence = body.startswith("```") or body.startswith("~~~")
+        is_heading = _HEADING.match(body) is not None
+        if start is not None and (is_fence or is_heading or kind == _HEADING_BLOCK):
+            yield start, end, kind
+            start = None
+        if start is None:
+            start = line_start + len(line) - len(line.lstrip())
+            kind = _HEADING_BLOCK if is_heading else _TEXT
+        end = line_start + len(line.rstrip())
+        if is_fence:
+            fence = body[:3]
+    if start is not None:
+        yield start, end, _CODE if fence else kind
+
+
+def _split(text: str, start: int, end: int, boundary: "re.Pattern[str]") -> List[Tuple[int, int]]:
+    """Split ``text[start:end]`` after each boundary match, trimming whitespace."""
+    spans = []
+    pos = start
+    cuts = [m.end() for m in boundary.finditer(text, start, end)]
+    for cut in cuts + [end]:
+        segment = text[pos:cut]
+        stripped = segment.strip()
+        if stripped:
+            s = pos + len(segment) - len(segment.lstrip())
+            spans.append((s, s + len(stripped)))
+        pos = cut
+    return spans
+
+
+class _Packer:
+    """Greedy packer of spans into chunks, breaking oversized spans down."""
+
+    def __init__(self, text: str, max_tokens: int, count: Callable[[str], int]) -> None:
+        self.text = text
+        self.max_tokens = max_tokens
+        self.count = count
+        self.chunks: List[TextChunk] = []
+        # (start, end, tokens, is_heading)
+        self.current: List[Tuple[int, int, int, bool]] = []
+        self.tokens = 0
+        self.last_end = 0
+
+    def _flush(self) -> None:
+        if self.current:
+            start, end = self.current[0][0], self.current[-1][1]
+            self.chunks.append(TextChunk(self.text[start:end], start, end))
+        self.current = []
+        self.tokens = 0
+
+    def _add(self, start: int, end: int, tokens: int, heading: bool = False) -> None:
+        if self.current and self.tokens + tokens > self.max_tokens:
+            # 見出しだけがチャンク末尾に残らないよう次のチャンクへ送る
+            carry = [self.current.pop()] if len(self.current) > 1 and self.current[-1][3] else []
+            self._flush()
+            self.current = carry
+            self.tokens = sum(item[2] for item in carry)
+            if carry and self.tokens + tokens > self.max_tokens:
+                self._flush()
+        self.current.append((start, end, tokens, heading))
+        self.tokens += tokens
+        self.last_end = end
+
+    def feed(
+        self, start: int, end: int, level: int = 0, kind: int = _TEXT, tokens: Optional[int] = None
+    ) -> None:
+        # the separator before a span is counted with it
+        if tokens is None:
+            tokens = self.count(self.text[self.last_end:end])
+        if tokens <= self.max_tokens:
+            self._add(start, end, tokens, kind == _HEADING_BLOCK)
+            return
+        if level == 0:
+            boundary = _LINE_END if kind == _CODE else _SENTENCE_END
+            spans = _split(self.text, start, end, boundary)
+        elif level == 1:
+            spans = [(m.start(), m.end()) for m in _WORD.finditer(self.text, start, end)]
+        else:
+            self._hard_split(start, end)
+            return
+        for s, e in spans:
+            self.feed(s, e, level + 1, kind)
+
+    def _hard_split(self, start: int, end: int) -> None:
+        """Cut a span without any break opportunity at character boundaries."""
+        self._flush()
+        pos = start
+        while pos < end:
+            # a token rarely covers more than a few characters, so bound the search
+            lo, hi = pos + 1, min(end, pos + self.max_tokens * _MAX_CHARS_PER_TOKEN)
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if self.count(self.text[pos:mid]) <= self.max_tokens:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            self._add(pos, lo, self.count(self.text[pos:lo]))
+            pos = lo
+
+    def finish(self) -> List[TextChunk]:
+        self._flush()
+        return self.chunks
+
+
+def chunk_text(text: str, max_tokens: int = 2048, model: Optional[str] = None) -> List[TextChunk]:
+    """Split text into chunks of at most ``max_tokens`` tokens at natural breaks.
+
+    Whole Markdown blocks (paragraphs, headings, code fences) are packed
+    first; a block over the budget is split into sentences (including
+    ``。！？``), then words, and only as a last resort at character
+    boundaries. Chunks exclude the whitespace between them, so
+    :func:`join_chunks` reassembles the original text exactly. Tokens are
+    counted with the encoding of ``model``.
+    """
+    if max_tokens <= 0 or not text.strip():
+        return [TextChunk(text, 0, len(text))]
+
+    tokenizer = get_tokenizer(model)
+    blocks = list(_blocks(text))
+    # count every block (with the separator before it) in one batch call
+    spans = []
+    prev_end = 0
+    for _, end, _ in blocks:
+        spans.append(text[prev_end:end])
+        prev_end = end
+    packer = _Packer(text, max_tokens, tokenizer.count)
+    for (start, end, kind), tokens in zip(blocks, tokenizer.count_batch(spans)):
+        packer.feed(start, end, 0, kind, tokens)
+    return packer.finish()
+
+
+def join_chunks(text: str, chunks: Sequence[TextChunk], outputs: Sequence[str]) -> str:
+    """Replace each chunk of ``text`` with its output, keeping the text between chunks."""
+    pieces: List[str] = []
+    pos = 0
+    for chunk, output in zip(chunks, outputs):
+        pieces.append(text[pos:chunk.start])
+        pieces.append(output)
+        pos = chunk.end
+    pieces.append(text[pos:])
+    return "".join(pieces)
+
+
+def split_into_chunks(text: str, max_tokens: int = 2048, model: Optional[str] = None) -> List[str]:
     """Split text into chunks of roughly ``max_tokens`` tokens.
 
-    Uses ``tiktoken`` when available. Otherwise falls back to a simple word
-    based heuristic assuming roughly one token per word.
+    Thin wrapper around :func:`chunk_text` returning only the chunk texts.
+    Uses ``tiktoken`` when available and
+    :func:`~docpipe.utils.tokenizer.estimate_tokens` otherwise.
     """
-    if max_tokens <= 0:
-        return [text]
-
-    if tiktoken is None:
-        words = text.split()
-        approx_chunk = max_tokens if max_tokens <= 5 else max_tokens // 2
-        chunks = [" ".join(words[i : i + approx_chunk]) for i in range(0, len(words), approx_chunk)]
-        return chunks or [""]
-
-    try:
-        enc = tiktoken.get_encoding("cl100k_base")
-        tokens = enc.encode(text)
-        pieces = [tokens[i : i + max_tokens] for i in range(0, len(tokens), max_tokens)]
-        return [enc.decode(chunk) for chunk in pieces] or [""]
-    except Exception:  # pragma: no cover - optional dependency may fail
-        words = text.split()
-        approx_chunk = max_tokens if max_tokens <= 5 else max_tokens // 2
-        chunks = [" ".join(words[i : i + approx_chunk]) for i in range(0, len(words), approx_chunk)]
-        return chunks or [""]
+    return [chunk.text for chunk in chunk_text(text, max_tokens, model)]
@@ -0,0 +1,109 @@
+try:
+    import tiktoken
+except Exception:  # pragma: no cover - optional dependency
+    tiktoken = None  # type: ignore
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_ENCODING = "cl100k_base"
+# モデル名の接頭辞で o200k_base を使う世代を判定する
+_O200K_PREFIXES = ("gpt-4o", "chatgpt-4o", "gpt-4.1", "gpt-4.5", "gpt-5", "o1", "o3", "o4")
+
+# rough BPE pieces: letter runs, digit groups of up to 3, any other character
+_ESTIMATE_PIECE = re.compile(r"[A-Za-z]+|\d{1,3}|\S")
+
+_encodings: Dict[str, Tuple[Any, Any]] = {}
+
+
+def encoding_name_for_model(model: Optional[str]) -> str:
+    if model and model.startswith(_O200K_PREFIXES):
+        return "o200k_base"
+    return DEFAULT_ENCODING
+
+
+def get_encoding(name: str = DEFAULT_ENCODING) -> Optional[Any]:
+    """Return the cached tiktoken encoding ``name`` or ``None`` if unavailable."""
+    if tiktoken is None:
+        return None
+    cached = _encodings.get(name)
+    if cached is not None and cached[0] is tiktoken:
+        return cached[1]
+    try:
+        enc = tiktoken.get_encoding(name)
+    except Exception:  # pragma: no cover - encoding download may fail
+        enc = None
+    # remember failures too so an offline run does not retry on every call
+    _encodings[name] = (tiktoken, enc)
+    return enc
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the token count without a tokenizer.
+
+    Short English words count as one token, digits in groups of three and
+    every other character (kana, kanji, punctuation) as one token each.
+    """
+    return sum(1 + (len(piece) - 1) // 6 for piece in _ESTIMATE_PIECE.findall(text))
+
+
+class Tokenizer:
+    """Token counting for one model, falling back to estimates without tiktoken.
+
+    Special-token strings in the input are encoded as plain text.
+    """
+
+    def __init__(self, model: Optional[str] = None, num_threads: int = 8) -> None:
+        self.model = model
+        self.encoding_name = encoding_name_for_model(model)
+        self.num_threads = num_threads
+
+    @property
+    def encoding(self) -> Optional[Any]:
+        return get_encoding(self.encoding_name)
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from the real tokenizer."""
+        return self.encoding is not None
+
+    def encode(self, text: str) -> List[int]:
+        enc = self.encoding
+        if enc is None:
+            raise RuntimeError(f"tiktoken encoding {self.encoding_name} is not available")
+        return enc.encode_ordinary(text)
+
+    def encode_batch(self, texts: Sequence[str]) -> List[List[int]]:
+        """Encode many texts at once on tiktoken's thread pool."""
+        enc = self.encoding
+        if enc is None:
+            raise RuntimeError(f"tiktoken encoding {self.encoding_name} is not available")
+        return enc.encode_ordinary_batch(list(texts), num_threads=self.num_threads)
+
+    def count(self, text: str) -> int:
+        enc = self.encoding
+        if enc is None:
+            return estimate_tokens(text)
+        return len(enc.encode_ordinary(text))
+
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        enc = self.encoding
+        if enc is None:
+            return [estimate_tokens(text) for text in texts]
+        return [len(tokens) for tokens in enc.encode_ordinary_batch(list(texts), num_threads=self.num_threads)]
+
+    @staticmethod
+    def estimate(text: str) -> int:
+        """Cheap length estimate that never runs the tokenizer."""
+        return estimate_tokens(text)
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(model: Optional[str] = None) -> Tokenizer:
+    """Return the shared :class:`Tokenizer` for ``model``."""
+    return Tokenizer(model)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    return get_tokenizer(model).count(text)
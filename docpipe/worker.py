@@ -0,0 +1,163 @@
+"""Queue workers for ``text-agent worker``.
+
+:func:`run_worker` claims jobs from a :class:`~docpipe.jobqueue.JobQueue`,
+runs each source through the warm :class:`~docpipe.service.Components` and
+writes ``final.md`` and ``final_metadata.json`` to ``<output_dir>/<job id>``.
+The lease is renewed from a heartbeat thread while the document is
+processed. Each attempt writes to its own directory under
+``<output_dir>/.work`` that is moved into place only once
+:meth:`~docpipe.jobqueue.JobQueue.complete` accepts the result, so a worker
+that stalled and lost its lease never touches the output of the worker
+that took the job over; it stops at the next chunk instead.
+"""
+
+import json
+import logging
+import os
+import shutil
+import socket
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .budget import Budget
+from .jobqueue import JobQueue, QueuedJob
+from .metrics import QUEUE_DEPTH
+from .service import Components
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseLostError(RuntimeError):
+    """Raised when another worker has taken over the job being processed."""
+
+
+class _Heartbeat:
+    """Renew the lease of ``job_id`` every ``interval`` seconds in a thread."""
+
+    def __init__(self, queue: JobQueue, job_id: str, worker: str, interval: float) -> None:
+        self.queue = queue
+        self.job_id = job_id
+        self.worker = worker
+        self.interval = interval
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="docpipe-heartbeat", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.queue.heartbeat(self.job_id, self.worker):
+                    # 期限切れで他のワーカーに取られた。結果は complete で弾かれる
+                    self.lost = True
+                    logger.warning("Lost the lease of job %s", self.job_id)
+                    return
+            except Exception:  # pragma: no cover - retried on the next beat
+                logger.exception("Heartbeat for job %s failed", self.job_id)
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def process_job(
+    job: QueuedJob,
+    components: Components,
+    work_dir: Path,
+    budget: Optional[Budget] = None,
+    lease: Optional[_Heartbeat] = None,
+) -> Path:
+    """Process one job into ``work_dir`` and return it.
+
+    Raises :class:`LeaseLostError` at the next finished chunk once ``lease``
+    has been lost.
+    """
+
+    def check_lease() -> None:
+        if lease is not None and lease.lost:
+            raise LeaseLostError(f"Lease of job {job.id} was taken over")
+
+    work_dir.mkdir(parents=True, exist_ok=True)
+    with open(work_dir / "final.md", "w", encoding="utf-8") as final_out:
+
+        def write_piece(piece: str) -> None:
+            check_lease()
+            final_out.write(piece)
+            final_out.flush()
+
+        result = components.run(
+            source=job.source, on_chunk=write_piece, budget=budget, temp_dir=str(work_dir / "temp")
+        )
+    check_lease()
+    metadata = {"job_id": job.id, "source": job.source, "attempts": job.attempts, **result["metadata"]}
+    (work_dir / "final_metadata.json").write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    return work_dir
+
+
+def _publish(work_dir: Path, case_dir: Path) -> None:
+    # 完了を記録できたワーカーだけが出力ディレクトリを置き換える
+    if case_dir.exists():
+        shutil.rmtree(case_dir)
+    os.replace(work_dir, case_dir)
+
+
+def run_worker(
+    queue: JobQueue,
+    components: Components,
+    output_dir: Path,
+    worker_id: Optional[str] = None,
+    heartbeat_interval: float = 60.0,
+    poll_interval: float = 2.0,
+    exit_when_empty: bool = False,
+    max_jobs: Optional[int] = None,
+    stop: Optional[threading.Event] = None,
+    budget: Optional[Budget] = None,
+) -> int:
+    """Claim and process jobs until ``stop`` is set; return the number processed.
+
+    With ``exit_when_empty`` the worker returns as soon as no job can be
+    claimed instead of polling every ``poll_interval`` seconds. ``budget``
+    is charged with every job; once it is exhausted all later jobs run
+    without retries and the diff stage, so ``text-agent worker`` passes
+    none and only the per-document budgets apply.
+    """
+    worker_id = worker_id or default_worker_id()
+    stop = stop or threading.Event()
+    processed = 0
+    while not stop.is_set() and (max_jobs is None or processed < max_jobs):
+        job = queue.claim(worker_id)
+        QUEUE_DEPTH.set(queue.counts()["queued"], queue="jobs")
+        if job is None:
+            if exit_when_empty:
+                break
+            stop.wait(poll_interval)
+            continue
+
+        logger.info("Worker %s processing job %s (attempt %d): %s", worker_id, job.id, job.attempts, job.source)
+        case_dir = Path(output_dir) / job.id
+        work_dir = Path(output_dir) / ".work" / f"{job.id}.{job.attempts}"
+        with _Heartbeat(queue, job.id, worker_id, heartbeat_interval) as lease:
+            try:
+                process_job(job, components, work_dir, budget, lease)
+            except LeaseLostError:
+                logger.warning("Abandoned job %s: its lease was taken over", job.id)
+            except Exception as exc:
+                logger.exception("Job %s failed", job.id)
+                queue.fail(job.id, worker_id, str(exc))
+            else:
+                if queue.complete(job.id, worker_id, str(case_dir)):
+                    _publish(work_dir, case_dir)
+                else:
+                    logger.warning("Discarded job %s: it finished after its lease was taken over", job.id)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+        processed += 1
+    return processed